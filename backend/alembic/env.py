@@ -0,0 +1,64 @@
+import re
+from logging.config import fileConfig
+
+from alembic import context
+
+from app.core.database import Base, engine
+from app.core.schema import import_models
+
+config = context.config
+# Keep the app's logging as configured when migrations run from inside it
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
+    fileConfig(config.config_file_name)
+
+import_models()
+target_metadata = Base.metadata
+# Monthly and default partitions of activities on Postgres (app.activities.partitions)
+ACTIVITY_PARTITION = re.compile(r"^activities_(default|\d{4}_\d{2})$")
+
+
+def include_name(name, type_, parent_names) -> bool:
+    # The search index (an FTS5 table and its shadow tables on SQLite) and
+    # the activity partitions are managed by hand, not through the ORM metadata
+    return not (type_ == "table" and (name.startswith("search_documents") or ACTIVITY_PARTITION.match(name)))
+
+
+def run_migrations_offline() -> None:
+    """Emit the migration SQL instead of running it (alembic upgrade head --sql)."""
+    context.configure(
+        url=engine.url,
+        target_metadata=target_metadata,
+        include_name=include_name,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        render_as_batch=engine.dialect.name == "sqlite",
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        _run(connection)
+        return
+    with engine.connect() as connection:
+        _run(connection)
+
+
+def _run(connection) -> None:
+    # SQLite cannot ALTER most things in place; batch mode rebuilds the table instead
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_name=include_name,
+        render_as_batch=connection.dialect.name == "sqlite",
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
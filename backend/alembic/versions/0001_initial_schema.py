@@ -0,0 +1,215 @@
+"""initial schema
+
+The schema as create_all built it before migrations were introduced,
+including the search index table. A database created that way is adopted
+in place: its tables are kept and only the tables, columns and indexes it
+is missing are added (columns such as deals.vote_count and row_version
+take their server defaults). Revisions 0004-0006 then backfill the data
+those columns and tables imply.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17 21:50:43.699308
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ENUMS = {
+    'userrole': ('ADMIN', 'ANALYST', 'PARTNER'),
+    'dealstage': ('SOURCED', 'SCREEN', 'DILIGENCE', 'IC', 'INVESTED', 'PASSED'),
+    'dealstatus': ('ACTIVE', 'APPROVED', 'DECLINED'),
+    'activitytype': ('STAGE_CHANGE', 'COMMENT', 'VOTE', 'APPROVAL', 'DECLINE', 'MEMO_UPDATED'),
+}
+
+SEARCH_FIELDS = ('name', 'company_url', 'summary', 'market', 'product', 'traction', 'risks', 'open_questions')
+
+
+def enum(name: str) -> sa.Enum:
+    # Postgres types are created once up front; dealstage is used by two tables
+    return sa.Enum(*ENUMS[name], name=name).with_variant(
+        postgresql.ENUM(*ENUMS[name], name=name, create_type=False), 'postgresql'
+    )
+
+
+def _inspector():
+    # Offline (--sql) output is for an empty database
+    return None if op.get_context().as_sql else sa.inspect(op.get_bind())
+
+
+def _create_table(name: str, *elements) -> None:
+    """Create the table, or add the columns a create_all-built one lacks."""
+    inspector = _inspector()
+    if inspector is None or not inspector.has_table(name):
+        op.create_table(name, *elements)
+        return
+    present = {column['name'] for column in inspector.get_columns(name)}
+    for element in elements:
+        if isinstance(element, sa.Column) and element.name not in present:
+            op.add_column(name, element)
+
+
+def _create_index(name: str, table: str, columns: list[str], unique: bool = False) -> None:
+    inspector = _inspector()
+    if inspector is None or name not in {index['name'] for index in inspector.get_indexes(table)}:
+        op.create_index(name, table, columns, unique=unique)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        for name, values in ENUMS.items():
+            postgresql.ENUM(*values, name=name).create(bind, checkfirst=True)
+
+    _create_table('users',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('email', sa.String(), nullable=False),
+    sa.Column('hashed_password', sa.String(), nullable=False),
+    sa.Column('full_name', sa.String(), nullable=True),
+    sa.Column('role', enum('userrole'), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    _create_index(op.f('ix_users_email'), 'users', ['email'], unique=True)
+    _create_index(op.f('ix_users_id'), 'users', ['id'], unique=False)
+
+    _create_table('deals',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('company_url', sa.String(), nullable=True),
+    sa.Column('owner_id', sa.Integer(), nullable=False),
+    sa.Column('stage', enum('dealstage'), nullable=False),
+    sa.Column('round', sa.String(), nullable=True),
+    sa.Column('check_size', sa.Numeric(precision=15, scale=2), nullable=True),
+    sa.Column('status', enum('dealstatus'), nullable=False),
+    sa.Column('vote_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('row_version', sa.Integer(), server_default='1', nullable=False),
+    sa.ForeignKeyConstraint(['owner_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    _create_index(op.f('ix_deals_id'), 'deals', ['id'], unique=False)
+    _create_index(op.f('ix_deals_name'), 'deals', ['name'], unique=False)
+    _create_index('ix_deals_stage_status_id', 'deals', ['stage', 'status', 'id'], unique=False)
+
+    _create_table('activities',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('deal_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('activity_type', enum('activitytype'), nullable=False),
+    sa.Column('description', sa.Text(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['deal_id'], ['deals.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    _create_index('ix_activities_deal_created_at_id', 'activities', ['deal_id', 'created_at', 'id'], unique=False)
+    _create_index(op.f('ix_activities_deal_id'), 'activities', ['deal_id'], unique=False)
+    _create_index(op.f('ix_activities_id'), 'activities', ['id'], unique=False)
+
+    _create_table('deal_stage_history',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('deal_id', sa.Integer(), nullable=False),
+    sa.Column('from_stage', enum('dealstage'), nullable=True),
+    sa.Column('to_stage', enum('dealstage'), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('seconds_in_from_stage', sa.Float(), nullable=True),
+    sa.ForeignKeyConstraint(['deal_id'], ['deals.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    _create_index('ix_deal_stage_history_deal_at', 'deal_stage_history', ['deal_id', 'at'], unique=False)
+    _create_index(op.f('ix_deal_stage_history_id'), 'deal_stage_history', ['id'], unique=False)
+    _create_index('ix_deal_stage_history_stage_seconds', 'deal_stage_history', ['from_stage', 'seconds_in_from_stage', 'at'], unique=False)
+    _create_index('ix_deal_stage_history_transition_at', 'deal_stage_history', ['from_stage', 'to_stage', 'at'], unique=False)
+
+    _create_table('memos',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('deal_id', sa.Integer(), nullable=False),
+    sa.Column('created_by_id', sa.Integer(), nullable=False),
+    sa.Column('summary', sa.Text(), nullable=True),
+    sa.Column('market', sa.Text(), nullable=True),
+    sa.Column('product', sa.Text(), nullable=True),
+    sa.Column('traction', sa.Text(), nullable=True),
+    sa.Column('risks', sa.Text(), nullable=True),
+    sa.Column('open_questions', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('row_version', sa.Integer(), server_default='1', nullable=False),
+    sa.ForeignKeyConstraint(['created_by_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['deal_id'], ['deals.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    _create_index(op.f('ix_memos_deal_id'), 'memos', ['deal_id'], unique=True)
+    _create_index(op.f('ix_memos_id'), 'memos', ['id'], unique=False)
+
+    _create_table('votes',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('deal_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['deal_id'], ['deals.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('deal_id', 'user_id', name='unique_user_deal_vote')
+    )
+    _create_index(op.f('ix_votes_deal_id'), 'votes', ['deal_id'], unique=False)
+    _create_index(op.f('ix_votes_id'), 'votes', ['id'], unique=False)
+    _create_index(op.f('ix_votes_user_id'), 'votes', ['user_id'], unique=False)
+
+    _create_table('memo_versions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('memo_id', sa.Integer(), nullable=False),
+    sa.Column('version_number', sa.Integer(), nullable=False),
+    sa.Column('summary', sa.Text(), nullable=True),
+    sa.Column('market', sa.Text(), nullable=True),
+    sa.Column('product', sa.Text(), nullable=True),
+    sa.Column('traction', sa.Text(), nullable=True),
+    sa.Column('risks', sa.Text(), nullable=True),
+    sa.Column('open_questions', sa.Text(), nullable=True),
+    sa.Column('is_snapshot', sa.Boolean(), server_default=sa.true(), nullable=False),
+    sa.Column('delta', sa.LargeBinary(), nullable=True),
+    sa.Column('created_by_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['created_by_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['memo_id'], ['memos.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    _create_index(op.f('ix_memo_versions_id'), 'memo_versions', ['id'], unique=False)
+    _create_index(op.f('ix_memo_versions_memo_id'), 'memo_versions', ['memo_id'], unique=False)
+
+    # Full-text search documents, one per deal (app.search.service)
+    if bind.dialect.name == 'postgresql':
+        op.execute("CREATE TABLE IF NOT EXISTS search_documents (deal_id INTEGER PRIMARY KEY, document TSVECTOR NOT NULL)")
+        op.execute("CREATE INDEX IF NOT EXISTS ix_search_documents_document ON search_documents USING GIN (document)")
+    else:
+        op.execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS search_documents USING fts5({', '.join(SEARCH_FIELDS)}, tokenize='porter unicode61')")
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE search_documents")
+    op.drop_table('memo_versions')
+    op.drop_table('votes')
+    op.drop_table('memos')
+    op.drop_table('deal_stage_history')
+    op.drop_table('activities')
+    op.drop_table('deals')
+    op.drop_table('users')
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        for name in ENUMS:
+            postgresql.ENUM(name=name).drop(bind, checkfirst=True)
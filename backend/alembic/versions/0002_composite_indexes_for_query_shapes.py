@@ -0,0 +1,75 @@
+"""composite indexes for query shapes
+
+Adds a unique (memo_id, version_number) index on memo_versions and
+(stage, id) and (owner_id, id) indexes on deals, and drops the single-column indexes now
+covered by the leading column of a composite one: activities.deal_id,
+memo_versions.memo_id and votes.deal_id (covered by unique_user_deal_vote).
+New indexes are built before the old ones go, and CONCURRENTLY on
+Postgres so writes are not blocked while they build.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 21:58:04.132326
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _check_unique_memo_versions() -> None:
+    if op.get_context().as_sql:
+        return
+    duplicates = op.get_bind().execute(sa.text(
+        "SELECT memo_id, version_number FROM memo_versions "
+        "GROUP BY memo_id, version_number HAVING COUNT(*) > 1 LIMIT 10"
+    )).all()
+    if duplicates:
+        listing = ", ".join(f"memo {memo_id} v{version}" for memo_id, version in duplicates)
+        raise RuntimeError(
+            f"memo_versions has duplicate version numbers ({listing}); "
+            "renumber or remove them before upgrading"
+        )
+
+
+def _create_index(name: str, table: str, columns: list[str], unique: bool = False) -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            op.create_index(name, table, columns, unique=unique, postgresql_concurrently=True)
+    else:
+        op.create_index(name, table, columns, unique=unique)
+
+
+def _drop_index(name: str, table: str) -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
+    else:
+        op.drop_index(name, table_name=table)
+
+
+def upgrade() -> None:
+    _check_unique_memo_versions()
+    _create_index('ix_memo_versions_memo_id_version_number', 'memo_versions', ['memo_id', 'version_number'], unique=True)
+    _create_index('ix_deals_stage_id', 'deals', ['stage', 'id'])
+    _create_index('ix_deals_owner_id_id', 'deals', ['owner_id', 'id'])
+    _drop_index('ix_memo_versions_memo_id', 'memo_versions')
+    _drop_index('ix_activities_deal_id', 'activities')
+    _drop_index('ix_votes_deal_id', 'votes')
+
+
+def downgrade() -> None:
+    _create_index('ix_votes_deal_id', 'votes', ['deal_id'])
+    _create_index('ix_activities_deal_id', 'activities', ['deal_id'])
+    _create_index('ix_memo_versions_memo_id', 'memo_versions', ['memo_id'])
+    _drop_index('ix_deals_owner_id_id', 'deals')
+    _drop_index('ix_deals_stage_id', 'deals')
+    _drop_index('ix_memo_versions_memo_id_version_number', 'memo_versions')
@@ -0,0 +1,156 @@
+"""partition activities and archive closed deals
+
+Adds activity_archives, where jobs.archive_activities moves the activity
+logs of closed deals, and makes activities.created_at NOT NULL (rows
+without one get the migration time).
+
+On Postgres activities becomes a table range-partitioned by month on
+created_at, with primary key (id, created_at) as partitioning requires,
+a DEFAULT partition, and monthly partitions from the oldest row through
+three months ahead. The existing rows are copied into it, so the upgrade
+rewrites the table and holds an exclusive lock on it while it runs.
+activities_id_seq is carried over, so ids continue where they were.
+On SQLite the table stays a plain table.
+
+The downgrade restores archived activities to the live table first.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 23:12:40.518204
+
+"""
+import json
+import zlib
+from datetime import date, datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+MONTHS_AHEAD = 3
+
+
+def _activities_table_sql(primary_key: str, created_at_null: str) -> str:
+    return f"""
+        CREATE TABLE activities (
+            id INTEGER NOT NULL DEFAULT nextval('activities_id_seq'),
+            deal_id INTEGER NOT NULL REFERENCES deals (id),
+            user_id INTEGER NOT NULL REFERENCES users (id),
+            activity_type activitytype NOT NULL,
+            description TEXT NOT NULL,
+            created_at TIMESTAMP WITH TIME ZONE {created_at_null} DEFAULT now(),
+            CONSTRAINT activities_pkey PRIMARY KEY ({primary_key})
+        )"""
+
+
+def _next_month(month: date) -> date:
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def _replace_postgres_activities(old_name: str, create_sql: str) -> None:
+    """Rename activities out of the way and create its replacement with ``create_sql``."""
+    op.execute(f"ALTER TABLE activities RENAME TO {old_name}")
+    op.execute(f"ALTER TABLE {old_name} RENAME CONSTRAINT activities_pkey TO {old_name}_pkey")
+    op.execute("DROP INDEX ix_activities_deal_created_at_id")
+    op.execute("DROP INDEX ix_activities_id")
+    op.execute("ALTER SEQUENCE activities_id_seq OWNED BY NONE")
+    op.execute(create_sql)
+    op.execute("ALTER SEQUENCE activities_id_seq OWNED BY activities.id")
+
+
+def _copy_and_drop(old_name: str, created_at: str) -> None:
+    op.execute(
+        "INSERT INTO activities (id, deal_id, user_id, activity_type, description, created_at) "
+        f"SELECT id, deal_id, user_id, activity_type, description, {created_at} FROM {old_name}"
+    )
+    op.execute(f"DROP TABLE {old_name}")
+    op.create_index('ix_activities_deal_created_at_id', 'activities', ['deal_id', 'created_at', 'id'], unique=False)
+    op.create_index(op.f('ix_activities_id'), 'activities', ['id'], unique=False)
+
+
+def _upgrade_postgres() -> None:
+    _replace_postgres_activities(
+        'activities_unpartitioned',
+        _activities_table_sql('id, created_at', 'NOT NULL') + " PARTITION BY RANGE (created_at)",
+    )
+    op.execute("CREATE TABLE activities_default PARTITION OF activities DEFAULT")
+    now = datetime.now(timezone.utc)
+    oldest = None
+    if not op.get_context().as_sql:
+        oldest = op.get_bind().scalar(sa.text("SELECT MIN(created_at) FROM activities_unpartitioned"))
+    month = (oldest or now).astimezone(timezone.utc).date().replace(day=1)
+    last = now.date().replace(day=1)
+    for _ in range(MONTHS_AHEAD):
+        last = _next_month(last)
+    while month <= last:
+        op.execute(
+            f"CREATE TABLE activities_{month:%Y_%m} PARTITION OF activities "
+            f"FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') TO ('{_next_month(month).isoformat()} 00:00:00+00')"
+        )
+        month = _next_month(month)
+    _copy_and_drop('activities_unpartitioned', 'COALESCE(created_at, now())')
+
+
+def _restore_archives() -> None:
+    if op.get_context().as_sql:
+        raise RuntimeError(
+            "the downgrade decompresses activity_archives in Python; run it against the database, not with --sql"
+        )
+    bind = op.get_bind()
+    activities = sa.table(
+        'activities',
+        sa.column('id', sa.Integer), sa.column('deal_id', sa.Integer), sa.column('user_id', sa.Integer),
+        sa.column('activity_type', sa.String), sa.column('description', sa.Text),
+        sa.column('created_at', sa.DateTime(timezone=True)),
+    )
+    for deal_id, entries in bind.execute(sa.text("SELECT deal_id, entries FROM activity_archives")).all():
+        rows = [
+            {
+                'id': activity_id, 'deal_id': deal_id, 'user_id': user_id, 'activity_type': activity_type,
+                'description': description, 'created_at': datetime.fromisoformat(created_at),
+            }
+            for activity_id, user_id, activity_type, description, created_at in json.loads(zlib.decompress(entries))
+        ]
+        if rows:
+            bind.execute(activities.insert(), rows)
+
+
+def upgrade() -> None:
+    op.create_table('activity_archives',
+    sa.Column('deal_id', sa.Integer(), nullable=False),
+    sa.Column('activity_count', sa.Integer(), nullable=False),
+    sa.Column('archived_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('entries', sa.LargeBinary(), nullable=False),
+    sa.ForeignKeyConstraint(['deal_id'], ['deals.id'], ),
+    sa.PrimaryKeyConstraint('deal_id')
+    )
+    if op.get_bind().dialect.name == 'postgresql':
+        _upgrade_postgres()
+        return
+    op.execute("UPDATE activities SET created_at = CURRENT_TIMESTAMP WHERE created_at IS NULL")
+    with op.batch_alter_table('activities', schema=None) as batch_op:
+        batch_op.alter_column('created_at',
+               existing_type=sa.DateTime(timezone=True),
+               existing_server_default=sa.func.now(),
+               nullable=False)
+
+
+def downgrade() -> None:
+    _restore_archives()
+    op.drop_table('activity_archives')
+    if op.get_bind().dialect.name == 'postgresql':
+        _replace_postgres_activities('activities_partitioned', _activities_table_sql('id', 'NULL'))
+        _copy_and_drop('activities_partitioned', 'created_at')
+        return
+    with op.batch_alter_table('activities', schema=None) as batch_op:
+        batch_op.alter_column('created_at',
+               existing_type=sa.DateTime(timezone=True),
+               existing_server_default=sa.func.now(),
+               nullable=True)
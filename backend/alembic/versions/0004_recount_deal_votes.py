@@ -0,0 +1,33 @@
+"""recount deal votes
+
+Sets deals.vote_count to each deal's number of votes where it differs, as
+on a create_all-built database whose vote_count column 0001 added with a
+default of 0. Only wrong rows are written, and updated_at and row_version
+(the ETag) are left alone; on a database the app has maintained since
+0001 nothing changes. The downgrade has nothing to undo.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 23:48:10.271904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COUNTED = "(SELECT COUNT(*) FROM votes WHERE votes.deal_id = deals.id)"
+
+
+def upgrade() -> None:
+    op.execute(f"UPDATE deals SET vote_count = {COUNTED} WHERE vote_count != {COUNTED}")
+
+
+def downgrade() -> None:
+    pass
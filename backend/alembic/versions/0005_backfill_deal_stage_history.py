@@ -0,0 +1,131 @@
+"""backfill deal stage history
+
+Fills deal_stage_history for deals that have none, as on a
+create_all-built database where 0001 added the table empty. The "Deal
+created in <stage> stage" and "Moved from <stage> to <stage>" activities
+of each such deal are parsed in activity order; a deal without any
+parseable stage activity gets a single creation entry at its created_at.
+Deals the app has recorded history for since 0001 are skipped, so on such
+a database nothing changes. The downgrade keeps the rows, which the app
+would have written itself.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 23:52:37.604118
+
+"""
+import re
+from datetime import timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 2000
+STAGES = ('SOURCED', 'SCREEN', 'DILIGENCE', 'IC', 'INVESTED', 'PASSED')
+CREATED = re.compile(r"^Deal created in (\w+) stage$")
+MOVED = re.compile(r"^Moved from (\w+) to (\w+)$")
+
+dealstage = sa.Enum(*STAGES, name='dealstage')
+history = sa.table(
+    'deal_stage_history',
+    sa.column('deal_id', sa.Integer), sa.column('from_stage', dealstage), sa.column('to_stage', dealstage),
+    sa.column('user_id', sa.Integer), sa.column('at', sa.DateTime(timezone=True)),
+    sa.column('seconds_in_from_stage', sa.Float),
+)
+
+
+def _stage(value: str) -> str:
+    # Activities name stages by value (e.g. "screen"); the column stores the enum name
+    if value.upper() not in STAGES:
+        raise ValueError(value)
+    return value.upper()
+
+
+def _parse(description: str) -> tuple[str | None, str] | None:
+    try:
+        if match := CREATED.match(description):
+            return None, _stage(match.group(1))
+        if match := MOVED.match(description):
+            return _stage(match.group(1)), _stage(match.group(2))
+    except ValueError:
+        pass
+    return None
+
+
+def _as_utc(value):
+    # SQLite hands back naive datetimes; everything the app stores is UTC
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def _history_rows(deal, activities) -> list[dict]:
+    rows = []
+    previous_at = None
+    for activity in activities:
+        transition = _parse(activity.description or "")
+        if transition is None:
+            continue
+        at = _as_utc(activity.created_at)
+        rows.append({
+            'deal_id': deal.id,
+            'from_stage': transition[0],
+            'to_stage': transition[1],
+            'user_id': activity.user_id,
+            'at': at,
+            'seconds_in_from_stage': (
+                max(0.0, (at - previous_at).total_seconds())
+                if transition[0] is not None and previous_at is not None else None
+            ),
+        })
+        previous_at = at
+    if not rows:
+        rows.append({
+            'deal_id': deal.id,
+            'from_stage': None,
+            'to_stage': deal.stage,
+            'user_id': deal.owner_id,
+            'at': _as_utc(deal.created_at),
+            'seconds_in_from_stage': None,
+        })
+    return rows
+
+
+def upgrade() -> None:
+    if op.get_context().as_sql:
+        # Offline output is for an empty database, which has nothing to backfill
+        return
+    bind = op.get_bind()
+    missing = bind.scalars(sa.text(
+        "SELECT id FROM deals WHERE id NOT IN (SELECT deal_id FROM deal_stage_history) ORDER BY id"
+    )).all()
+    for offset in range(0, len(missing), BATCH_SIZE):
+        deal_ids = missing[offset:offset + BATCH_SIZE]
+        deals = bind.execute(
+            sa.text("SELECT id, stage, owner_id, created_at FROM deals WHERE id IN :ids")
+            .bindparams(sa.bindparam('ids', expanding=True))
+            .columns(created_at=sa.DateTime(timezone=True)),
+            {'ids': deal_ids},
+        ).all()
+        activities_by_deal = {deal_id: [] for deal_id in deal_ids}
+        for activity in bind.execute(
+            sa.text(
+                "SELECT deal_id, user_id, description, created_at FROM activities "
+                "WHERE deal_id IN :ids AND activity_type = 'STAGE_CHANGE' ORDER BY deal_id, created_at, id"
+            ).bindparams(sa.bindparam('ids', expanding=True))
+            .columns(created_at=sa.DateTime(timezone=True)),
+            {'ids': deal_ids},
+        ):
+            activities_by_deal[activity.deal_id].append(activity)
+        rows = [row for deal in deals for row in _history_rows(deal, activities_by_deal[deal.id])]
+        bind.execute(history.insert(), rows)
+
+
+def downgrade() -> None:
+    pass
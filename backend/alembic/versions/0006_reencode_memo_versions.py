@@ -0,0 +1,75 @@
+"""re-encode memo versions
+
+Rewrites each memo's versions to the delta layout of the current settings:
+a full snapshot every MEMO_SNAPSHOT_INTERVAL versions and compressed deltas
+in between, or every version in full when MEMO_VERSION_STORAGE=full. On a
+create_all-built database, where 0001 added is_snapshot defaulting to true,
+this turns the copies into deltas. Versions the app wrote since 0001
+already have that layout and are left alone. The downgrade has nothing to
+undo; either layout reads the same.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 23:57:03.918245
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.memos.versioning import MEMO_FIELDS, apply_delta, encode_delta, is_snapshot_version
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+memo_versions = sa.table(
+    'memo_versions',
+    sa.column('id', sa.Integer), sa.column('memo_id', sa.Integer), sa.column('version_number', sa.Integer),
+    *(sa.column(field, sa.Text) for field in MEMO_FIELDS),
+    sa.column('is_snapshot', sa.Boolean), sa.column('delta', sa.LargeBinary),
+)
+
+
+def _reencode(bind, memo_id: int) -> None:
+    versions = bind.execute(
+        sa.select(memo_versions).where(memo_versions.c.memo_id == memo_id).order_by(memo_versions.c.version_number)
+    ).all()
+    previous = None
+    previous_number = None
+    for version in versions:
+        if version.is_snapshot:
+            content = {field: getattr(version, field) for field in MEMO_FIELDS}
+        else:
+            content = apply_delta(previous, version.delta)
+        as_delta = (
+            previous is not None
+            and previous_number == version.version_number - 1
+            and not is_snapshot_version(version.version_number)
+        )
+        if as_delta and version.is_snapshot:
+            values = {'is_snapshot': False, 'delta': encode_delta(previous, content), **dict.fromkeys(MEMO_FIELDS)}
+        elif not as_delta and not version.is_snapshot:
+            values = {'is_snapshot': True, 'delta': None, **content}
+        else:
+            values = None
+        if values is not None:
+            bind.execute(memo_versions.update().where(memo_versions.c.id == version.id).values(**values))
+        previous, previous_number = content, version.version_number
+
+
+def upgrade() -> None:
+    if op.get_context().as_sql:
+        # Offline output is for an empty database, which has nothing to re-encode
+        return
+    bind = op.get_bind()
+    for memo_id in bind.scalars(sa.text("SELECT DISTINCT memo_id FROM memo_versions ORDER BY memo_id")).all():
+        _reencode(bind, memo_id)
+
+
+def downgrade() -> None:
+    pass
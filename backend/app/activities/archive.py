@@ -0,0 +1,131 @@
+"""Archive of the activity logs of closed deals.
+
+Once a deal is closed (INVESTED or PASSED, or DECLINED) and has been idle
+for a while, ``archive_deals`` moves its activities out of the live
+``activities`` table into one ``activity_archives`` row: the entries as
+zlib-compressed JSON, newest first. The live table (and on Postgres its
+partitions) then holds only what open deals and recent activity need.
+
+Activities created after a deal was archived stay in the live table, and
+only rows older than the job's idle cutoff are ever archived, so a deal's
+archived entries are always older than its live ones. The feed therefore
+reads the live rows first and continues into the archive when they run out
+(``archived_page``); cursors and ETags are unaffected because entries keep
+their ids and timestamps.
+"""
+import json
+import zlib
+from datetime import datetime
+from sqlalchemy import delete, func, or_, select, tuple_
+from sqlalchemy.orm import Session
+from app.activities.models import Activity, ActivityArchive, ActivityType
+from app.core.response_cache import activities_tag, invalidate_on_commit
+from app.deals.models import Deal, DealStage, DealStatus
+
+CLOSED_DEAL = or_(Deal.stage.in_([DealStage.INVESTED, DealStage.PASSED]), Deal.status == DealStatus.DECLINED)
+ENTRY_COLUMNS = (Activity.id, Activity.user_id, Activity.activity_type, Activity.description, Activity.created_at)
+
+
+def encode_entries(rows) -> bytes:
+    """Compress (id, user_id, activity_type, description, created_at) rows, newest first."""
+    entries = [
+        [row.id, row.user_id, row.activity_type.name, row.description, row.created_at.isoformat()]
+        for row in rows
+    ]
+    return zlib.compress(json.dumps(entries, separators=(",", ":")).encode(), 9)
+
+
+def decode_entries(deal_id: int, entries: bytes) -> list[Activity]:
+    """The archived activities as transient (never added to a session) Activity objects."""
+    return [
+        Activity(
+            id=activity_id, deal_id=deal_id, user_id=user_id, activity_type=ActivityType[activity_type],
+            description=description, created_at=datetime.fromisoformat(created_at),
+        )
+        for activity_id, user_id, activity_type, description, created_at in json.loads(zlib.decompress(entries))
+    ]
+
+
+def archived_page(
+    db: Session,
+    deal_id: int,
+    skip: int,
+    limit: int,
+    after: tuple[datetime, int] | None,
+    live_count: int
+) -> list[Activity]:
+    """The archived activities that continue a feed page which returned ``live_count`` live rows.
+
+    Called only when the live rows did not fill the page. ``after`` is the
+    decoded (created_at, id) cursor. When the page holds no live rows the
+    offset may reach past them, so they are counted to find where in the
+    archive it lands.
+    """
+    entries = db.scalar(select(ActivityArchive.entries).where(ActivityArchive.deal_id == deal_id))
+    if entries is None:
+        return []
+    archived = decode_entries(deal_id, entries)
+    if after is not None:
+        archived = [activity for activity in archived if (activity.created_at, activity.id) < after]
+    start = 0
+    if live_count == 0 and skip:
+        live = select(func.count()).select_from(Activity).where(Activity.deal_id == deal_id)
+        if after is not None:
+            live = live.where(tuple_(Activity.created_at, Activity.id) < after)
+        start = max(0, skip - db.scalar(live))
+    return archived[start:start + limit - live_count]
+
+
+def closed_deal_ids(db: Session, after_id: int, limit: int) -> list[int]:
+    """The next ``limit`` closed deals in id order, for keyset batching."""
+    return db.scalars(
+        select(Deal.id).where(CLOSED_DEAL, Deal.id > after_id).order_by(Deal.id).limit(limit)
+    ).all()
+
+
+def archive_deals(db: Session, deal_ids: list[int], idle_before: datetime) -> dict[int, int]:
+    """Archive the live activities of those deals with no activity since ``idle_before``.
+
+    Merges into an existing archive when a deal was archived before and has
+    been commented on since. Returns {deal_id: activities moved}. Only rows
+    older than ``idle_before`` are read and deleted, so an activity added
+    while the job runs is never lost. The caller commits.
+    """
+    busy = set(db.scalars(
+        select(Activity.deal_id).where(Activity.deal_id.in_(deal_ids), Activity.created_at >= idle_before).distinct()
+    ))
+    idle_ids = [deal_id for deal_id in deal_ids if deal_id not in busy]
+    if not idle_ids:
+        return {}
+    rows = db.execute(
+        select(Activity.deal_id, *ENTRY_COLUMNS)
+        .where(Activity.deal_id.in_(idle_ids), Activity.created_at < idle_before)
+        .order_by(Activity.deal_id, Activity.created_at.desc(), Activity.id.desc())
+    ).all()
+    by_deal: dict[int, list] = {}
+    for row in rows:
+        by_deal.setdefault(row.deal_id, []).append(row)
+    if not by_deal:
+        return {}
+
+    archives = {
+        archive.deal_id: archive
+        for archive in db.scalars(select(ActivityArchive).where(ActivityArchive.deal_id.in_(list(by_deal))))
+    }
+    for deal_id, deal_rows in by_deal.items():
+        archive = archives.get(deal_id)
+        if archive is None:
+            db.add(ActivityArchive(deal_id=deal_id, activity_count=len(deal_rows), entries=encode_entries(deal_rows)))
+        else:
+            # Rows still live for an archived deal are newer than its archived entries
+            merged = deal_rows + decode_entries(deal_id, archive.entries)
+            archive.activity_count = len(merged)
+            archive.entries = encode_entries(merged)
+    db.execute(
+        delete(Activity)
+        .where(Activity.deal_id.in_(list(by_deal)), Activity.created_at < idle_before)
+        .execution_options(synchronize_session=False)
+    )
+    db.flush()
+    invalidate_on_commit(db, *(activities_tag(deal_id) for deal_id in by_deal))
+    return {deal_id: len(deal_rows) for deal_id, deal_rows in by_deal.items()}
@@ -1,5 +1,5 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Enum as SQLEnum, Text
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, LargeBinary, String, ForeignKey, DateTime, Enum as SQLEnum, Text, Index
+from sqlalchemy.orm import deferred, relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
 import enum
@@ -15,15 +15,35 @@ class ActivityType(str, enum.Enum):
 
 
 class Activity(Base):
+    """One entry of a deal's activity log.
+
+    On Postgres the table is range-partitioned by month on created_at (see
+    app.activities.partitions), with primary key (id, created_at).
+    """
     __tablename__ = "activities"
     
     id = Column(Integer, primary_key=True, index=True)
-    deal_id = Column(Integer, ForeignKey("deals.id"), nullable=False, index=True)
+    deal_id = Column(Integer, ForeignKey("deals.id"), nullable=False)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     activity_type = Column(SQLEnum(ActivityType), nullable=False)
     description = Column(Text, nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    
+    # Serves the deal feed order and its (created_at, id) keyset cursor, and
+    # any other lookup by deal_id
+    __table_args__ = (Index("ix_activities_deal_created_at_id", "deal_id", "created_at", "id"),)
     
     # Relationships
     deal = relationship("Deal", back_populates="activities")
     user = relationship("User", back_populates="activities")
+
+
+class ActivityArchive(Base):
+    """The archived activity log of a closed deal (see app.activities.archive)."""
+    __tablename__ = "activity_archives"
+    
+    deal_id = Column(Integer, ForeignKey("deals.id"), primary_key=True)
+    activity_count = Column(Integer, nullable=False)
+    archived_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    # zlib-compressed JSON rows [id, user_id, activity_type, description, created_at], newest first
+    entries = deferred(Column(LargeBinary, nullable=False))
@@ -0,0 +1,80 @@
+"""Monthly range partitions of the activity log (Postgres only).
+
+``activities`` is partitioned by created_at into ``activities_YYYY_MM``
+tables, plus ``activities_default`` for rows outside every partition so an
+insert never fails. Feed queries filter on deal_id and page by created_at,
+so Postgres reads each month through its own small index and skips months
+a cursor has already passed. On SQLite the table is a plain table and these
+functions do nothing.
+"""
+from datetime import date, datetime
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+PARENT = "activities"
+DEFAULT_PARTITION = "activities_default"
+
+
+def month_start(value: datetime | date) -> date:
+    return date(value.year, value.month, 1)
+
+
+def next_month(month: date) -> date:
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARENT}_{month:%Y_%m}"
+
+
+def existing_partitions(conn: Connection) -> set[str]:
+    return set(conn.scalars(text(
+        "SELECT child.relname FROM pg_inherits "
+        "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+        "WHERE parent.relname = :parent"
+    ), {"parent": PARENT}))
+
+
+def ensure_partitions(conn: Connection, start: datetime | date, end: datetime | date) -> list[str]:
+    """Create the monthly partitions covering ``start`` through ``end``; returns the new ones.
+
+    Rows the default partition already holds for a new month are moved
+    into it, so partitions can also be added behind existing data (e.g.
+    before a bulk load of history). When a partition is missing, the parent
+    is locked against writes until the caller commits: a row inserted for
+    that month between the move and the ATTACH would land in the default
+    partition and make the ATTACH fail.
+    """
+    if conn.dialect.name != "postgresql":
+        return []
+    months = []
+    month, last = month_start(start), month_start(end)
+    while month <= last:
+        months.append(month)
+        month = next_month(month)
+    existing = existing_partitions(conn)
+    if all(partition_name(month) in existing for month in months):
+        return []
+    conn.execute(text(f"LOCK TABLE {PARENT} IN SHARE ROW EXCLUSIVE MODE"))
+    # Read again under the lock, in case another job created some meanwhile
+    existing = existing_partitions(conn)
+    created = []
+    for month in months:
+        name = partition_name(month)
+        if name in existing:
+            continue
+        bounds = {"lower": f"{month.isoformat()} 00:00:00+00", "upper": f"{next_month(month).isoformat()} 00:00:00+00"}
+        conn.execute(text(f"CREATE TABLE {name} (LIKE {PARENT} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+        conn.execute(text(
+            f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+            f"WHERE created_at >= CAST(:lower AS timestamptz) AND created_at < CAST(:upper AS timestamptz) RETURNING *) "
+            f"INSERT INTO {name} SELECT * FROM moved"
+        ), bounds)
+        # Bounds are literals: ATTACH PARTITION does not take bind parameters
+        conn.execute(text(
+            f"ALTER TABLE {PARENT} ATTACH PARTITION {name} "
+            f"FOR VALUES FROM ('{bounds['lower']}') TO ('{bounds['upper']}')"
+        ))
+        created.append(name)
+    return created
@@ -1,77 +1,90 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Request, Response, status
 from typing import List
-from app.core.database import get_db
-from app.core.dependencies import get_current_active_user, require_role
+from app.core.database import ServiceRunner, UnitOfWorkRoute, get_runner
+from app.core.dependencies import current_active_user, role_required
+from app.core.conditional import is_fresh, make_etag, not_modified, set_etag, wants_revalidation
+from app.core.response_cache import activities_tag, response_cache
+from app.core.pagination import set_next_cursor
 from app.users.models import User, UserRole
 from app.activities.schemas import ActivityResponse, CommentCreate, VoteResponse
-from app.activities.service import (
-    get_activities_by_deal, add_comment, cast_vote, 
-    approve_deal, decline_deal, get_vote_by_user_and_deal, get_votes_by_deal
-)
+from app.activities import service
 from app.deals.schemas import DealResponse
 
-router = APIRouter(prefix="/activities", tags=["activities"])
+router = APIRouter(prefix="/activities", tags=["activities"], route_class=UnitOfWorkRoute)
 
 
 @router.get("/deal/{deal_id}", response_model=List[ActivityResponse])
-def read_activities_by_deal(
+async def read_activities_by_deal(
     deal_id: int,
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    cursor: str | None = None,
+    run: ServiceRunner = Depends(get_runner),
+    current_user: User = Depends(current_active_user)
 ):
-    activities = get_activities_by_deal(db, deal_id, skip=skip, limit=limit)
-    return activities
+    cached = await response_cache.lookup_async(request, current_user, [activities_tag(deal_id)])
+    if cached.response is not None:
+        return cached.response
+    if wants_revalidation(request):
+        keys = await run(service.get_activity_keys_by_deal, deal_id, skip=skip, limit=limit, cursor=cursor)
+        etag = make_etag(ActivityResponse, [(key.id,) for key in keys])
+        if is_fresh(request, etag):
+            set_next_cursor(response, keys, limit, "created_at", "id")
+            return not_modified(etag, response)
+    activities = await run(service.get_activities_by_deal, deal_id, skip=skip, limit=limit, cursor=cursor)
+    set_next_cursor(response, activities, limit, "created_at", "id")
+    set_etag(response, make_etag(ActivityResponse, [(activity.id,) for activity in activities]))
+    return await cached.fill_async(activities, response)
 
 
 # Partner-only endpoints
 @router.post("/comment", response_model=ActivityResponse, status_code=status.HTTP_201_CREATED)
-def create_comment(
+async def create_comment(
     comment_data: CommentCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_role([UserRole.PARTNER, UserRole.ADMIN, UserRole.ANALYST]))
+    run: ServiceRunner = Depends(get_runner),
+    current_user: User = Depends(role_required([UserRole.PARTNER, UserRole.ADMIN, UserRole.ANALYST]))
 ):
     """Add a comment to a deal. Available to all roles."""
-    return add_comment(db, comment_data.deal_id, current_user.id, comment_data.comment)
+    return await run(service.add_comment, comment_data.deal_id, current_user.id, comment_data.comment)
 
 
 @router.post("/deal/{deal_id}/vote", response_model=VoteResponse, status_code=status.HTTP_201_CREATED)
-def vote_on_deal(
+async def vote_on_deal(
     deal_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_role([UserRole.PARTNER]))
+    run: ServiceRunner = Depends(get_runner),
+    current_user: User = Depends(role_required([UserRole.PARTNER]))
 ):
     """Cast a vote on a deal. Partners only, one vote per partner per deal."""
-    return cast_vote(db, deal_id, current_user.id)
+    return await run(service.cast_vote, deal_id, current_user.id)
 
 
 @router.get("/deal/{deal_id}/vote", response_model=VoteResponse | None)
-def get_user_vote(
+async def get_user_vote(
     deal_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    run: ServiceRunner = Depends(get_runner),
+    current_user: User = Depends(current_active_user)
 ):
     """Check if current user has voted on a deal."""
-    return get_vote_by_user_and_deal(db, deal_id, current_user.id)
+    return await run(service.get_vote_by_user_and_deal, deal_id, current_user.id)
 
 
 @router.post("/deal/{deal_id}/approve", response_model=DealResponse)
-def approve_deal_endpoint(
+async def approve_deal_endpoint(
     deal_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_role([UserRole.PARTNER]))
+    run: ServiceRunner = Depends(get_runner),
+    current_user: User = Depends(role_required([UserRole.PARTNER]))
 ):
     """Approve a deal. Partners only. Changes deal status to APPROVED."""
-    return approve_deal(db, deal_id, current_user.id)
+    return await run(service.approve_deal, deal_id, current_user.id)
 
 
 @router.post("/deal/{deal_id}/decline", response_model=DealResponse)
-def decline_deal_endpoint(
+async def decline_deal_endpoint(
     deal_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_role([UserRole.PARTNER]))
+    run: ServiceRunner = Depends(get_runner),
+    current_user: User = Depends(role_required([UserRole.PARTNER]))
 ):
     """Decline a deal. Partners only. Changes deal status to DECLINED."""
-    return decline_deal(db, deal_id, current_user.id)
+    return await run(service.decline_deal, deal_id, current_user.id)
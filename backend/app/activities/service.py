@@ -1,12 +1,70 @@
+from datetime import datetime
+from sqlalchemy import literal, select, tuple_, update
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
+from app.activities.archive import archived_page
 from app.activities.models import Activity, ActivityType
 from app.activities.schemas import ActivityCreate
 from app.deals.models import Deal, Vote, DealStatus
+from app.deals.schemas import DealResponse
+from app.core.events import publish_on_commit
+from app.core.response_cache import activities_tag, deal_list_tag, deal_tag, invalidate_on_commit
+from app.core.pagination import decode_cursor
 
 
-def get_activities_by_deal(db: Session, deal_id: int, skip: int = 0, limit: int = 100):
-    return db.query(Activity).filter(Activity.deal_id == deal_id).order_by(Activity.created_at.desc()).offset(skip).limit(limit).all()
+def _feed_key(cursor: str | None) -> tuple[datetime, int] | None:
+    return decode_cursor(cursor, datetime, int) if cursor else None
+
+
+def _activity_page(statement, deal_id: int, skip: int, limit: int, after: tuple[datetime, int] | None):
+    statement = statement.where(Activity.deal_id == deal_id).order_by(Activity.created_at.desc(), Activity.id.desc())
+    # Keyset pagination on (created_at, id): newest first, id breaks ties
+    if after is not None:
+        return statement.where(tuple_(Activity.created_at, Activity.id) < after).limit(limit)
+    return statement.offset(skip).limit(limit)
+
+
+def get_activities_by_deal(
+    db: Session,
+    deal_id: int,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str | None = None,
+    archived: bool = True
+):
+    """A page of the deal's feed, newest first.
+
+    Live rows come first; a page they do not fill continues into the
+    deal's archived activities, which are all older (see app.activities.archive).
+    Callers that already know the deal has no archive pass ``archived=False``
+    to skip looking for one.
+    """
+    after = _feed_key(cursor)
+    activities = db.scalars(_activity_page(select(Activity), deal_id, skip, limit, after)).all()
+    if archived and len(activities) < limit:
+        activities = [*activities, *archived_page(db, deal_id, skip, limit, after, len(activities))]
+    return activities
+
+
+def get_activity_keys_by_deal(
+    db: Session,
+    deal_id: int,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str | None = None
+) -> list:
+    """(created_at, id) of the page ``get_activities_by_deal`` would return.
+
+    Activities are never edited, so their ids alone version the page; the
+    covering (deal_id, created_at, id) index answers this without the
+    descriptions.
+    """
+    after = _feed_key(cursor)
+    keys = db.execute(_activity_page(select(Activity.created_at, Activity.id), deal_id, skip, limit, after)).all()
+    if len(keys) < limit:
+        keys = [*keys, *archived_page(db, deal_id, skip, limit, after, len(keys))]
+    return keys
 
 
 def create_activity(
@@ -23,8 +81,8 @@ def create_activity(
         description=description
     )
     db.add(db_activity)
-    db.commit()
-    db.refresh(db_activity)
+    db.flush()
+    invalidate_on_commit(db, activities_tag(deal_id))
     return db_activity
 
 
@@ -39,13 +97,23 @@ def add_comment(
     if not deal:
         raise HTTPException(status_code=404, detail="Deal not found")
     
-    return create_activity(
+    activity = create_activity(
         db=db,
         deal_id=deal_id,
         user_id=user_id,
         activity_type=ActivityType.COMMENT,
         description=comment
     )
+    publish_on_commit(
+        db, "comment.added", deal_id, board=False,
+        activity_id=activity.id, user_id=user_id, description=comment
+    )
+    return activity
+
+
+def _insert_ignoring_conflicts(db: Session):
+    dialect = db.get_bind().dialect.name
+    return postgresql.insert if dialect == "postgresql" else sqlite.insert
 
 
 def cast_vote(
@@ -53,26 +121,36 @@ def cast_vote(
     deal_id: int,
     user_id: int
 ) -> Vote:
-    # Verify deal exists
-    deal = db.query(Deal).filter(Deal.id == deal_id).first()
-    if not deal:
-        raise HTTPException(status_code=404, detail="Deal not found")
-    
-    # Check if user already voted
-    existing_vote = db.query(Vote).filter(
-        Vote.deal_id == deal_id,
-        Vote.user_id == user_id
+    """Record a partner's vote and bump the deal's tally.
+
+    The vote is claimed with one INSERT ... SELECT ... ON CONFLICT DO
+    NOTHING RETURNING: it inserts nothing when the deal does not exist or
+    the partner has already voted, so concurrent clicks resolve to one
+    vote and a 400 instead of a unique-constraint error. The tally is
+    then incremented in place, which locks the deal row until commit.
+    """
+    insert = _insert_ignoring_conflicts(db)
+    created = db.execute(
+        insert(Vote)
+        .from_select(["deal_id", "user_id"], select(Deal.id, literal(user_id)).where(Deal.id == deal_id))
+        .on_conflict_do_nothing(index_elements=[Vote.deal_id, Vote.user_id])
+        .returning(Vote.id, Vote.created_at)
     ).first()
-    
-    if existing_vote:
+    if created is None:
+        if db.scalar(select(Deal.id).where(Deal.id == deal_id)) is None:
+            raise HTTPException(status_code=404, detail="Deal not found")
         raise HTTPException(
             status_code=400,
             detail="You have already voted on this deal"
         )
     
-    # Create vote
-    db_vote = Vote(deal_id=deal_id, user_id=user_id)
-    db.add(db_vote)
+    # updated_at is kept: a vote is not an edit of the deal, though row_version still moves
+    vote_count, stage = db.execute(
+        update(Deal)
+        .where(Deal.id == deal_id)
+        .values(vote_count=Deal.vote_count + 1, updated_at=Deal.updated_at)
+        .returning(Deal.vote_count, Deal.stage)
+    ).one()
     
     # Create activity
     create_activity(
@@ -83,9 +161,9 @@ def cast_vote(
         description="Voted on this deal"
     )
     
-    db.commit()
-    db.refresh(db_vote)
-    return db_vote
+    publish_on_commit(db, "vote.cast", deal_id, user_id=user_id, vote_count=vote_count)
+    invalidate_on_commit(db, deal_tag(deal_id), deal_list_tag(), deal_list_tag(stage.value))
+    return Vote(id=created.id, deal_id=deal_id, user_id=user_id, created_at=created.created_at)
 
 
 def approve_deal(
@@ -109,8 +187,12 @@ def approve_deal(
         description="Approved this deal"
     )
     
-    db.commit()
-    db.refresh(deal)
+    db.flush()
+    publish_on_commit(
+        db, "deal.updated", deal_id, deal=DealResponse.model_validate(deal).model_dump(mode="json"),
+        changed=["status"]
+    )
+    invalidate_on_commit(db, deal_tag(deal_id), deal_list_tag(), deal_list_tag(deal.stage.value))
     return deal
 
 
@@ -135,8 +217,12 @@ def decline_deal(
         description="Declined this deal"
     )
     
-    db.commit()
-    db.refresh(deal)
+    db.flush()
+    publish_on_commit(
+        db, "deal.updated", deal_id, deal=DealResponse.model_validate(deal).model_dump(mode="json"),
+        changed=["status"]
+    )
+    invalidate_on_commit(db, deal_tag(deal_id), deal_list_tag(), deal_list_tag(deal.stage.value))
     return deal
 
 
@@ -0,0 +1,31 @@
+from datetime import datetime
+from fastapi import APIRouter, Depends, Query
+from app.core.database import ServiceRunner, UnitOfWorkRoute, get_runner
+from app.core.dependencies import current_active_user
+from app.users.models import User
+from app.analytics import service
+from app.analytics.schemas import FunnelResponse, TimeInStageResponse
+
+router = APIRouter(prefix="/analytics", tags=["analytics"], route_class=UnitOfWorkRoute)
+
+
+@router.get("/funnel", response_model=FunnelResponse)
+async def read_funnel(
+    start: datetime | None = Query(None, alias="from"),
+    end: datetime | None = Query(None, alias="to"),
+    run: ServiceRunner = Depends(get_runner),
+    current_user: User = Depends(current_active_user)
+):
+    """Stage entries, forward moves, passes and conversion rates within a time range."""
+    return {"start": start, "end": end, "stages": await run(service.get_funnel, start, end)}
+
+
+@router.get("/time-in-stage", response_model=TimeInStageResponse)
+async def read_time_in_stage(
+    start: datetime | None = Query(None, alias="from"),
+    end: datetime | None = Query(None, alias="to"),
+    run: ServiceRunner = Depends(get_runner),
+    current_user: User = Depends(current_active_user)
+):
+    """Median and p90 time spent in each stage, for stints that ended within a time range."""
+    return {"start": start, "end": end, "stages": await run(service.get_time_in_stage, start, end)}
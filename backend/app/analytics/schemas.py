@@ -0,0 +1,30 @@
+from datetime import datetime
+from pydantic import BaseModel
+from app.deals.models import DealStage
+
+
+class StageFunnel(BaseModel):
+    stage: DealStage
+    entered: int
+    advanced: int
+    passed: int
+    conversion_rate: float | None
+
+
+class FunnelResponse(BaseModel):
+    start: datetime | None
+    end: datetime | None
+    stages: list[StageFunnel]
+
+
+class StageDuration(BaseModel):
+    stage: DealStage
+    transitions: int
+    median_seconds: float | None
+    p90_seconds: float | None
+
+
+class TimeInStageResponse(BaseModel):
+    start: datetime | None
+    end: datetime | None
+    stages: list[StageDuration]
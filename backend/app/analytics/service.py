@@ -0,0 +1,121 @@
+from collections import Counter
+from datetime import datetime
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from app.core.database import to_utc
+from app.deals.models import DealStage, DealStageHistory
+
+# Forward order of the pipeline; PASSED is an exit, not a step
+PIPELINE = (DealStage.SOURCED, DealStage.SCREEN, DealStage.DILIGENCE, DealStage.IC, DealStage.INVESTED)
+_POSITION = {stage: position for position, stage in enumerate(PIPELINE)}
+TERMINAL_STAGES = {DealStage.INVESTED, DealStage.PASSED}
+
+
+def _in_range(statement, start: datetime | None, end: datetime | None):
+    if start is not None:
+        statement = statement.where(DealStageHistory.at >= to_utc(start))
+    if end is not None:
+        statement = statement.where(DealStageHistory.at < to_utc(end))
+    return statement
+
+
+def get_funnel(db: Session, start: datetime | None = None, end: datetime | None = None) -> list[dict]:
+    """Per-stage flow within ``[start, end)``: deals entering, advancing and passing.
+
+    ``conversion_rate`` is transitions forward out of a stage over entries
+    into it during the period. Creations and moves are counted separately
+    so both are range seeks on the (from_stage, to_stage, at) index instead
+    of a scan and sort of every row in the period.
+    """
+    stages = list(DealStage)
+    moves = _in_range(
+        select(DealStageHistory.from_stage, DealStageHistory.to_stage, func.count())
+        .where(DealStageHistory.from_stage.in_(stages), DealStageHistory.to_stage.in_(stages))
+        .group_by(DealStageHistory.from_stage, DealStageHistory.to_stage),
+        start, end,
+    )
+    creations = _in_range(
+        select(DealStageHistory.to_stage, func.count())
+        .where(DealStageHistory.from_stage.is_(None), DealStageHistory.to_stage.in_(stages))
+        .group_by(DealStageHistory.to_stage),
+        start, end,
+    )
+    entered, advanced, passed = Counter(), Counter(), Counter()
+    for to_stage, transitions in db.execute(creations):
+        entered[to_stage] += transitions
+    for from_stage, to_stage, transitions in db.execute(moves):
+        entered[to_stage] += transitions
+        if to_stage == DealStage.PASSED:
+            passed[from_stage] += transitions
+        elif _POSITION.get(to_stage, -1) > _POSITION.get(from_stage, len(PIPELINE)):
+            advanced[from_stage] += transitions
+    return [
+        {
+            "stage": stage,
+            "entered": entered[stage],
+            "advanced": advanced[stage],
+            "passed": passed[stage],
+            "conversion_rate": (
+                advanced[stage] / entered[stage] if entered[stage] and stage not in TERMINAL_STAGES else None
+            ),
+        }
+        for stage in DealStage
+    ]
+
+
+def _interpolate(lower: float, upper: float, position: float) -> float:
+    # Linear interpolation between neighbouring ranks, matching Postgres percentile_cont
+    return lower + (upper - lower) * (position - int(position))
+
+
+def _sqlite_percentiles(db: Session, completed: list, start, end, fractions: tuple[float, ...]) -> dict:
+    """Percentiles without a percentile aggregate: count each stage, then seek to the ranks needed.
+
+    The OFFSET walk runs inside the (from_stage, seconds_in_from_stage, at)
+    index, so no durations are sorted or sent to Python beyond two per rank.
+    """
+    seconds = DealStageHistory.seconds_in_from_stage
+    counts = db.execute(_in_range(
+        select(DealStageHistory.from_stage, func.count()).where(*completed).group_by(DealStageHistory.from_stage),
+        start, end,
+    )).all()
+    by_stage = {}
+    for stage, count in counts:
+        values = []
+        for fraction in fractions:
+            position = fraction * (count - 1)
+            neighbours = db.scalars(_in_range(
+                select(seconds).where(*completed, DealStageHistory.from_stage == stage)
+                .order_by(seconds).offset(int(position)).limit(2),
+                start, end,
+            )).all()
+            values.append(_interpolate(neighbours[0], neighbours[-1], position))
+        by_stage[stage] = (count, *values)
+    return by_stage
+
+
+def get_time_in_stage(db: Session, start: datetime | None = None, end: datetime | None = None) -> list[dict]:
+    """Median and p90 time deals spent in each stage, over stints that ended in ``[start, end)``.
+
+    Deals still sitting in a stage are not counted until they leave it.
+    """
+    seconds = DealStageHistory.seconds_in_from_stage
+    completed = [DealStageHistory.from_stage.in_(list(DealStage)), seconds.is_not(None)]
+    if db.get_bind().dialect.name == "postgresql":
+        statement = _in_range(
+            select(
+                DealStageHistory.from_stage,
+                func.count(),
+                func.percentile_cont(0.5).within_group(seconds),
+                func.percentile_cont(0.9).within_group(seconds),
+            ).where(*completed).group_by(DealStageHistory.from_stage),
+            start, end,
+        )
+        by_stage = {stage: (count, median, p90) for stage, count, median, p90 in db.execute(statement)}
+    else:
+        by_stage = _sqlite_percentiles(db, completed, start, end, (0.5, 0.9))
+    stages = []
+    for stage in DealStage:
+        transitions, median, p90 = by_stage.get(stage, (0, None, None))
+        stages.append({"stage": stage, "transitions": transitions, "median_seconds": median, "p90_seconds": p90})
+    return stages
@@ -0,0 +1,47 @@
+import hashlib
+from typing import Iterable
+from fastapi import Request, Response, status
+from pydantic import BaseModel
+
+ETAG_HEADER = "ETag"
+# Clients may keep the body but must revalidate it before every use
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(schema: type[BaseModel], versions: Iterable[tuple]) -> str:
+    """Strong ETag for a representation built with ``schema`` from rows with these versions.
+
+    ``versions`` identifies the row state, e.g. (id, row_version) pairs for
+    mutable rows or ids for append-only ones. The schema's field names are
+    part of the key, so a response shape change after a deploy is not
+    mistaken for an unchanged body.
+    """
+    key = repr((schema.__name__, tuple(schema.model_fields), tuple(tuple(v) for v in versions)))
+    return '"' + hashlib.blake2b(key.encode(), digest_size=16).hexdigest() + '"'
+
+
+def wants_revalidation(request: Request) -> bool:
+    """True when the client sent If-None-Match, i.e. a version probe may save the full fetch."""
+    return "if-none-match" in request.headers
+
+
+def is_fresh(request: Request, etag: str) -> bool:
+    # If-None-Match uses weak comparison (RFC 9110, 13.1.2), so W/ prefixes are ignored
+    header = request.headers.get("if-none-match", "")
+    if header.strip() == "*":
+        return True
+    return etag in (tag.strip().removeprefix("W/") for tag in header.split(","))
+
+
+def set_etag(response: Response, etag: str) -> None:
+    response.headers[ETAG_HEADER] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+
+
+def not_modified(etag: str, response: Response | None = None) -> Response:
+    """304 with no body, carrying the headers the 200 would have had (e.g. the next cursor)."""
+    headers = dict(response.headers) if response is not None else {}
+    headers.pop("content-length", None)
+    not_modified_response = Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    set_etag(not_modified_response, etag)
+    return not_modified_response
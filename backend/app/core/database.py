@@ -1,17 +1,147 @@
-from sqlalchemy import create_engine
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable
+from fastapi import Depends, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.routing import APIRoute
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.sql import functions
 from app.core.config import settings
+from app.core.pool import engine_options, instrument
 
-engine = create_engine(settings.database_url)
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+@compiles(functions.now, "sqlite")
+def _sqlite_now(element, compiler, **kw):
+    # CURRENT_TIMESTAMP has second precision and a different text format from
+    # the one SQLAlchemy binds datetimes with, so server-generated timestamps
+    # would not compare correctly against bound values (e.g. keyset cursors).
+    return "STRFTIME('%Y-%m-%d %H:%M:%f000', 'now')"
+
+
+def to_utc(value: datetime) -> datetime:
+    """An aware datetime converted to UTC; naive values are taken as UTC already.
+
+    Stored timestamps are UTC and SQLite compares them as text, so bounds
+    from another offset must be converted before binding. SQLite also hands
+    back naive datetimes, which are marked as UTC here.
+    """
+    return value.astimezone(timezone.utc) if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def get_async_database_url(database_url: str) -> str:
+    scheme, sep, rest = database_url.partition("://")
+    return f"{ASYNC_DRIVERS.get(scheme, scheme)}{sep}{rest}"
+
+
+engine = create_engine(settings.database_url, **engine_options(settings.database_url, "sync"))
+instrument(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# The async engine is only created in async mode so the sync deployment
+# does not need the async drivers installed.
+async_database_url = settings.async_database_url or get_async_database_url(settings.database_url)
+async_engine = (
+    create_async_engine(async_database_url, **engine_options(async_database_url, "async", is_async=True))
+    if settings.async_mode
+    else None
+)
+if async_engine is not None:
+    instrument(async_engine.sync_engine)
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
 
-def get_db():
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+_AFTER_COMMIT = "after_commit_callbacks"
+
+
+def get_db(request: Request):
     db = SessionLocal()
+    request.state.db = db
     try:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db(request: Request):
+    async with AsyncSessionLocal() as db:
+        request.state.async_db = db
+        yield db
+
+
+# ``await run(service.get_deal, deal_id)`` calls a sync service function with the
+# request's session as its first argument, without blocking the event loop
+ServiceRunner = Callable[..., Awaitable[Any]]
+
+
+async def get_sync_runner(db: Session = Depends(get_db)) -> ServiceRunner:
+    async def run(function: Callable, *args, **kwargs):
+        return await run_in_threadpool(function, db, *args, **kwargs)
+    return run
+
+
+async def get_async_runner(db: AsyncSession = Depends(get_async_db)) -> ServiceRunner:
+    async def run(function: Callable, *args, **kwargs):
+        # run_sync hands the function a Session bound to the AsyncSession's connection
+        return await db.run_sync(function, *args, **kwargs)
+    return run
+
+
+# Routes are written once against a runner; ASYNC_MODE picks the driver behind it
+get_runner = get_async_runner if settings.async_mode else get_sync_runner
+
+
+def after_commit(db: Session, callback: Callable[[], None]) -> None:
+    """Run ``callback`` once the session's current transaction commits.
+
+    Services only flush, so side effects that must not be seen before the
+    data is durable (cache invalidation, notifications) are deferred here.
+    """
+    db.info.setdefault(_AFTER_COMMIT, []).append(callback)
+
+
+@event.listens_for(Session, "after_commit")
+def _run_after_commit(session):
+    for callback in session.info.pop(_AFTER_COMMIT, []):
+        callback()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_commit(session):
+    session.info.pop(_AFTER_COMMIT, None)
+
+
+class UnitOfWorkRoute(APIRoute):
+    """Commits the request's session once, after the endpoint has succeeded.
+
+    Services add and flush but never commit, so a request is a single
+    transaction: an exception anywhere in the endpoint leaves nothing
+    committed, and the session is rolled back when it is closed.
+    """
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def unit_of_work_handler(request: Request) -> Response:
+            response = await handler(request)
+            if request.method not in SAFE_METHODS and response.status_code < 400:
+                db = getattr(request.state, "db", None)
+                if db is not None:
+                    await run_in_threadpool(db.commit)
+                async_db = getattr(request.state, "async_db", None)
+                if async_db is not None:
+                    await async_db.commit()
+            return response
+
+        return unit_of_work_handler
@@ -1,8 +1,12 @@
 from typing import Generator, Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.core.database import get_db
+from app.core.config import settings
+from app.core.database import SessionLocal, get_db, get_async_db
+from app.core.principal_cache import principal_cache
 from app.core.security import decode_access_token
 from app.users.models import User
 from app.users.schemas import UserRole
@@ -10,10 +14,7 @@ from app.users.schemas import UserRole
 security = HTTPBearer()
 
 
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
+def _get_user_id(credentials: HTTPAuthorizationCredentials):
     token = credentials.credentials
     payload = decode_access_token(token)
     if payload is None:
@@ -27,12 +28,24 @@ def get_current_user(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid authentication credentials"
         )
+    return user_id
+
+
+def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db)
+) -> User:
+    user_id = _get_user_id(credentials)
+    user = principal_cache.get(user_id)
+    if user is not None:
+        return user
     user = db.query(User).filter(User.id == user_id).first()
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found"
         )
+    principal_cache.put(user)
     return user
 
 
@@ -51,3 +64,65 @@ def get_current_active_user(current_user: User = Depends(get_current_user)) -> U
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
+
+
+# Async mode dependencies
+
+async def get_current_user_async(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_db)
+) -> User:
+    user_id = _get_user_id(credentials)
+    user = principal_cache.get(user_id)
+    if user is not None:
+        return user
+    result = await db.execute(select(User).filter(User.id == user_id))
+    user = result.scalars().first()
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found"
+        )
+    principal_cache.put(user)
+    return user
+
+
+def require_role_async(required_roles: list[UserRole]):
+    async def role_checker(current_user: User = Depends(get_current_user_async)) -> User:
+        if current_user.role not in required_roles:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Insufficient permissions"
+            )
+        return current_user
+    return role_checker
+
+
+async def get_current_active_user_async(current_user: User = Depends(get_current_user_async)) -> User:
+    if not current_user.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    return current_user
+
+
+# The routes shared by both modes authenticate with the configured mode's session
+current_active_user = get_current_active_user_async if settings.async_mode else get_current_active_user
+role_required = require_role_async if settings.async_mode else require_role
+
+
+def get_active_user_for_token(token: str) -> User | None:
+    """Resolve a bearer token outside the HTTP dependency chain (e.g. a WebSocket handshake).
+
+    Returns None instead of raising, since WebSockets are refused by closing
+    rather than with an HTTP error response.
+    """
+    payload = decode_access_token(token)
+    user_id = payload.get("sub") if payload else None
+    if user_id is None:
+        return None
+    user = principal_cache.get(user_id)
+    if user is None:
+        with SessionLocal() as db:
+            user = db.get(User, int(user_id))
+            if user is not None:
+                principal_cache.put(user)
+    return user if user is not None and user.is_active else None
@@ -0,0 +1,163 @@
+import asyncio
+import itertools
+import json
+import threading
+from collections import defaultdict
+from typing import Iterable
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import after_commit
+
+BOARD_TOPIC = "board"
+
+
+def deal_topic(deal_id: int) -> str:
+    return f"deal:{deal_id}"
+
+
+class Subscription:
+    """One connection's user, topics and bounded queue of encoded events.
+
+    ``revoked`` is set when the user loses access, e.g. is deactivated.
+    """
+
+    def __init__(self, topics: Iterable[str], queue_size: int, user_id: int | None = None):
+        self.topics = set(topics)
+        self.user_id = user_id
+        self.queue: asyncio.Queue[str] = asyncio.Queue(maxsize=queue_size)
+        self.revoked = asyncio.Event()
+
+
+class EventBroker:
+    """In-process pub/sub fanning change events out to live subscribers.
+
+    Services publish from worker threads (sync mode) or the event loop
+    (async mode); delivery always happens on the loop the subscribers run
+    on. Each event is encoded once, whatever the number of subscribers.
+
+    Publishing never waits for a subscriber. When a subscriber's queue is
+    full, its backlog is dropped and replaced by a single ``resync`` event
+    telling the client to re-fetch, so a slow consumer costs a bounded
+    amount of memory and never delays requests or other subscribers.
+
+    Subscribers only receive events published by this process; with
+    several workers a client sees the changes made through its own worker.
+    """
+
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.resyncs = 0
+        self._topics: dict[str, set[Subscription]] = defaultdict(set)
+        self._users: dict[int, set[Subscription]] = defaultdict(set)
+        self._sequence = itertools.count(1)
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._lock = threading.Lock()
+
+    def subscribe(self, topics: Iterable[str], user_id: int | None = None) -> Subscription:
+        """Register a subscriber; must be called from the event loop that will consume it."""
+        self._loop = asyncio.get_running_loop()
+        subscription = Subscription(topics, self.queue_size, user_id)
+        with self._lock:
+            for topic in subscription.topics:
+                self._topics[topic].add(subscription)
+            if user_id is not None:
+                self._users[user_id].add(subscription)
+        return subscription
+
+    def update(self, subscription: Subscription, add: Iterable[str] = (), remove: Iterable[str] = ()) -> None:
+        with self._lock:
+            for topic in remove:
+                subscription.topics.discard(topic)
+                self._discard(topic, subscription)
+            for topic in add:
+                subscription.topics.add(topic)
+                self._topics[topic].add(subscription)
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            for topic in subscription.topics:
+                self._discard(topic, subscription)
+            subscriptions = self._users.get(subscription.user_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._users[subscription.user_id]
+
+    def revoke_user(self, user_id: int) -> None:
+        """Tell the user's subscribers in this process to close their connections."""
+        with self._lock:
+            subscriptions = list(self._users.get(user_id, ()))
+        for subscription in subscriptions:
+            try:
+                self._loop.call_soon_threadsafe(subscription.revoked.set)
+            except RuntimeError:
+                # The loop has shut down along with the connection
+                pass
+
+    def _discard(self, topic: str, subscription: Subscription) -> None:
+        subscribers = self._topics.get(topic)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._topics[topic]
+
+    def publish(self, event_type: str, deal_id: int, board: bool = True, **data) -> None:
+        """Send an event to the deal's subscribers, and to board subscribers if ``board``."""
+        topics = [deal_topic(deal_id), BOARD_TOPIC] if board else [deal_topic(deal_id)]
+        with self._lock:
+            if not any(topic in self._topics for topic in topics):
+                return
+            sequence = next(self._sequence)
+            self.published += 1
+        event = {"seq": sequence, "type": event_type, "deal_id": deal_id, **jsonable_encoder(data)}
+        message = json.dumps(event, separators=(",", ":"))
+        try:
+            self._loop.call_soon_threadsafe(self._deliver, topics, message)
+        except RuntimeError:
+            # The loop has shut down; nobody is left to deliver to
+            pass
+
+    def _deliver(self, topics: list[str], message: str) -> None:
+        with self._lock:
+            subscribers = set().union(*(self._topics.get(topic, ()) for topic in topics))
+        for subscription in subscribers:
+            queue = subscription.queue
+            if queue.full():
+                self.dropped += queue.qsize() + 1
+                while not queue.empty():
+                    queue.get_nowait()
+                self.resyncs += 1
+                queue.put_nowait(json.dumps({"type": "resync"}))
+                continue
+            queue.put_nowait(message)
+            self.delivered += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            subscribers = len(set().union(*self._topics.values()))
+            topics = len(self._topics)
+        return {
+            "subscribers": subscribers,
+            "topics": topics,
+            "queue_size": self.queue_size,
+            "published": self.published,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "resyncs": self.resyncs,
+        }
+
+
+def publish_on_commit(db: Session, event_type: str, deal_id: int, board: bool = True, **data) -> None:
+    """Publish an event once the session's transaction commits.
+
+    ``data`` is captured now, so pass plain values rather than ORM objects
+    that the commit will expire.
+    """
+    after_commit(db, lambda: events.publish(event_type, deal_id, board=board, **data))
+
+
+events = EventBroker(queue_size=settings.event_queue_size)
@@ -0,0 +1,113 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from app.core.config import settings
+from app.core import security
+
+
+class HashingQueueFull(Exception):
+    """Raised when more hashing jobs are waiting than the configured queue allows."""
+
+
+def _timed(fn, *args):
+    # Runs inside the executor; module-level so it can be pickled for processes.
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started
+
+
+class PasswordHasher:
+    """Runs bcrypt on a dedicated bounded executor instead of the request path.
+
+    At most ``workers`` hashes run at once; further jobs wait in the
+    executor's FIFO queue, and jobs beyond ``max_queue`` waiting ones are
+    rejected with ``HashingQueueFull`` (``max_queue=0`` means unbounded).
+    """
+
+    def __init__(self, mode: str, workers: int, max_queue: int):
+        if mode not in ("thread", "process"):
+            raise ValueError(f"Unknown password hash executor mode: {mode}")
+        self.mode = mode
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor: Executor | None = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._max_queued = 0
+        self._submitted = 0
+        self._completed = 0
+        self._rejected = 0
+        self._wait_seconds = 0.0
+        self._run_seconds = 0.0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    if self.mode == "process":
+                        self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                    else:
+                        self._executor = ThreadPoolExecutor(
+                            max_workers=self.workers, thread_name_prefix="password-hash"
+                        )
+        return self._executor
+
+    async def _submit(self, fn, *args):
+        with self._lock:
+            queued = max(0, self._pending - self.workers)
+            if self.max_queue and queued >= self.max_queue:
+                self._rejected += 1
+                raise HashingQueueFull("Password hashing queue is full")
+            self._pending += 1
+            self._submitted += 1
+            self._max_queued = max(self._max_queued, self._pending - self.workers)
+        started = time.perf_counter()
+        run_seconds = 0.0
+        try:
+            loop = asyncio.get_running_loop()
+            result, run_seconds = await loop.run_in_executor(self._get_executor(), _timed, fn, *args)
+            return result
+        finally:
+            with self._lock:
+                self._pending -= 1
+                self._completed += 1
+                self._run_seconds += run_seconds
+                self._wait_seconds += max(0.0, time.perf_counter() - started - run_seconds)
+
+    async def hash(self, password: str) -> str:
+        return await self._submit(security.get_password_hash, password)
+
+    async def verify_and_update(self, plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+        """Verify a password, returning a replacement hash if the stored one is outdated."""
+        return await self._submit(security.verify_and_update_password, plain_password, hashed_password)
+
+    def stats(self) -> dict:
+        with self._lock:
+            completed = self._completed
+            return {
+                "mode": self.mode,
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "in_flight": min(self._pending, self.workers),
+                "queued": max(0, self._pending - self.workers),
+                "max_queued": self._max_queued,
+                "submitted": self._submitted,
+                "completed": completed,
+                "rejected": self._rejected,
+                "avg_wait_seconds": self._wait_seconds / completed if completed else 0.0,
+                "avg_run_seconds": self._run_seconds / completed if completed else 0.0,
+            }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+password_hasher = PasswordHasher(
+    mode=settings.password_hash_executor,
+    workers=settings.password_hash_workers,
+    max_queue=settings.password_hash_max_queue,
+)
@@ -0,0 +1,224 @@
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from app.core.config import settings
+from app.core.sql_timing import observe_statements
+
+PREFIX = "deal_pipeline_"
+
+# Upper bounds in seconds, Prometheus' client defaults
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DB_TIME_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+STATEMENT_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100)
+
+# [statements, seconds] of the request being served. Sync endpoints run in a
+# copy of the request's context and async engines run statements in a
+# greenlet sharing it, so both add to the same list.
+_request_db: ContextVar[list | None] = ContextVar("request_db", default=None)
+
+
+class Histogram:
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def samples(self, name: str, labels: str) -> list[str]:
+        lines, running = [], 0
+        for bound, count in zip((*self.buckets, "+Inf"), self.counts):
+            running += count
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {running}')
+        lines.append(f"{name}_sum{{{labels}}} {self.sum:.6f}")
+        lines.append(f"{name}_count{{{labels}}} {running}")
+        return lines
+
+
+class RouteSeries:
+    """Everything recorded for one method and route template."""
+
+    def __init__(self):
+        self.statuses: dict[int, int] = {}
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.db_seconds = Histogram(DB_TIME_BUCKETS)
+        self.statements = Histogram(STATEMENT_BUCKETS)
+
+
+class Metrics:
+    """Per-route request metrics kept in this process, rendered in Prometheus text format.
+
+    Routes are labelled by their template (``/deals/{deal_id}``), never the
+    raw path, so the number of series stays bounded; requests that match no
+    route share the ``unmatched`` label.
+    """
+
+    def __init__(self, enabled: bool):
+        self.enabled = enabled
+        self.in_flight = 0
+        self._routes: dict[tuple[str, str], RouteSeries] = {}
+        self._lock = threading.Lock()
+
+    def started(self) -> None:
+        with self._lock:
+            self.in_flight += 1
+
+    def finished(self, method: str, route: str, status: int, seconds: float, statements: int, db_seconds: float) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            series = self._routes.get((method, route))
+            if series is None:
+                series = self._routes[(method, route)] = RouteSeries()
+            series.statuses[status] = series.statuses.get(status, 0) + 1
+            series.latency.observe(seconds)
+            series.db_seconds.observe(db_seconds)
+            series.statements.observe(statements)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._routes.clear()
+
+    def render(self) -> list[str]:
+        with self._lock:
+            routes = sorted(self._routes.items())
+            in_flight = self.in_flight
+            lines = [
+                f"# HELP {PREFIX}http_requests_in_flight Requests being served.",
+                f"# TYPE {PREFIX}http_requests_in_flight gauge",
+                f"{PREFIX}http_requests_in_flight {in_flight}",
+                f"# HELP {PREFIX}http_requests_total Requests served, by route and status code.",
+                f"# TYPE {PREFIX}http_requests_total counter",
+            ]
+            for (method, route), series in routes:
+                for status, count in sorted(series.statuses.items()):
+                    lines.append(f'{PREFIX}http_requests_total{{{_labels(method, route)},status="{status}"}} {count}')
+            for name, attribute, help_text in (
+                ("http_request_duration_seconds", "latency", "Time to serve a request, including streaming its body."),
+                ("http_request_db_seconds", "db_seconds", "Time spent executing SQL statements per request."),
+                ("http_request_db_statements", "statements", "SQL statements executed per request."),
+            ):
+                lines.append(f"# HELP {PREFIX}{name} {help_text}")
+                lines.append(f"# TYPE {PREFIX}{name} histogram")
+                for (method, route), series in routes:
+                    lines.extend(getattr(series, attribute).samples(PREFIX + name, _labels(method, route)))
+        return lines
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(method: str, route: str) -> str:
+    return f'method="{method}",route="{_escape(route)}"'
+
+
+class MetricsMiddleware:
+    """Records count, latency, status and SQL time of every HTTP request.
+
+    A plain ASGI middleware rather than a BaseHTTPMiddleware so streamed
+    responses pass through untouched and the per-request cost is a few
+    clock reads and one locked update.
+    """
+
+    def __init__(self, app, metrics: "Metrics"):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.metrics.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        db = [0, 0.0]
+        token = _request_db.set(db)
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        self.metrics.started()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            _request_db.reset(token)
+            self.metrics.finished(scope["method"], _route_label(scope), status, elapsed, db[0], db[1])
+
+
+def _route_label(scope) -> str:
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+    if "endpoint" in scope:
+        # Plain Starlette routes (/openapi.json, /docs) have no parameters
+        return scope["path"]
+    return "unmatched"
+
+
+@observe_statements
+def _count_statement(conn, statement, parameters, executemany, seconds):
+    db = _request_db.get()
+    if db is not None:
+        db[0] += 1
+        db[1] += seconds
+
+
+def family(name: str, help_text: str, samples: list[tuple[str, float]], kind: str = "gauge") -> list[str]:
+    """A metric family; ``samples`` are (label string, value) pairs."""
+    lines = [f"# HELP {PREFIX}{name} {help_text}", f"# TYPE {PREFIX}{name} {kind}"]
+    lines.extend(f"{PREFIX}{name}{{{labels}}} {value}" if labels else f"{PREFIX}{name} {value}" for labels, value in samples)
+    return lines
+
+
+def pool_metrics(pools: dict[str, dict | None]) -> list[str]:
+    """Render ``GET /health/db-pool`` style stats, keyed by engine name."""
+    pools = {name: stats for name, stats in pools.items() if stats is not None}
+    lines = []
+    for name, key, help_text, kind in (
+        ("db_pool_checked_out", "checked_out", "Connections checked out of the pool.", "gauge"),
+        ("db_pool_overflow", "overflow", "Connections open beyond the pool size.", "gauge"),
+        ("db_pool_size", "size", "Configured pool size.", "gauge"),
+        ("db_pool_checkouts_total", "checkouts", "Connection checkouts.", "counter"),
+        ("db_pool_connects_total", "connects", "New database connections opened.", "counter"),
+        ("db_pool_invalidations_total", "invalidations", "Connections discarded as dead.", "counter"),
+        ("db_pool_timeouts_total", "timeouts", "Checkouts that timed out waiting for a connection.", "counter"),
+    ):
+        samples = [(f'engine="{engine}"', stats[key]) for engine, stats in pools.items() if key in stats]
+        if samples:
+            lines.extend(family(name, help_text, samples, kind))
+    name = f"{PREFIX}db_pool_wait_seconds"
+    lines += [f"# HELP {name} Time waited to check out a connection.", f"# TYPE {name} histogram"]
+    for engine, stats in pools.items():
+        for bucket, count in stats["wait_histogram"].items():
+            bound = "+Inf" if bucket == "le_inf" else int(bucket[3:-2]) / 1000
+            lines.append(f'{name}_bucket{{engine="{engine}",le="{bound}"}} {count}')
+        lines.append(f'{name}_sum{{engine="{engine}"}} {stats["wait_seconds_sum"]}')
+        lines.append(f'{name}_count{{engine="{engine}"}} {stats["wait_histogram"]["le_inf"]}')
+    return lines
+
+
+def cache_metrics(stats: dict) -> list[str]:
+    """Render the response cache's per-route counters from ``ResponseCache.stats()``."""
+    routes = stats.get("routes", {})
+    lines = []
+    for name, key, help_text in (
+        ("response_cache_hits_total", "hits", "Responses served from the cache."),
+        ("response_cache_misses_total", "misses", "Cache lookups that went to the database."),
+        ("response_cache_stale_total", "stale", "Cached responses discarded as invalidated."),
+    ):
+        samples = [(f'route="{_escape(route)}"', counts[key]) for route, counts in sorted(routes.items())]
+        lines.extend(family(name, help_text, samples, "counter"))
+    if "invalidations" in stats:
+        lines.extend(family("response_cache_invalidations_total", "Tags invalidated by writes.", [("", stats["invalidations"])], "counter"))
+        lines.extend(family("response_cache_errors_total", "Failed cache reads and writes.", [("", stats["errors"])], "counter"))
+    return lines
+
+
+metrics = Metrics(enabled=settings.metrics_enabled)
@@ -0,0 +1,130 @@
+import threading
+import time
+from bisect import bisect_left
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
+from app.core.config import settings
+
+# Upper bounds of the checkout wait histogram, in milliseconds
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+
+class PoolStats:
+    """Counters and a checkout wait-time histogram for one engine's pool."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.checkouts = 0
+        self.checkins = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.wait_counts = [0] * (len(WAIT_BUCKETS_MS) + 1)
+        self.wait_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def observe_wait(self, seconds: float) -> None:
+        index = bisect_left(WAIT_BUCKETS_MS, seconds * 1000)
+        with self._lock:
+            self.wait_counts[index] += 1
+            self.wait_seconds += seconds
+
+    def count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def snapshot(self, pool) -> dict:
+        with self._lock:
+            waits = list(self.wait_counts)
+            stats = {
+                "checkouts": self.checkouts,
+                "checked_out": self.checkouts - self.checkins,
+                "connects": self.connects,
+                "invalidations": self.invalidations,
+                "timeouts": self.timeouts,
+                "wait_seconds_sum": round(self.wait_seconds, 6),
+            }
+        if isinstance(pool, QueuePool):
+            stats.update(
+                size=pool.size(),
+                checked_in=pool.checkedin(),
+                overflow=max(0, pool.overflow()),
+                max_overflow=pool._max_overflow,
+                timeout=pool.timeout(),
+            )
+        # Cumulative, so each bucket reads "waited at most this long"
+        running, histogram = 0, {}
+        for bound, count in zip((*WAIT_BUCKETS_MS, "inf"), waits):
+            running += count
+            histogram[f"le_{bound}ms" if bound != "inf" else "le_inf"] = running
+        return {"pool": type(pool).__bases__[-1].__name__, **stats, "wait_histogram": histogram}
+
+
+class _TimedCheckout:
+    """Times every checkout, i.e. queueing for a free connection plus opening one when needed."""
+
+    stats: PoolStats
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.stats.count("timeouts")
+            raise
+        finally:
+            self.stats.observe_wait(time.perf_counter() - started)
+
+
+def _pool_class(base, name: str):
+    # The stats live on a class made per engine so pools recreated by
+    # engine.dispose() keep counting into the same PoolStats
+    return type(f"Timed{base.__name__}", (_TimedCheckout, base), {"stats": PoolStats(name)})
+
+
+def engine_options(url: str, name: str, is_async: bool = False) -> dict:
+    """create_engine / create_async_engine arguments for the configured pool."""
+    url = make_url(url)
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        # An in-memory database lives in a single connection; keep the dialect's pool
+        return {}
+    options: dict = {"pool_pre_ping": settings.db_pool_pre_ping}
+    if settings.db_pool_mode == "null":
+        # Every checkout opens a connection and every checkin closes it; the
+        # external pooler (e.g. PgBouncer in transaction mode) does the pooling
+        options["poolclass"] = _pool_class(NullPool, name)
+    elif settings.db_pool_mode == "queue":
+        options.update(
+            poolclass=_pool_class(AsyncAdaptedQueuePool if is_async else QueuePool, name),
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout,
+            pool_recycle=settings.db_pool_recycle,
+        )
+    else:
+        raise ValueError(f"Unknown DB_POOL_MODE: {settings.db_pool_mode!r}")
+    if settings.db_statement_timeout_ms and url.get_backend_name() == "postgresql":
+        timeout = str(settings.db_statement_timeout_ms)
+        if is_async:
+            options["connect_args"] = {"server_settings": {"statement_timeout": timeout}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={timeout}"}
+    return options
+
+
+def instrument(engine: Engine) -> None:
+    """Count checkouts, checkins, new connections and invalidations on the engine's pool."""
+    stats = getattr(engine.pool, "stats", None)
+    if stats is None:
+        return
+    event.listen(engine, "checkout", lambda *args: stats.count("checkouts"))
+    event.listen(engine, "checkin", lambda *args: stats.count("checkins"))
+    event.listen(engine, "connect", lambda *args: stats.count("connects"))
+    # Connections found dead by pre-ping or by an error, e.g. after a failover
+    event.listen(engine, "invalidate", lambda *args: stats.count("invalidations"))
+
+
+def pool_stats(engine: Engine) -> dict | None:
+    stats = getattr(engine.pool, "stats", None)
+    return stats.snapshot(engine.pool) if stats is not None else None
@@ -0,0 +1,140 @@
+import logging
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+from app.core.config import settings
+from app.core.sql_timing import observe_statements
+
+logger = logging.getLogger(__name__)
+
+QUERY_COUNT_HEADER = "X-Query-Count"
+DB_TIME_HEADER = "X-DB-Time"
+
+EXPLAINABLE = ("SELECT", "WITH", "UPDATE", "DELETE")
+
+
+class QueryProfile:
+    """Statements executed within one request or ``capture_queries`` block."""
+
+    def __init__(self):
+        self.statements = 0
+        self.seconds = 0.0
+        self.queries: list[tuple[str, float]] = []
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.statements += 1
+        self.seconds += seconds
+        self.queries.append((statement, seconds))
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        """Identical SQL run at least ``threshold`` times: usually a lazy load in a loop (N+1)."""
+        counts = Counter(statement for statement, _ in self.queries)
+        return [(statement, count) for statement, count in counts.most_common() if count >= threshold]
+
+
+_request_profile: ContextVar[QueryProfile | None] = ContextVar("request_profile", default=None)
+# Active capture_queries blocks; they see every statement on any thread
+_captures: list[QueryProfile] = []
+_captures_lock = threading.Lock()
+
+
+@observe_statements
+def _profile_statement(conn, statement, parameters, executemany, seconds):
+    if conn.info.get("profile_explaining"):
+        return
+    profile = _request_profile.get()
+    if profile is not None:
+        profile.record(statement, seconds)
+        if seconds * 1000 >= settings.slow_query_ms:
+            _log_slow_query(conn, statement, parameters, executemany, seconds)
+    if _captures:
+        with _captures_lock:
+            for capture in _captures:
+                capture.record(statement, seconds)
+
+
+def _log_slow_query(conn, statement, parameters, executemany, elapsed: float) -> None:
+    plan = None
+    if settings.query_profiler_explain and not executemany and statement.lstrip().upper().startswith(EXPLAINABLE):
+        prefix = "EXPLAIN QUERY PLAN " if conn.dialect.name == "sqlite" else "EXPLAIN "
+        conn.info["profile_explaining"] = True
+        try:
+            # EXPLAIN without ANALYZE plans the statement but does not run it
+            rows = conn.exec_driver_sql(prefix + statement, parameters).fetchall()
+            plan = "\n".join(" | ".join(str(column) for column in row) for row in rows)
+        except Exception as e:
+            plan = f"(EXPLAIN failed: {e})"
+        finally:
+            conn.info["profile_explaining"] = False
+    logger.warning("slow query (%.1f ms): %s\n%s", elapsed * 1000, statement, plan or "")
+
+
+class QueryProfilerMiddleware:
+    """Profiles the SQL of each HTTP request (enabled with QUERY_PROFILER_ENABLED).
+
+    Adds ``X-Query-Count`` and ``X-DB-Time`` (milliseconds) to the
+    response, logs statements slower than SLOW_QUERY_MS with their plan,
+    and warns when a request repeats one statement N_PLUS_ONE_THRESHOLD
+    times or more. Streaming responses report what ran before their
+    headers were sent.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile = QueryProfile()
+        token = _request_profile.set(profile)
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (QUERY_COUNT_HEADER.lower().encode(), str(profile.statements).encode()),
+                    (DB_TIME_HEADER.lower().encode(), f"{profile.seconds * 1000:.1f}".encode()),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            _request_profile.reset(token)
+            for statement, count in profile.repeated(settings.n_plus_one_threshold):
+                logger.warning("possible N+1 in %s %s: %d executions of %s", scope["method"], scope["path"], count, statement)
+
+
+@contextmanager
+def capture_queries() -> Iterator[QueryProfile]:
+    """Collect every statement executed while the block runs, on any thread.
+
+    Works with the TestClient, whose requests run on another thread, and
+    does not need the profiler middleware enabled.
+    """
+    profile = QueryProfile()
+    with _captures_lock:
+        _captures.append(profile)
+    try:
+        yield profile
+    finally:
+        with _captures_lock:
+            _captures.remove(profile)
+
+
+@contextmanager
+def assert_max_queries(limit: int) -> Iterator[QueryProfile]:
+    """Fail when the block executes more than ``limit`` statements.
+
+        with assert_max_queries(3):
+            client.get("/deals?limit=50", headers=headers)
+    """
+    with capture_queries() as profile:
+        yield profile
+    if profile.statements > limit:
+        listing = "\n".join(f"  {statement}" for statement, _ in profile.queries)
+        raise AssertionError(f"{profile.statements} queries executed, expected at most {limit}:\n{listing}")
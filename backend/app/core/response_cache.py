@@ -0,0 +1,334 @@
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from typing import Any, Iterable
+from urllib.parse import urlencode
+from fastapi import Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from sqlalchemy.orm import Session
+from app.core.conditional import ETAG_HEADER, is_fresh, not_modified
+from app.core.config import settings
+from app.core.database import after_commit
+
+logger = logging.getLogger(__name__)
+
+
+# Tags name what a cached response was built from; writes invalidate them.
+def deal_tag(deal_id: int) -> str:
+    return f"deal:{deal_id}"
+
+
+def deal_list_tag(stage: str | None = None) -> str:
+    """Pages of GET /deals, all of them or those filtered to one stage."""
+    return f"deals:{stage or 'all'}"
+
+
+def memo_tag(deal_id: int) -> str:
+    return f"memo:{deal_id}"
+
+
+def activities_tag(deal_id: int) -> str:
+    return f"activities:{deal_id}"
+
+
+class MemoryBackend:
+    """Bounded LRU + TTL store in this process; each worker has its own.
+
+    Tag generations live outside the LRU so that evicting entries can never
+    reset a generation and revive a stale entry. They cost one integer per
+    tag written since the process started.
+    """
+
+    blocking = False
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        self._generations: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def read(self, key: str, tags: list[str]) -> tuple[bytes | None, list[int]]:
+        with self._lock:
+            generations = [self._generations.get(tag, 0) for tag in tags]
+            entry = self._entries.get(key)
+            if entry is None:
+                return None, generations
+            if entry[0] < time.monotonic():
+                del self._entries[key]
+                return None, generations
+            self._entries.move_to_end(key)
+            return entry[1], generations
+
+    def write(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def bump(self, tags: Iterable[str]) -> None:
+        with self._lock:
+            for tag in tags:
+                self._generations[tag] = self._generations.get(tag, 0) + 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._generations.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"size": len(self._entries), "max_size": self.max_size, "tags": len(self._generations)}
+
+
+class RedisBackend:
+    """Shared store in Redis (or anything speaking its protocol), so every worker sees one cache.
+
+    Entries expire through Redis TTLs; generation counters have none, so
+    run the server with ``maxmemory-policy volatile-lru`` (or noeviction)
+    to keep them from being evicted.
+    """
+
+    blocking = True
+
+    def __init__(self, client, prefix: str = "deal_pipeline:response:"):
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str) -> "RedisBackend":
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("RESPONSE_CACHE_BACKEND=redis needs the redis package (pip install redis)") from e
+        return cls(redis.Redis.from_url(url))
+
+    def _generation_key(self, tag: str) -> str:
+        return f"{self.prefix}gen:{tag}"
+
+    def read(self, key: str, tags: list[str]) -> tuple[bytes | None, list[int]]:
+        # One round trip for the entry and the generations it must match
+        pipe = self.client.pipeline(transaction=False)
+        pipe.get(self.prefix + key)
+        pipe.mget([self._generation_key(tag) for tag in tags])
+        value, generations = pipe.execute()
+        return value, [int(generation or 0) for generation in generations]
+
+    def write(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        self.client.set(self.prefix + key, value, px=max(1, int(ttl_seconds * 1000)))
+
+    def bump(self, tags: Iterable[str]) -> None:
+        pipe = self.client.pipeline(transaction=False)
+        for tag in tags:
+            pipe.incr(self._generation_key(tag))
+        pipe.execute()
+
+    def clear(self) -> None:
+        keys = list(self.client.scan_iter(match=f"{self.prefix}*", count=1000))
+        if keys:
+            self.client.delete(*keys)
+
+    def stats(self) -> dict:
+        return {}
+
+
+class CacheLookup:
+    """Outcome of a cache read: a ready ``response`` on a hit, else what ``fill`` needs to store one."""
+
+    def __init__(self, cache: "ResponseCache | None", request: Request, key: str = "", generations: list[int] | None = None):
+        self.cache = cache
+        self.request = request
+        self.key = key
+        self.generations = generations or []
+        self.response: Response | None = None
+
+    def fill(self, content: Any, response: Response) -> Any:
+        """Serialize ``content`` as the route's response model, store it and return it.
+
+        ``response`` is the endpoint's injected response; its headers (ETag,
+        cursor) are kept with the body. With caching disabled the content is
+        returned untouched for FastAPI to serialize as usual.
+        """
+        if self.cache is None:
+            return content
+        built, value = self.cache.build(self.request, content, response, self.generations)
+        self.cache.store(self.key, value)
+        return built
+
+    async def fill_async(self, content: Any, response: Response) -> Any:
+        if self.cache is None:
+            return content
+        built, value = self.cache.build(self.request, content, response, self.generations)
+        if self.cache.backend.blocking:
+            await run_in_threadpool(self.cache.store, self.key, value)
+        else:
+            self.cache.store(self.key, value)
+        return built
+
+
+class ResponseCache:
+    """Read-through cache of serialized GET responses with tag-based invalidation.
+
+    Entries are keyed by path, query string and the caller's role, and
+    hold the JSON body plus its ETag / cursor headers, so a hit skips the
+    database and Pydantic entirely. Each entry records the generation of
+    its tags as read *before* the database was queried; writes bump the
+    generations of the tags they affect once they commit, and an entry
+    whose generations no longer match is treated as a miss. A write that
+    commits while a miss is being filled therefore leaves the filled entry
+    already stale rather than serving old data until the TTL runs out.
+    """
+
+    def __init__(self, backend, ttl_seconds: float):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.invalidations = 0
+        self.errors = 0
+        self._routes: dict[str, dict[str, int]] = defaultdict(lambda: {"hits": 0, "misses": 0, "stale": 0})
+        self._adapters: dict[Any, TypeAdapter] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    @staticmethod
+    def key(request: Request, role: str) -> str:
+        query = urlencode(sorted(request.query_params.multi_items()))
+        return f"{role}:{request.url.path}?{query}"
+
+    def _count(self, request: Request, outcome: str) -> None:
+        with self._lock:
+            self._routes[request.scope["route"].path][outcome] += 1
+
+    def _count_error(self) -> None:
+        with self._lock:
+            self.errors += 1
+
+    def lookup(self, request: Request, user, tags: list[str]) -> CacheLookup:
+        if not self.enabled:
+            return CacheLookup(None, request)
+        key = self.key(request, user.role.value)
+        try:
+            value, generations = self.backend.read(key, tags)
+        except Exception:
+            # A cache outage degrades to uncached reads
+            logger.exception("response cache read failed")
+            self._count_error()
+            return CacheLookup(None, request)
+        lookup = CacheLookup(self, request, key, generations)
+        if value is not None:
+            meta, body = value.split(b"\n", 1)
+            stored_generations, headers = json.loads(meta)
+            if stored_generations == generations:
+                self._count(request, "hits")
+                lookup.response = self._respond(request, headers, body)
+                return lookup
+            self._count(request, "stale")
+        self._count(request, "misses")
+        return lookup
+
+    async def lookup_async(self, request: Request, user, tags: list[str]) -> CacheLookup:
+        if self.enabled and self.backend.blocking:
+            return await run_in_threadpool(self.lookup, request, user, tags)
+        return self.lookup(request, user, tags)
+
+    @staticmethod
+    def _respond(request: Request, headers: dict, body: bytes) -> Response:
+        etag = headers.get(ETAG_HEADER.lower())
+        if etag is not None and is_fresh(request, etag):
+            return not_modified(etag, Response(headers=headers))
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    def build(self, request: Request, content: Any, response: Response, generations: list[int]) -> tuple[Response, bytes]:
+        """Render ``content`` exactly as FastAPI would for the route; returns the response and the entry to store."""
+        route = request.scope["route"]
+        adapter = self._adapters.get(route.response_model)
+        if adapter is None:
+            adapter = self._adapters[route.response_model] = TypeAdapter(route.response_model)
+        data = adapter.dump_python(adapter.validate_python(content, from_attributes=True), mode="json", by_alias=True)
+        headers = {name: value for name, value in response.headers.items() if name != "content-length"}
+        built = JSONResponse(content=data, headers=headers)
+        return built, json.dumps([list(generations), headers]).encode() + b"\n" + built.body
+
+    def store(self, key: str, value: bytes) -> None:
+        try:
+            self.backend.write(key, value, self.ttl_seconds)
+        except Exception:
+            logger.exception("response cache write failed")
+            self._count_error()
+
+    def invalidate(self, tags: Iterable[str]) -> None:
+        if not self.enabled:
+            return
+        tags = list(dict.fromkeys(tags))
+        try:
+            self.backend.bump(tags)
+        except Exception:
+            # Entries for these tags stay servable until their TTL expires
+            logger.exception("response cache invalidation failed")
+            self._count_error()
+            return
+        with self._lock:
+            self.invalidations += len(tags)
+
+    def clear(self) -> None:
+        if self.enabled:
+            self.backend.clear()
+
+    def stats(self) -> dict:
+        if not self.enabled:
+            return {"backend": "none"}
+        with self._lock:
+            routes = {route: dict(counts) for route, counts in self._routes.items()}
+        for counts in routes.values():
+            lookups = counts["hits"] + counts["misses"]
+            counts["hit_rate"] = counts["hits"] / lookups if lookups else 0.0
+        hits = sum(counts["hits"] for counts in routes.values())
+        misses = sum(counts["misses"] for counts in routes.values())
+        return {
+            "backend": type(self.backend).__name__,
+            "ttl_seconds": self.ttl_seconds,
+            **self.backend.stats(),
+            "hits": hits,
+            "misses": misses,
+            "stale": sum(counts["stale"] for counts in routes.values()),
+            "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+            "invalidations": self.invalidations,
+            "errors": self.errors,
+            "routes": routes,
+        }
+
+
+def invalidate_on_commit(db: Session, *tags: str) -> None:
+    """Invalidate cached responses built from these tags once the transaction commits."""
+    if response_cache.enabled and tags:
+        after_commit(db, lambda: response_cache.invalidate(tags))
+
+
+def _make_backend():
+    if settings.response_cache_backend == "memory":
+        # Only WEB_CONCURRENCY is visible here: a worker cannot see a count
+        # given as ``uvicorn --workers`` or ``gunicorn -w``, so deployments
+        # set the count through the variable, which both servers also read
+        if settings.web_concurrency > 1:
+            raise ValueError(
+                f"RESPONSE_CACHE_BACKEND=memory cannot serve WEB_CONCURRENCY={settings.web_concurrency} workers: "
+                "each keeps its own cache and only the worker handling a write drops its entries. "
+                "Use RESPONSE_CACHE_BACKEND=redis (or none)"
+            )
+        return MemoryBackend(max_size=settings.response_cache_size)
+    if settings.response_cache_backend == "redis":
+        return RedisBackend.from_url(settings.response_cache_url or "redis://localhost:6379/0")
+    if settings.response_cache_backend == "none":
+        return None
+    raise ValueError(f"Unknown RESPONSE_CACHE_BACKEND: {settings.response_cache_backend!r}")
+
+
+response_cache = ResponseCache(_make_backend(), ttl_seconds=settings.response_cache_ttl_seconds)
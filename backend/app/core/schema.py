@@ -0,0 +1,62 @@
+import os
+from functools import lru_cache
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+VERSION_TABLE = "alembic_version"
+
+
+class SchemaOutOfDate(RuntimeError):
+    pass
+
+
+def import_models() -> None:
+    """Register every table on Base.metadata (autogenerate compares against it)."""
+    import app.users.models  # noqa: F401
+    import app.deals.models  # noqa: F401
+    import app.activities.models  # noqa: F401
+    import app.memos.models  # noqa: F401
+
+
+def alembic_config():
+    from alembic.config import Config
+
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "alembic"))
+    return config
+
+
+def upgrade(revision: str = "head") -> None:
+    """Apply migrations up to ``revision``, as ``alembic upgrade`` would."""
+    from alembic import command
+
+    config = alembic_config()
+    config.attributes["configure_logger"] = False
+    command.upgrade(config, revision)
+
+
+@lru_cache(maxsize=1)
+def head_revisions() -> frozenset[str]:
+    from alembic.script import ScriptDirectory
+
+    return frozenset(ScriptDirectory.from_config(alembic_config()).get_heads())
+
+
+def check_schema(engine: Engine) -> None:
+    """Raise SchemaOutOfDate unless the database is migrated to the latest revision.
+
+    One query; run at startup in place of creating tables, so workers never
+    race on DDL. Migrations are applied beforehand with ``alembic upgrade head``.
+    """
+    with engine.connect() as conn:
+        if not engine.dialect.has_table(conn, VERSION_TABLE):
+            current = set()
+        else:
+            current = set(conn.scalars(text(f"SELECT version_num FROM {VERSION_TABLE}")))
+    expected = head_revisions()
+    if current != expected:
+        raise SchemaOutOfDate(
+            f"database schema is at {', '.join(sorted(current)) or 'no revision'}, "
+            f"expected {', '.join(sorted(expected))}; run `alembic upgrade head` from backend/"
+        )
@@ -0,0 +1,39 @@
+"""One engine-wide timer for SQL statements, read by the metrics and the profiler.
+
+Each consumer registers a callback with ``observe_statements``; it is
+called after every statement with the connection, the SQL, its
+parameters, whether it was an executemany, and the seconds it took. A
+callback decides for itself whether the statement belongs to anything it
+is recording (e.g. the current request) and should return quickly when not.
+"""
+import time
+from typing import Any, Callable
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine
+
+StatementObserver = Callable[[Connection, str, Any, bool, float], None]
+
+_observers: list[StatementObserver] = []
+
+
+def observe_statements(observer: StatementObserver) -> StatementObserver:
+    """Register ``observer`` for every statement on every engine; usable as a decorator."""
+    _observers.append(observer)
+    return observer
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _statement_started(conn, cursor, statement, parameters, context, executemany):
+    if _observers:
+        # A stack, since an observer may itself run a statement (e.g. EXPLAIN) on this connection
+        conn.info.setdefault("statement_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _statement_finished(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get("statement_started")
+    if not started:
+        return
+    elapsed = time.perf_counter() - started.pop()
+    for observer in _observers:
+        observer(conn, statement, parameters, executemany, elapsed)
@@ -1,6 +1,6 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Enum as SQLEnum, Numeric, UniqueConstraint
+from sqlalchemy import Column, Float, Integer, String, ForeignKey, DateTime, Enum as SQLEnum, Numeric, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, literal_column
 from app.core.database import Base
 import enum
 
@@ -31,27 +31,70 @@ class Deal(Base):
     round = Column(String, nullable=True)
     check_size = Column(Numeric(15, 2), nullable=True)
     status = Column(SQLEnum(DealStatus), default=DealStatus.ACTIVE, nullable=False)
+    # Denormalized tally of votes, incremented in the same transaction as each vote insert
+    vote_count = Column(Integer, nullable=False, default=0, server_default="0")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Bumped by every UPDATE, ORM or bulk; strong ETags are built from (id, row_version)
+    row_version = Column(Integer, nullable=False, default=1, server_default="1", onupdate=literal_column("row_version") + 1)
+    
+    # Fetch created_at/updated_at/row_version with INSERT/UPDATE ... RETURNING instead of a refresh
+    __mapper_args__ = {"eager_defaults": True}
+    
+    # Serve the Kanban board (cards per stage, optionally per status, in id
+    # order), deal lists by stage and by owner; owner_id also backs the users
+    # foreign key
+    __table_args__ = (
+        Index("ix_deals_stage_status_id", "stage", "status", "id"),
+        Index("ix_deals_stage_id", "stage", "id"),
+        Index("ix_deals_owner_id_id", "owner_id", "id"),
+    )
     
     # Relationships
     owner = relationship("User", back_populates="owned_deals", foreign_keys=[owner_id])
     activities = relationship("Activity", back_populates="deal", cascade="all, delete-orphan")
     memo = relationship("Memo", back_populates="deal", uselist=False, cascade="all, delete-orphan")
     votes = relationship("Vote", back_populates="deal", cascade="all, delete-orphan")
+    stage_history = relationship("DealStageHistory", back_populates="deal", cascade="all, delete-orphan")
+    activity_archive = relationship("ActivityArchive", uselist=False, cascade="all, delete-orphan")
 
 
 class Vote(Base):
     __tablename__ = "votes"
     
     id = Column(Integer, primary_key=True, index=True)
-    deal_id = Column(Integer, ForeignKey("deals.id"), nullable=False, index=True)
+    deal_id = Column(Integer, ForeignKey("deals.id"), nullable=False)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
-    # Ensure one vote per user per deal
+    # Ensure one vote per user per deal; its index also serves lookups by deal
     __table_args__ = (UniqueConstraint('deal_id', 'user_id', name='unique_user_deal_vote'),)
     
     # Relationships
     deal = relationship("Deal", back_populates="votes")
     user = relationship("User")
+
+
+class DealStageHistory(Base):
+    """One row per stage transition; from_stage is NULL for the stage a deal was created in."""
+    __tablename__ = "deal_stage_history"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    deal_id = Column(Integer, ForeignKey("deals.id"), nullable=False)
+    from_stage = Column(SQLEnum(DealStage), nullable=True)
+    to_stage = Column(SQLEnum(DealStage), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    at = Column(DateTime(timezone=True), nullable=False)
+    # How long the deal sat in from_stage, so time-in-stage needs no self-join
+    seconds_in_from_stage = Column(Float, nullable=True)
+    
+    # Covering indexes: funnel counts are range seeks per (from, to) pair, time-in-stage
+    # percentiles walk one stage's durations in order; deal_id/at finds a deal's latest entry
+    __table_args__ = (
+        Index("ix_deal_stage_history_transition_at", "from_stage", "to_stage", "at"),
+        Index("ix_deal_stage_history_stage_seconds", "from_stage", "seconds_in_from_stage", "at"),
+        Index("ix_deal_stage_history_deal_at", "deal_id", "at"),
+    )
+    
+    # Relationships
+    deal = relationship("Deal", back_populates="stage_history")
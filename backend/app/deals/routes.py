@@ -1,68 +1,160 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from typing import List
-from app.core.database import get_db
-from app.core.dependencies import get_current_active_user, require_role
+from app.core.database import ServiceRunner, UnitOfWorkRoute, get_runner
+from app.core.dependencies import current_active_user, role_required
 from app.users.models import User, UserRole
-from app.deals.models import Deal, DealStage
-from app.deals.schemas import DealCreate, DealResponse, DealUpdate
-from app.deals.service import get_deal, get_deals, create_deal, update_deal, delete_deal
+from app.core.conditional import is_fresh, make_etag, not_modified, set_etag, wants_revalidation
+from app.core.response_cache import deal_list_tag, deal_tag, response_cache
+from app.core.pagination import set_next_cursor
+from app.deals import service
+from app.deals.models import DealStage, DealStatus
+from app.deals.schemas import (
+    BoardColumn, BoardResponse, DealBulkRequest, DealBulkResponse, DealCreate,
+    DealDetailResponse, DealResponse, DealUpdate
+)
 
-router = APIRouter(prefix="/deals", tags=["deals"])
+router = APIRouter(prefix="/deals", tags=["deals"], route_class=UnitOfWorkRoute)
 
 
 @router.get("", response_model=List[DealResponse])
-def read_deals(
+async def read_deals(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     stage: DealStage | None = None,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    cursor: str | None = None,
+    run: ServiceRunner = Depends(get_runner),
+    current_user: User = Depends(current_active_user)
 ):
-    deals = get_deals(db, skip=skip, limit=limit, stage=stage)
-    return deals
+    cached = await response_cache.lookup_async(request, current_user, [deal_list_tag(stage.value if stage else None)])
+    if cached.response is not None:
+        return cached.response
+    if wants_revalidation(request):
+        versions = await run(service.get_deal_versions, skip=skip, limit=limit, stage=stage, cursor=cursor)
+        etag = make_etag(DealResponse, versions)
+        if is_fresh(request, etag):
+            set_next_cursor(response, versions, limit, "id")
+            return not_modified(etag, response)
+    deals = await run(service.get_deals, skip=skip, limit=limit, stage=stage, cursor=cursor)
+    set_next_cursor(response, deals, limit, "id")
+    set_etag(response, make_etag(DealResponse, [(deal.id, deal.row_version) for deal in deals]))
+    return await cached.fill_async(deals, response)
+
+
+# Registered before /{deal_id} so "board" is not parsed as a deal id
+@router.get("/board", response_model=BoardResponse)
+async def read_board(
+    limit: int = 20,
+    deal_status: DealStatus | None = Query(None, alias="status"),
+    run: ServiceRunner = Depends(get_runner),
+    current_user: User = Depends(current_active_user)
+):
+    """Per-stage totals and the first `limit` cards of every column."""
+    return {"columns": await run(service.get_board, limit=limit, status=deal_status)}
+
+
+@router.get("/board/{stage}", response_model=BoardColumn)
+async def read_board_column(
+    stage: DealStage,
+    limit: int = 20,
+    cursor: str | None = None,
+    deal_status: DealStatus | None = Query(None, alias="status"),
+    run: ServiceRunner = Depends(get_runner),
+    current_user: User = Depends(current_active_user)
+):
+    """Further cards of one column, continuing from its `next_cursor`."""
+    return await run(service.get_board_column, stage, limit=limit, cursor=cursor, status=deal_status)
 
 
 @router.get("/{deal_id}", response_model=DealResponse)
-def read_deal(
+async def read_deal(
     deal_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    request: Request,
+    response: Response,
+    run: ServiceRunner = Depends(get_runner),
+    current_user: User = Depends(current_active_user)
 ):
-    deal = get_deal(db, deal_id)
+    cached = await response_cache.lookup_async(request, current_user, [deal_tag(deal_id)])
+    if cached.response is not None:
+        return cached.response
+    if wants_revalidation(request):
+        row_version = await run(service.get_deal_row_version, deal_id)
+        if row_version is not None:
+            etag = make_etag(DealResponse, [(deal_id, row_version)])
+            if is_fresh(request, etag):
+                return not_modified(etag)
+    deal = await run(service.get_deal, deal_id)
     if deal is None:
         raise HTTPException(status_code=404, detail="Deal not found")
-    return deal
+    set_etag(response, make_etag(DealResponse, [(deal.id, deal.row_version)]))
+    return await cached.fill_async(deal, response)
+
+
+@router.get("/{deal_id}/detail", response_model=DealDetailResponse)
+async def read_deal_detail(
+    deal_id: int,
+    activity_limit: int = 20,
+    run: ServiceRunner = Depends(get_runner),
+    current_user: User = Depends(current_active_user)
+):
+    """Deal, memo, latest activities, vote count and the caller's vote in one call."""
+    detail = await run(service.get_deal_detail, deal_id, current_user.id, activity_limit=activity_limit)
+    if detail is None:
+        raise HTTPException(status_code=404, detail="Deal not found")
+    return detail
 
 
 @router.post("", response_model=DealResponse, status_code=status.HTTP_201_CREATED)
-def create_new_deal(
+async def create_new_deal(
     deal: DealCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_role([UserRole.ADMIN, UserRole.ANALYST]))
+    run: ServiceRunner = Depends(get_runner),
+    current_user: User = Depends(role_required([UserRole.ADMIN, UserRole.ANALYST]))
+):
+    return await run(service.create_deal, deal, owner_id=current_user.id)
+
+
+@router.post("/bulk", response_model=DealBulkResponse)
+async def bulk_create(
+    request: DealBulkRequest,
+    run: ServiceRunner = Depends(get_runner),
+    current_user: User = Depends(role_required([UserRole.ADMIN, UserRole.ANALYST]))
+):
+    """Create many deals in one transaction. Invalid rows are reported in `errors`."""
+    deals, errors = await run(service.bulk_create_deals, request.deals, owner_id=current_user.id)
+    return {"deals": deals, "errors": errors}
+
+
+@router.patch("/bulk", response_model=DealBulkResponse)
+async def bulk_update(
+    request: DealBulkRequest,
+    run: ServiceRunner = Depends(get_runner),
+    current_user: User = Depends(role_required([UserRole.ADMIN, UserRole.ANALYST]))
 ):
-    return create_deal(db, deal, owner_id=current_user.id)
+    """Update many deals by id in one transaction. Invalid or unknown rows are reported in `errors`."""
+    deals, errors = await run(service.bulk_update_deals, request.deals, user_id=current_user.id)
+    return {"deals": deals, "errors": errors}
 
 
 @router.put("/{deal_id}", response_model=DealResponse)
-def update_existing_deal(
+async def update_existing_deal(
     deal_id: int,
     deal_update: DealUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_role([UserRole.ADMIN, UserRole.ANALYST]))
+    run: ServiceRunner = Depends(get_runner),
+    current_user: User = Depends(role_required([UserRole.ADMIN, UserRole.ANALYST]))
 ):
-    updated_deal = update_deal(db, deal_id, deal_update, user_id=current_user.id)
+    updated_deal = await run(service.update_deal, deal_id, deal_update, user_id=current_user.id)
     if updated_deal is None:
         raise HTTPException(status_code=404, detail="Deal not found")
     return updated_deal
 
 
 @router.delete("/{deal_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_existing_deal(
+async def delete_existing_deal(
     deal_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_role([UserRole.ADMIN, UserRole.ANALYST]))
+    run: ServiceRunner = Depends(get_runner),
+    current_user: User = Depends(role_required([UserRole.ADMIN, UserRole.ANALYST]))
 ):
-    success = delete_deal(db, deal_id)
+    success = await run(service.delete_deal, deal_id)
     if not success:
         raise HTTPException(status_code=404, detail="Deal not found")
@@ -1,7 +1,11 @@
-from pydantic import BaseModel, HttpUrl
+from pydantic import BaseModel, Field, HttpUrl
+from typing import Any
 from datetime import datetime
 from decimal import Decimal
+from app.core.config import settings
 from app.deals.models import DealStage, DealStatus
+from app.activities.schemas import ActivityResponse, VoteResponse
+from app.memos.schemas import MemoResponse
 
 
 class DealBase(BaseModel):
@@ -26,11 +30,74 @@ class DealUpdate(BaseModel):
     status: DealStatus | None = None
 
 
+class DealCard(BaseModel):
+    """The deal fields shown on, and edited from, a board card."""
+    id: int
+    name: str
+    company_url: str | None
+    stage: DealStage
+    round: str | None
+    check_size: Decimal | None
+    status: DealStatus
+    owner_id: int
+    owner_name: str | None
+    vote_count: int
+    created_at: datetime
+    updated_at: datetime | None
+    
+    class Config:
+        from_attributes = True
+
+
+class BoardColumn(BaseModel):
+    stage: DealStage
+    total: int
+    cards: list[DealCard]
+    next_cursor: str | None = None
+
+
+class BoardResponse(BaseModel):
+    columns: list[BoardColumn]
+
+
+class DealBulkUpdateItem(DealUpdate):
+    id: int
+
+
+class DealBulkRequest(BaseModel):
+    # Rows, even ones that are not objects, are validated one by one in the
+    # service so that a bad row is reported in `errors` instead of rejecting
+    # the whole batch.
+    deals: list[Any] = Field(max_length=settings.deal_bulk_max_rows)
+
+
+class BulkRowError(BaseModel):
+    index: int
+    id: int | None = None
+    detail: Any
+
+
 class DealResponse(DealBase):
     id: int
     owner_id: int
+    vote_count: int
     created_at: datetime
     updated_at: datetime | None
     
     class Config:
         from_attributes = True
+
+
+class DealDetailResponse(BaseModel):
+    """Everything the memo viewer needs for one deal, in one response."""
+    deal: DealResponse
+    memo: MemoResponse | None
+    activities: list[ActivityResponse]
+    activities_next_cursor: str | None
+    vote_count: int
+    my_vote: VoteResponse | None
+
+
+class DealBulkResponse(BaseModel):
+    deals: list[DealResponse]
+    errors: list[BulkRowError]
@@ -1,26 +1,219 @@
-from sqlalchemy.orm import Session
-from app.deals.models import Deal, DealStage
-from app.deals.schemas import DealCreate, DealUpdate
-from app.activities.service import create_activity
-from app.activities.models import ActivityType
+from collections import defaultdict
+from datetime import datetime, timezone
+from pydantic import ValidationError
+from sqlalchemy import func, insert, select, union_all, update
+from sqlalchemy.orm import Session, joinedload
+from app.core.database import after_commit, to_utc
+from app.core.events import publish_on_commit
+from app.core.pagination import decode_cursor, encode_cursor
+from app.core.response_cache import activities_tag, deal_list_tag, deal_tag, invalidate_on_commit, memo_tag
+from app.deals.models import Deal, DealStage, DealStageHistory, DealStatus, Vote
+from app.deals.schemas import DealBulkUpdateItem, DealCreate, DealResponse, DealUpdate
+from app.activities.service import create_activity, get_activities_by_deal
+from app.activities.models import Activity, ActivityType
+from app.memos.versioning import diff_cache, version_cache
+from app.search.service import index_deals, remove_deals
+from app.users.models import User
+
+CARD_COLUMNS = (
+    Deal.id, Deal.stage, Deal.name, Deal.company_url, Deal.round, Deal.check_size, Deal.status, Deal.owner_id,
+    Deal.vote_count, Deal.created_at, Deal.updated_at,
+)
+# Deal fields that feed the full-text search documents
+SEARCHABLE_DEAL_FIELDS = {"name", "company_url"}
+# Columns an update may not set to null
+REQUIRED_DEAL_FIELDS = {column.name for column in Deal.__table__.columns if not column.nullable}
 
 
 def get_deal(db: Session, deal_id: int) -> Deal | None:
     return db.query(Deal).filter(Deal.id == deal_id).first()
 
 
-def get_deals(db: Session, skip: int = 0, limit: int = 100, stage: DealStage | None = None):
-    query = db.query(Deal)
+def get_deal_detail(db: Session, deal_id: int, user_id: int, activity_limit: int = 20) -> dict | None:
+    """Deal, memo, the caller's vote and the latest activity page in three statements.
+
+    The memo is joined onto the deal row, which carries the vote tally, so
+    only the caller's own vote is looked up. Activities use the paginated
+    feed query rather than eager loading, which would pull the deal's
+    whole history; the archive row is joined too (without its entries) so
+    the feed only reads the archive of a deal that has one.
+    """
+    deal = (
+        db.query(Deal)
+        .options(joinedload(Deal.memo), joinedload(Deal.activity_archive))
+        .filter(Deal.id == deal_id)
+        .first()
+    )
+    if not deal:
+        return None
+
+    my_vote = db.scalar(select(Vote).where(Vote.deal_id == deal_id, Vote.user_id == user_id))
+    activities = get_activities_by_deal(
+        db, deal_id, limit=activity_limit, archived=deal.activity_archive is not None
+    )
+    return {
+        "deal": deal,
+        "memo": deal.memo,
+        "activities": activities,
+        "activities_next_cursor": (
+            encode_cursor(activities[-1].created_at, activities[-1].id)
+            if activities and len(activities) >= activity_limit else None
+        ),
+        "vote_count": deal.vote_count,
+        "my_vote": my_vote,
+    }
+
+
+def _deal_page(statement, skip: int, limit: int, stage: DealStage | None, cursor: str | None):
     if stage:
-        query = query.filter(Deal.stage == stage)
-    return query.offset(skip).limit(limit).all()
+        statement = statement.where(Deal.stage == stage)
+    statement = statement.order_by(Deal.id)
+    # Keyset pagination: a cursor replaces skip and seeks straight to the page
+    if cursor:
+        (last_id,) = decode_cursor(cursor, int)
+        return statement.where(Deal.id > last_id).limit(limit)
+    return statement.offset(skip).limit(limit)
+
+
+def get_deals(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    stage: DealStage | None = None,
+    cursor: str | None = None
+):
+    return db.scalars(_deal_page(select(Deal), skip, limit, stage, cursor)).all()
+
+
+def get_deal_versions(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    stage: DealStage | None = None,
+    cursor: str | None = None
+) -> list:
+    """(id, row_version) of the deals ``get_deals`` would return, without loading them."""
+    return db.execute(_deal_page(select(Deal.id, Deal.row_version), skip, limit, stage, cursor)).all()
+
+
+def get_deal_row_version(db: Session, deal_id: int) -> int | None:
+    return db.scalar(select(Deal.row_version).where(Deal.id == deal_id))
+
+
+def _board_column(stage: DealStage, total: int, cards: list, has_more: bool) -> dict:
+    return {
+        "stage": stage,
+        "total": total,
+        "cards": cards,
+        "next_cursor": encode_cursor(cards[-1].id) if has_more else None,
+    }
+
+
+def _column_filters(stage: DealStage, status: DealStatus | None) -> list:
+    return [Deal.stage == stage, Deal.status == status] if status else [Deal.stage == stage]
+
+
+def _column_total(filters: list):
+    return select(func.count()).select_from(Deal).where(*filters)
+
+
+def _board_page(filters: list, limit: int, cursor: str | None = None):
+    """Up to ``limit`` + 1 cards of one column and its total, seeking the (stage[, status], id) index."""
+    query = (
+        select(*CARD_COLUMNS, User.full_name.label("owner_name"), _column_total(filters).scalar_subquery().label("total"))
+        .outerjoin(User, User.id == Deal.owner_id)
+        .where(*filters)
+        .order_by(Deal.id)
+    )
+    if cursor:
+        (last_id,) = decode_cursor(cursor, int)
+        query = query.where(Deal.id > last_id)
+    return query.limit(limit + 1)
+
+
+def get_board(db: Session, limit: int = 20, status: DealStatus | None = None) -> list[dict]:
+    """First ``limit`` cards and the total count of every stage, in one statement.
+
+    Each column is its own LIMIT query, combined with UNION ALL, so every
+    stage reads only its first cards from the index instead of ranking
+    all deals.
+    """
+    pages = [_board_page(_column_filters(stage, status), limit).subquery() for stage in DealStage]
+    rows = db.execute(union_all(*(select(page) for page in pages))).all()
+
+    cards_by_stage = {stage: [] for stage in DealStage}
+    totals = {stage: 0 for stage in DealStage}
+    for row in sorted(rows, key=lambda row: row.id):
+        cards_by_stage[row.stage].append(row)
+        totals[row.stage] = row.total
+    return [
+        _board_column(stage, totals[stage], cards_by_stage[stage][:limit], len(cards_by_stage[stage]) > limit)
+        for stage in DealStage
+    ]
+
+
+def get_board_column(
+    db: Session,
+    stage: DealStage,
+    limit: int = 20,
+    cursor: str | None = None,
+    status: DealStatus | None = None
+) -> dict:
+    """One page of a single board column, continuing from a column cursor."""
+    filters = _column_filters(stage, status)
+    rows = db.execute(_board_page(filters, limit, cursor)).all()
+    cards = rows[:limit]
+    total = rows[0].total if rows else db.scalar(_column_total(filters))
+    return _board_column(stage, total, cards, len(rows) > limit)
+
+
+def record_stage_changes(db: Session, changes: list[tuple[int, DealStage | None, DealStage]], user_id: int) -> None:
+    """Append ``(deal_id, from_stage, to_stage)`` transitions to the stage history.
+
+    Each row also records how long the deal spent in ``from_stage``,
+    measured from the deal's previous history entry.
+    """
+    if not changes:
+        return
+    now = datetime.now(timezone.utc)
+    moved = [deal_id for deal_id, from_stage, _ in changes if from_stage is not None]
+    entered_at = dict(db.execute(
+        select(DealStageHistory.deal_id, func.max(DealStageHistory.at))
+        .where(DealStageHistory.deal_id.in_(moved))
+        .group_by(DealStageHistory.deal_id)
+    ).all()) if moved else {}
+    rows = []
+    for deal_id, from_stage, to_stage in changes:
+        seconds = None
+        if from_stage is not None and deal_id in entered_at:
+            seconds = max(0.0, (now - to_utc(entered_at[deal_id])).total_seconds())
+        # A deal moved twice in one batch spent no time in the intermediate stage
+        entered_at[deal_id] = now
+        rows.append({
+            "deal_id": deal_id,
+            "from_stage": from_stage,
+            "to_stage": to_stage,
+            "user_id": user_id,
+            "at": now,
+            "seconds_in_from_stage": seconds,
+        })
+    db.execute(insert(DealStageHistory), rows)
+
+
+def deal_event(deal: Deal) -> dict:
+    """The deal as live-update subscribers see it, captured before the commit expires it."""
+    return DealResponse.model_validate(deal).model_dump(mode="json")
+
+
+def deal_list_tags(stages) -> list[str]:
+    """Cache tags of the deal list pages a deal in any of ``stages`` can appear on."""
+    return [deal_list_tag(), *(deal_list_tag(stage.value) for stage in set(stages))]
 
 
 def create_deal(db: Session, deal: DealCreate, owner_id: int) -> Deal:
     db_deal = Deal(**deal.model_dump(), owner_id=owner_id)
     db.add(db_deal)
-    db.commit()
-    db.refresh(db_deal)
+    db.flush()
     
     # Create initial activity
     create_activity(
@@ -30,6 +223,10 @@ def create_deal(db: Session, deal: DealCreate, owner_id: int) -> Deal:
         activity_type=ActivityType.STAGE_CHANGE,
         description=f"Deal created in {db_deal.stage.value} stage"
     )
+    record_stage_changes(db, [(db_deal.id, None, db_deal.stage)], owner_id)
+    index_deals(db, [db_deal.id])
+    publish_on_commit(db, "deal.created", db_deal.id, deal=deal_event(db_deal))
+    invalidate_on_commit(db, *deal_list_tags([db_deal.stage]))
     
     return db_deal
 
@@ -54,16 +251,158 @@ def update_deal(db: Session, deal_id: int, deal_update: DealUpdate, user_id: int
             activity_type=ActivityType.STAGE_CHANGE,
             description=f"Moved from {old_stage.value} to {db_deal.stage.value}"
         )
+        record_stage_changes(db, [(deal_id, old_stage, db_deal.stage)], user_id)
     
-    db.commit()
-    db.refresh(db_deal)
+    db.flush()
+    if SEARCHABLE_DEAL_FIELDS & update_data.keys():
+        index_deals(db, [deal_id])
+    publish_on_commit(db, "deal.updated", deal_id, deal=deal_event(db_deal), changed=sorted(update_data))
+    invalidate_on_commit(db, deal_tag(deal_id), *deal_list_tags([old_stage, db_deal.stage]))
     return db_deal
 
 
+def _validate_rows(rows: list, schema) -> tuple[list[tuple[int, object]], list[dict]]:
+    valid, errors = [], []
+    for index, row in enumerate(rows):
+        try:
+            valid.append((index, schema.model_validate(row)))
+        except ValidationError as e:
+            errors.append({
+                "index": index,
+                "id": row.get("id") if isinstance(row, dict) else None,
+                "detail": e.errors(include_url=False),
+            })
+    return valid, errors
+
+
+def _load_deals(db: Session, deal_ids: list[int]) -> list[Deal]:
+    # One SELECT for the whole batch rather than a refresh per expired row
+    deals_by_id = {deal.id: deal for deal in db.scalars(select(Deal).where(Deal.id.in_(deal_ids)))}
+    return [deals_by_id[deal_id] for deal_id in deal_ids]
+
+
+def bulk_create_deals(db: Session, rows: list, owner_id: int) -> tuple[list[Deal], list[dict]]:
+    """Insert the valid rows and their creation activities in one transaction.
+
+    Deals go in as a single multi-row INSERT ... RETURNING and activities as
+    one executemany, instead of two commits per deal. Invalid rows are
+    reported by index and skipped.
+    """
+    valid, errors = _validate_rows(rows, DealCreate)
+    if not valid:
+        return [], errors
+
+    created = db.execute(
+        insert(Deal).returning(Deal.id, Deal.stage),
+        [{**deal.model_dump(), "owner_id": owner_id} for _, deal in valid],
+    ).all()
+    db.execute(insert(Activity), [
+        {
+            "deal_id": deal_id,
+            "user_id": owner_id,
+            "activity_type": ActivityType.STAGE_CHANGE,
+            "description": f"Deal created in {stage.value} stage",
+        }
+        for deal_id, stage in created
+    ])
+    record_stage_changes(db, [(deal_id, None, stage) for deal_id, stage in created], owner_id)
+    deal_ids = sorted(deal_id for deal_id, _ in created)
+    index_deals(db, deal_ids)
+    deals = _load_deals(db, deal_ids)
+    for db_deal in deals:
+        publish_on_commit(db, "deal.created", db_deal.id, deal=deal_event(db_deal))
+    # Bulk-inserted activities bypass create_activity, so their feeds are invalidated here
+    invalidate_on_commit(
+        db, *deal_list_tags(stage for _, stage in created), *(activities_tag(deal_id) for deal_id in deal_ids)
+    )
+    return deals, errors
+
+
+def _update_row_error(values: dict) -> str | None:
+    fields = values.keys() - {"id"}
+    if not fields:
+        return "No fields to update"
+    nulls = sorted(field for field in fields & REQUIRED_DEAL_FIELDS if values[field] is None)
+    if nulls:
+        return f"{', '.join(nulls)} cannot be null"
+    return None
+
+
+def bulk_update_deals(db: Session, rows: list, user_id: int) -> tuple[list[Deal], list[dict]]:
+    """Apply partial updates to many deals in one transaction.
+
+    Rows that fail validation, change nothing, null a required field or name
+    an unknown deal are reported by index; the rest are written with an executemany UPDATE plus one executemany
+    INSERT each of STAGE_CHANGE activities and stage history rows for the
+    deals whose stage moved.
+    """
+    valid, errors = _validate_rows(rows, DealBulkUpdateItem)
+    items = []
+    for index, item in valid:
+        values = item.model_dump(exclude_unset=True)
+        if detail := _update_row_error(values):
+            errors.append({"index": index, "id": item.id, "detail": detail})
+        else:
+            items.append((index, item.id, values))
+    ids = {deal_id for _, deal_id, _ in items}
+    old_stages = dict(db.execute(select(Deal.id, Deal.stage).where(Deal.id.in_(ids))).all()) if ids else {}
+    touched_stages = set(old_stages.values())
+
+    updates, activities, stage_changes = [], [], []
+    for index, deal_id, values in items:
+        if deal_id not in old_stages:
+            errors.append({"index": index, "id": deal_id, "detail": "Deal not found"})
+            continue
+        updates.append(values)
+        new_stage = values.get("stage")
+        if new_stage is not None and new_stage != old_stages[deal_id]:
+            activities.append({
+                "deal_id": deal_id,
+                "user_id": user_id,
+                "activity_type": ActivityType.STAGE_CHANGE,
+                "description": f"Moved from {old_stages[deal_id].value} to {new_stage.value}",
+            })
+            stage_changes.append((deal_id, old_stages[deal_id], new_stage))
+            old_stages[deal_id] = new_stage
+    errors.sort(key=lambda error: error["index"])
+    if not updates:
+        return [], errors
+    
+    db.execute(update(Deal), updates)
+    if activities:
+        db.execute(insert(Activity), activities)
+    touched_stages.update(stage for _, _, stage in stage_changes)
+    record_stage_changes(db, stage_changes, user_id)
+    index_deals(db, list({values["id"] for values in updates if SEARCHABLE_DEAL_FIELDS & values.keys()}))
+    deals = _load_deals(db, list(dict.fromkeys(values["id"] for values in updates)))
+    changed = defaultdict(set)
+    for values in updates:
+        changed[values["id"]].update(values.keys() - {"id"})
+    for db_deal in deals:
+        publish_on_commit(db, "deal.updated", db_deal.id, deal=deal_event(db_deal), changed=sorted(changed[db_deal.id]))
+    invalidate_on_commit(
+        db,
+        *(deal_tag(db_deal.id) for db_deal in deals),
+        *deal_list_tags(touched_stages),
+        *(activities_tag(deal_id) for deal_id, _, _ in stage_changes),
+    )
+    return deals, errors
+
+
 def delete_deal(db: Session, deal_id: int) -> bool:
     db_deal = get_deal(db, deal_id)
     if not db_deal:
         return False
+    if db_deal.memo is not None:
+        # Cached memo versions are keyed by memo id, which the database may reuse
+        memo_id = db_deal.memo.id
+        after_commit(db, lambda: version_cache.invalidate_memo(memo_id))
+        after_commit(db, lambda: diff_cache.invalidate_memo(memo_id))
     db.delete(db_deal)
-    db.commit()
+    remove_deals(db, [deal_id])
+    db.flush()
+    publish_on_commit(db, "deal.deleted", deal_id)
+    invalidate_on_commit(
+        db, deal_tag(deal_id), memo_tag(deal_id), activities_tag(deal_id), *deal_list_tags([db_deal.stage])
+    )
     return True
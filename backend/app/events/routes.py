@@ -0,0 +1,108 @@
+import asyncio
+import json
+import re
+from fastapi import APIRouter, Query, WebSocket, WebSocketDisconnect, status
+from fastapi.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.core.dependencies import get_active_user_for_token
+from app.core.events import BOARD_TOPIC, Subscription, events
+
+router = APIRouter(prefix="/events", tags=["events"])
+
+TOPIC = re.compile(rf"^({BOARD_TOPIC}|deal:\d+)$")
+MAX_EVENTS_PER_FRAME = 64
+# How often an open connection re-checks its user. A deactivation made
+# through this worker closes the connection at once; one made through
+# another worker is seen once the cached principal here expires.
+MIN_ACCESS_CHECK_SECONDS = 1.0
+
+
+def _invalid_topics(topics: list[str]) -> list[str]:
+    return [topic for topic in topics if not isinstance(topic, str) or not TOPIC.match(topic)]
+
+
+async def _send_events(websocket: WebSocket, subscription: Subscription) -> None:
+    queue = subscription.queue
+    while True:
+        # Whatever queued up while the last frame was being sent goes out as one frame
+        messages = [await queue.get()]
+        while not queue.empty() and len(messages) < MAX_EVENTS_PER_FRAME:
+            messages.append(queue.get_nowait())
+        await websocket.send_text("\n".join(messages))
+
+
+async def _watch_access(token: str, subscription: Subscription) -> None:
+    """Return once the connection's user is deactivated or its token expires."""
+    interval = max(MIN_ACCESS_CHECK_SECONDS, settings.principal_cache_ttl_seconds)
+    while True:
+        try:
+            await asyncio.wait_for(subscription.revoked.wait(), timeout=interval)
+            return
+        except asyncio.TimeoutError:
+            if await run_in_threadpool(get_active_user_for_token, token) is None:
+                return
+
+
+async def _receive_commands(websocket: WebSocket, subscription: Subscription) -> None:
+    while True:
+        try:
+            command = json.loads(await websocket.receive_text())
+            add, remove = command.get("subscribe", []), command.get("unsubscribe", [])
+        except (ValueError, AttributeError):
+            await websocket.send_json({"type": "error", "detail": "Expected a JSON object"})
+            continue
+        # A string or number would be iterated (or fail to be) below; non-string items are rejected as topics
+        if not isinstance(add, list) or not isinstance(remove, list):
+            await websocket.send_json({"type": "error", "detail": "subscribe and unsubscribe must be lists of topics"})
+            continue
+        invalid = _invalid_topics([*add, *remove])
+        if invalid:
+            await websocket.send_json({"type": "error", "detail": f"Unknown topics: {invalid}"})
+            continue
+        events.update(subscription, add=add, remove=remove)
+        await websocket.send_json({"type": "subscribed", "topics": sorted(subscription.topics)})
+
+
+@router.websocket("/ws")
+async def live_updates(
+    websocket: WebSocket,
+    token: str = Query(...),
+    topic: list[str] = Query([BOARD_TOPIC])
+):
+    """Push deal, vote, comment and memo changes as they are committed.
+
+    Topics are ``board`` (deal created / updated / deleted and votes, for
+    every deal) and ``deal:<id>`` (everything about one deal). Send
+    ``{"subscribe": [...]}`` or ``{"unsubscribe": [...]}`` to change them.
+    Each text frame holds one or more events, one JSON object per line.
+    A ``resync`` event means updates were dropped and the client should
+    re-fetch what it shows. The connection is closed with 1008 once its
+    user is deactivated or its token expires.
+    """
+    # Browsers cannot set headers on a WebSocket, so the token comes as a query parameter
+    user = await run_in_threadpool(get_active_user_for_token, token)
+    if user is None or _invalid_topics(topic):
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    await websocket.accept()
+    subscription = events.subscribe(topic, user_id=user.id)
+    try:
+        await websocket.send_json({"type": "subscribed", "topics": sorted(subscription.topics)})
+        access = asyncio.create_task(_watch_access(token, subscription))
+        tasks = {
+            access,
+            asyncio.create_task(_send_events(websocket, subscription)),
+            asyncio.create_task(_receive_commands(websocket, subscription)),
+        }
+        # Either side ending (client gone, send failed) or access ending ends the connection
+        done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in pending:
+            task.cancel()
+        for task in done:
+            task.exception()
+        if access in done and not access.exception():
+            await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        events.unsubscribe(subscription)
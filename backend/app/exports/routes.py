@@ -0,0 +1,72 @@
+from datetime import datetime
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from app.core.dependencies import current_active_user
+from app.users.models import User
+from app.activities.models import ActivityType
+from app.deals.models import DealStage, DealStatus
+from app.exports.schemas import ExportFormat
+from app.exports.service import (
+    stream_export, deals_export_query, activities_export_query, memos_export_query
+)
+
+router = APIRouter(prefix="/exports", tags=["exports"])
+
+MEDIA_TYPES = {
+    ExportFormat.CSV: "text/csv",
+    ExportFormat.NDJSON: "application/x-ndjson",
+}
+
+
+def _export_response(statement, export_format: ExportFormat, name: str) -> StreamingResponse:
+    # The generator is sync and opens its own session, so Starlette iterates
+    # it on the threadpool in either mode, one batch at a time
+    return StreamingResponse(
+        stream_export(statement, export_format),
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{name}.{export_format.value}"'},
+    )
+
+
+@router.get("/deals")
+async def export_deals(
+    export_format: ExportFormat = Query(ExportFormat.CSV, alias="format"),
+    stage: DealStage | None = None,
+    deal_status: DealStatus | None = Query(None, alias="status"),
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+    current_user: User = Depends(current_active_user)
+):
+    """Stream all matching deals as CSV or NDJSON."""
+    statement = deals_export_query(stage, deal_status, created_from, created_to)
+    return _export_response(statement, export_format, "deals")
+
+
+@router.get("/activities")
+async def export_activities(
+    export_format: ExportFormat = Query(ExportFormat.CSV, alias="format"),
+    deal_id: int | None = None,
+    activity_type: ActivityType | None = None,
+    stage: DealStage | None = None,
+    deal_status: DealStatus | None = Query(None, alias="status"),
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+    current_user: User = Depends(current_active_user)
+):
+    """Stream matching activities as CSV or NDJSON. Stage and status filter on the activity's deal."""
+    statement = activities_export_query(deal_id, activity_type, stage, deal_status, created_from, created_to)
+    return _export_response(statement, export_format, "activities")
+
+
+@router.get("/memos")
+async def export_memos(
+    export_format: ExportFormat = Query(ExportFormat.CSV, alias="format"),
+    stage: DealStage | None = None,
+    deal_status: DealStatus | None = Query(None, alias="status"),
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+    current_user: User = Depends(current_active_user)
+):
+    """Stream matching memos as CSV or NDJSON. Stage and status filter on the memo's deal."""
+    statement = memos_export_query(stage, deal_status, created_from, created_to)
+    return _export_response(statement, export_format, "memos")
@@ -0,0 +1,133 @@
+import csv
+import enum
+import io
+import json
+from datetime import datetime
+from decimal import Decimal
+from typing import Iterator
+from sqlalchemy import Select, select
+from app.core.config import settings
+from app.core.database import SessionLocal, to_utc
+from app.activities.models import Activity, ActivityType
+from app.deals.models import Deal, DealStage, DealStatus
+from app.memos.models import Memo
+from app.exports.schemas import ExportFormat
+
+DEAL_COLUMNS = (
+    Deal.id, Deal.name, Deal.company_url, Deal.owner_id, Deal.stage, Deal.round,
+    Deal.check_size, Deal.status, Deal.created_at, Deal.updated_at,
+)
+ACTIVITY_COLUMNS = (
+    Activity.id, Activity.deal_id, Activity.user_id, Activity.activity_type,
+    Activity.description, Activity.created_at,
+)
+MEMO_COLUMNS = (
+    Memo.id, Memo.deal_id, Memo.created_by_id, Memo.summary, Memo.market, Memo.product,
+    Memo.traction, Memo.risks, Memo.open_questions, Memo.created_at, Memo.updated_at,
+)
+
+
+def _plain(value):
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def _encode_csv(columns: list[str], rows, header: bool) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(columns)
+    writer.writerows([_plain(value) for value in row] for row in rows)
+    return buffer.getvalue()
+
+
+def _encode_ndjson(columns: list[str], rows) -> str:
+    return "".join(
+        json.dumps({column: _plain(value) for column, value in zip(columns, row)}) + "\n"
+        for row in rows
+    )
+
+
+def stream_export(statement: Select, export_format: ExportFormat) -> Iterator[str]:
+    """Stream the rows of ``statement`` in fixed-size batches.
+
+    Rows are fetched as plain tuples through a server-side cursor
+    (``yield_per`` turns on ``stream_results``), so memory stays bounded by
+    the batch size however many rows are exported. The generator owns its
+    session because it keeps running after the request handler returns.
+    """
+    with SessionLocal() as db:
+        result = db.execute(statement.execution_options(yield_per=settings.export_batch_size))
+        columns = list(result.keys())
+        if export_format == ExportFormat.CSV:
+            yield _encode_csv(columns, [], header=True)
+        for rows in result.partitions():
+            if export_format == ExportFormat.CSV:
+                yield _encode_csv(columns, rows, header=False)
+            else:
+                yield _encode_ndjson(columns, rows)
+
+
+def _filter_deals(
+    statement: Select,
+    stage: DealStage | None,
+    status: DealStatus | None
+) -> Select:
+    if stage:
+        statement = statement.where(Deal.stage == stage)
+    if status:
+        statement = statement.where(Deal.status == status)
+    return statement
+
+
+def _filter_created(statement: Select, column, created_from: datetime | None, created_to: datetime | None) -> Select:
+    if created_from:
+        statement = statement.where(column >= to_utc(created_from))
+    if created_to:
+        statement = statement.where(column < to_utc(created_to))
+    return statement
+
+
+def deals_export_query(
+    stage: DealStage | None = None,
+    status: DealStatus | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None
+) -> Select:
+    statement = _filter_deals(select(*DEAL_COLUMNS), stage, status)
+    return _filter_created(statement, Deal.created_at, created_from, created_to).order_by(Deal.id)
+
+
+def activities_export_query(
+    deal_id: int | None = None,
+    activity_type: ActivityType | None = None,
+    stage: DealStage | None = None,
+    status: DealStatus | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None
+) -> Select:
+    statement = select(*ACTIVITY_COLUMNS)
+    if deal_id is not None:
+        statement = statement.where(Activity.deal_id == deal_id)
+    if activity_type:
+        statement = statement.where(Activity.activity_type == activity_type)
+    if stage or status:
+        statement = _filter_deals(statement.join(Deal, Deal.id == Activity.deal_id), stage, status)
+    return _filter_created(statement, Activity.created_at, created_from, created_to).order_by(Activity.id)
+
+
+def memos_export_query(
+    stage: DealStage | None = None,
+    status: DealStatus | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None
+) -> Select:
+    statement = select(*MEMO_COLUMNS)
+    if stage or status:
+        statement = _filter_deals(statement.join(Deal, Deal.id == Memo.deal_id), stage, status)
+    return _filter_created(statement, Memo.created_at, created_from, created_to).order_by(Memo.id)
@@ -1,16 +1,70 @@
-from fastapi import FastAPI
+import logging
+import time
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request, status
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
 from app.core.config import settings
-from app.core.database import engine, Base
+from app.core.database import async_engine, engine
+from app.core.pool import pool_stats
+from app.core.schema import SchemaOutOfDate, check_schema
+from app.core.metrics import MetricsMiddleware, cache_metrics, metrics, pool_metrics
+from app.core.profiler import DB_TIME_HEADER, QUERY_COUNT_HEADER, QueryProfilerMiddleware
+from app.core.events import events
+from app.core.principal_cache import principal_cache
+from app.core.response_cache import response_cache
+from app.core.hashing import HashingQueueFull, password_hasher
+from app.core.conditional import ETAG_HEADER
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.memos.versioning import diff_cache, version_cache
 from app.users.routes import router as users_router
 from app.deals.routes import router as deals_router
 from app.activities.routes import router as activities_router
 from app.memos.routes import router as memos_router
+from app.exports.routes import router as exports_router
+from app.search.routes import router as search_router
+from app.analytics.routes import router as analytics_router
+from app.events.routes import router as events_router
 
-# Create tables
-Base.metadata.create_all(bind=engine)
+logger = logging.getLogger(__name__)
+
+# Set when the module starts importing; lifespan reports the time to ready
+_import_started = time.perf_counter()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Schema changes are applied by `alembic upgrade head` before deploying;
+    # workers only verify the revision, so N of them start without DDL races
+    started = time.perf_counter()
+    if settings.schema_check != "off":
+        try:
+            await run_in_threadpool(check_schema, engine)
+        except SchemaOutOfDate:
+            if settings.schema_check == "fail":
+                raise
+            logger.warning("starting with an out-of-date schema", exc_info=True)
+    logger.info(
+        "startup complete in %.0f ms (schema check %.0f ms)",
+        (time.perf_counter() - _import_started) * 1000,
+        (time.perf_counter() - started) * 1000,
+    )
+    yield
+    password_hasher.shutdown()
+
+
+app = FastAPI(title=settings.project_name, lifespan=lifespan)
+
+
+@app.exception_handler(HashingQueueFull)
+def hashing_queue_full_handler(request: Request, exc: HashingQueueFull):
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Too many concurrent logins, please retry"},
+        headers={"Retry-After": "1"},
+    )
 
-app = FastAPI(title=settings.project_name)
 
 # CORS middleware
 app.add_middleware(
@@ -19,13 +73,23 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, ETAG_HEADER, QUERY_COUNT_HEADER, DB_TIME_HEADER],
 )
+app.add_middleware(MetricsMiddleware, metrics=metrics)
+if settings.query_profiler_enabled:
+    app.add_middleware(QueryProfilerMiddleware)
 
-# Include routers
+# Include routers. The users, deals, activities and memos routes reach the
+# database through get_runner, so ASYNC_MODE switches them between the sync
+# and async engines without a second copy of each endpoint.
 app.include_router(users_router)
 app.include_router(deals_router)
 app.include_router(activities_router)
 app.include_router(memos_router)
+app.include_router(exports_router)
+app.include_router(search_router)
+app.include_router(analytics_router)
+app.include_router(events_router)
 
 
 @app.get("/")
@@ -36,3 +100,39 @@ def root():
 @app.get("/health")
 def health_check():
     return {"status": "healthy"}
+
+
+@app.get("/health/cache")
+def cache_stats():
+    return {
+        "principal_cache": principal_cache.stats(),
+        "memo_version_cache": version_cache.stats(),
+        "memo_diff_cache": diff_cache.stats(),
+        "response_cache": response_cache.stats(),
+    }
+
+
+@app.get("/health/db-pool")
+def connection_pool_stats():
+    return {
+        "sync": pool_stats(engine),
+        "async": pool_stats(async_engine.sync_engine) if async_engine is not None else None,
+    }
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    lines = metrics.render()
+    lines += pool_metrics(connection_pool_stats())
+    lines += cache_metrics(response_cache.stats())
+    return PlainTextResponse("\n".join(lines) + "\n", media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.get("/health/events")
+def live_update_stats():
+    return events.stats()
+
+
+@app.get("/health/password-hashing")
+def password_hashing_stats():
+    return password_hasher.stats()
@@ -1,6 +1,6 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text
+from sqlalchemy import Boolean, Column, Integer, LargeBinary, String, ForeignKey, DateTime, Text, Index
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import expression, func, literal_column
 from app.core.database import Base
 
 
@@ -18,6 +18,11 @@ class Memo(Base):
     open_questions = Column(Text, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Bumped by every UPDATE, ORM or bulk; strong ETags are built from (id, row_version)
+    row_version = Column(Integer, nullable=False, default=1, server_default="1", onupdate=literal_column("row_version") + 1)
+    
+    # Fetch created_at/updated_at/row_version with INSERT/UPDATE ... RETURNING instead of a refresh
+    __mapper_args__ = {"eager_defaults": True}
     
     # Relationships
     deal = relationship("Deal", back_populates="memo")
@@ -29,7 +34,7 @@ class MemoVersion(Base):
     __tablename__ = "memo_versions"
     
     id = Column(Integer, primary_key=True, index=True)
-    memo_id = Column(Integer, ForeignKey("memos.id"), nullable=False, index=True)
+    memo_id = Column(Integer, ForeignKey("memos.id"), nullable=False)
     version_number = Column(Integer, nullable=False)
     summary = Column(Text, nullable=True)
     market = Column(Text, nullable=True)
@@ -37,8 +42,16 @@ class MemoVersion(Base):
     traction = Column(Text, nullable=True)
     risks = Column(Text, nullable=True)
     open_questions = Column(Text, nullable=True)
+    # Snapshots hold the full text above; other versions leave it NULL and
+    # store a compressed delta against the previous version instead.
+    is_snapshot = Column(Boolean, nullable=False, default=True, server_default=expression.true())
+    delta = Column(LargeBinary, nullable=True)
     created_by_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
+    # One row per version number; serves history in order, the latest
+    # version and the nearest-snapshot lookup
+    __table_args__ = (Index("ix_memo_versions_memo_id_version_number", "memo_id", "version_number", unique=True),)
+    
     # Relationships
     memo = relationship("Memo", back_populates="versions")
@@ -1,86 +1,121 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from typing import List
-from app.core.database import get_db
-from app.core.dependencies import get_current_active_user, require_role
+from app.core.database import ServiceRunner, UnitOfWorkRoute, get_runner
+from app.core.conditional import is_fresh, make_etag, not_modified, set_etag, wants_revalidation
+from app.core.response_cache import memo_tag, response_cache
+from app.core.dependencies import current_active_user, role_required
 from app.users.models import User, UserRole
-from app.memos.schemas import MemoCreate, MemoResponse, MemoUpdate, MemoVersionResponse
-from app.memos.service import (
-    get_memo_by_deal, get_memo, create_memo, update_memo,
-    get_memo_versions, get_memo_version
+from app.memos.schemas import (
+    MemoCreate, MemoDiffResponse, MemoResponse, MemoUpdate, MemoVersionResponse, MemoVersionSummary
 )
+from app.memos import service
 
-router = APIRouter(prefix="/memos", tags=["memos"])
+router = APIRouter(prefix="/memos", tags=["memos"], route_class=UnitOfWorkRoute)
 
 
 @router.get("/deal/{deal_id}", response_model=MemoResponse)
-def read_memo_by_deal(
+async def read_memo_by_deal(
     deal_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    request: Request,
+    response: Response,
+    run: ServiceRunner = Depends(get_runner),
+    current_user: User = Depends(current_active_user)
 ):
-    memo = get_memo_by_deal(db, deal_id)
+    cached = await response_cache.lookup_async(request, current_user, [memo_tag(deal_id)])
+    if cached.response is not None:
+        return cached.response
+    if wants_revalidation(request):
+        version = await run(service.get_memo_row_version_by_deal, deal_id)
+        if version is not None:
+            etag = make_etag(MemoResponse, [tuple(version)])
+            if is_fresh(request, etag):
+                return not_modified(etag)
+    memo = await run(service.get_memo_by_deal, deal_id)
     if memo is None:
         raise HTTPException(status_code=404, detail="Memo not found for this deal")
-    return memo
+    set_etag(response, make_etag(MemoResponse, [(memo.id, memo.row_version)]))
+    return await cached.fill_async(memo, response)
 
 
 @router.get("/{memo_id}", response_model=MemoResponse)
-def read_memo(
+async def read_memo(
     memo_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    run: ServiceRunner = Depends(get_runner),
+    current_user: User = Depends(current_active_user)
 ):
-    memo = get_memo(db, memo_id)
+    memo = await run(service.get_memo, memo_id)
     if memo is None:
         raise HTTPException(status_code=404, detail="Memo not found")
     return memo
 
 
 @router.get("/{memo_id}/versions", response_model=List[MemoVersionResponse])
-def read_memo_versions(
+async def read_memo_versions(
+    memo_id: int,
+    run: ServiceRunner = Depends(get_runner),
+    current_user: User = Depends(current_active_user)
+):
+    return await run(service.get_memo_versions, memo_id)
+
+
+@router.get("/{memo_id}/versions/index", response_model=List[MemoVersionSummary])
+async def read_memo_version_index(
+    memo_id: int,
+    run: ServiceRunner = Depends(get_runner),
+    current_user: User = Depends(current_active_user)
+):
+    return await run(service.get_memo_version_index, memo_id)
+
+
+@router.get("/{memo_id}/diff", response_model=MemoDiffResponse)
+async def read_memo_diff(
     memo_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    from_version: int = Query(..., alias="from"),
+    to_version: int = Query(..., alias="to"),
+    run: ServiceRunner = Depends(get_runner),
+    current_user: User = Depends(current_active_user)
 ):
-    versions = get_memo_versions(db, memo_id)
-    return versions
+    diff = await run(service.get_memo_diff, memo_id, from_version, to_version)
+    if diff is None:
+        raise HTTPException(status_code=404, detail="Memo version not found")
+    return diff
 
 
 @router.get("/versions/{version_id}", response_model=MemoVersionResponse)
-def read_memo_version(
+async def read_memo_version(
     version_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    run: ServiceRunner = Depends(get_runner),
+    current_user: User = Depends(current_active_user)
 ):
-    version = get_memo_version(db, version_id)
+    version = await run(service.get_memo_version, version_id)
     if version is None:
         raise HTTPException(status_code=404, detail="Memo version not found")
     return version
 
 
 @router.post("", response_model=MemoResponse, status_code=status.HTTP_201_CREATED)
-def create_new_memo(
+async def create_new_memo(
     memo: MemoCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_role([UserRole.ADMIN, UserRole.ANALYST]))
+    run: ServiceRunner = Depends(get_runner),
+    current_user: User = Depends(role_required([UserRole.ADMIN, UserRole.ANALYST]))
 ):
     try:
-        print(memo)
-        print(current_user)
-        return create_memo(db, memo, user_id=current_user.id)
+        return await run(service.create_memo, memo, user_id=current_user.id)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.put("/{memo_id}", response_model=MemoResponse)
-def update_existing_memo(
+async def update_existing_memo(
     memo_id: int,
     memo_update: MemoUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_role([UserRole.ADMIN, UserRole.ANALYST]))
+    run: ServiceRunner = Depends(get_runner),
+    current_user: User = Depends(role_required([UserRole.ADMIN, UserRole.ANALYST]))
 ):
-    updated_memo = update_memo(db, memo_id, memo_update, user_id=current_user.id)
+    try:
+        updated_memo = await run(service.update_memo, memo_id, memo_update, user_id=current_user.id)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
     if updated_memo is None:
         raise HTTPException(status_code=404, detail="Memo not found")
     return updated_memo
@@ -45,3 +45,24 @@ class MemoVersionResponse(BaseModel):
     
     class Config:
         from_attributes = True
+
+
+class MemoVersionSummary(BaseModel):
+    id: int
+    memo_id: int
+    version_number: int
+    created_by_id: int
+    created_at: datetime
+    changed_fields: list[str]
+
+
+class MemoFieldDiff(BaseModel):
+    field: str
+    lines: list[str]
+
+
+class MemoDiffResponse(BaseModel):
+    memo_id: int
+    from_version: int
+    to_version: int
+    fields: list[MemoFieldDiff]
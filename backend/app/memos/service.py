@@ -1,14 +1,29 @@
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
+from app.core.database import after_commit
+from app.core.events import publish_on_commit
+from app.core.response_cache import invalidate_on_commit, memo_tag
 from app.memos.models import Memo, MemoVersion
+from app.memos.versioning import (
+    MEMO_FIELDS, apply_delta, changed_fields, diff_cache, encode_delta, field_diffs,
+    is_snapshot_version, version_cache
+)
 from app.memos.schemas import MemoCreate, MemoUpdate
 from app.activities.service import create_activity
 from app.activities.models import ActivityType
+from app.search.service import index_deals
 
 
 def get_memo_by_deal(db: Session, deal_id: int) -> Memo | None:
     return db.query(Memo).filter(Memo.deal_id == deal_id).first()
 
 
+def get_memo_row_version_by_deal(db: Session, deal_id: int):
+    """(id, row_version) of the deal's memo, or None, without loading the memo text."""
+    return db.execute(select(Memo.id, Memo.row_version).where(Memo.deal_id == deal_id)).first()
+
+
 def get_memo(db: Session, memo_id: int) -> Memo | None:
     return db.query(Memo).filter(Memo.id == memo_id).first()
 
@@ -21,11 +36,13 @@ def create_memo(db: Session, memo: MemoCreate, user_id: int) -> Memo:
     
     db_memo = Memo(**memo.model_dump(exclude={"deal_id"}), deal_id=memo.deal_id, created_by_id=user_id)
     db.add(db_memo)
-    db.commit()
-    db.refresh(db_memo)
+    db.flush()
     
     # Create initial version
     create_memo_version(db, db_memo.id, db_memo, user_id)
+    index_deals(db, [db_memo.deal_id])
+    publish_on_commit(db, "memo.created", db_memo.deal_id, board=False, memo_id=db_memo.id, user_id=user_id)
+    invalidate_on_commit(db, memo_tag(db_memo.deal_id))
     
     return db_memo
 
@@ -42,16 +59,19 @@ def update_memo(db: Session, memo_id: int, memo_update: MemoUpdate, user_id: int
     
     next_version = (latest_version.version_number + 1) if latest_version else 1
     
-    # Save current state as version
-    create_memo_version(db, memo_id, db_memo, user_id, version_number=next_version)
+    # Save current state as version. A concurrent save that claimed the same
+    # number first trips the unique (memo_id, version_number) index
+    try:
+        create_memo_version(db, memo_id, db_memo, user_id, version_number=next_version)
+    except IntegrityError:
+        raise ValueError("Memo was updated concurrently, please retry")
     
     # Update memo
     update_data = memo_update.model_dump(exclude_unset=True)
     for key, value in update_data.items():
         setattr(db_memo, key, value)
     
-    db.commit()
-    db.refresh(db_memo)
+    db.flush()
     
     # Create activity
     create_activity(
@@ -61,10 +81,75 @@ def update_memo(db: Session, memo_id: int, memo_update: MemoUpdate, user_id: int
         activity_type=ActivityType.MEMO_UPDATED,
         description=f"Memo updated (version {next_version})"
     )
+    index_deals(db, [db_memo.deal_id])
+    publish_on_commit(
+        db, "memo.updated", db_memo.deal_id, board=False,
+        memo_id=memo_id, version=next_version, changed=sorted(update_data), user_id=user_id
+    )
+    invalidate_on_commit(db, memo_tag(db_memo.deal_id))
     
     return db_memo
 
 
+def _content(source) -> dict:
+    return {field: getattr(source, field) for field in MEMO_FIELDS}
+
+
+def _version_view(version: MemoVersion, content: dict) -> dict:
+    return {
+        "id": version.id,
+        "memo_id": version.memo_id,
+        "version_number": version.version_number,
+        "created_by_id": version.created_by_id,
+        "created_at": version.created_at,
+        **content,
+    }
+
+
+def _replay(memo_id: int, versions: list[MemoVersion]) -> list[dict]:
+    """Reconstruct the contents of consecutive versions, starting from a snapshot."""
+    contents = []
+    content = None
+    for version in versions:
+        cached = version_cache.get((memo_id, version.version_number))
+        if cached is not None:
+            content = cached
+        elif version.is_snapshot:
+            content = _content(version)
+            version_cache.put((memo_id, version.version_number), content)
+        else:
+            if content is None:
+                raise RuntimeError(f"Memo {memo_id} version {version.version_number} has no base snapshot")
+            content = apply_delta(content, version.delta)
+            version_cache.put((memo_id, version.version_number), content)
+        contents.append(content)
+    return contents
+
+
+def get_version_content(db: Session, memo_id: int, version_number: int) -> dict | None:
+    cached = version_cache.get((memo_id, version_number))
+    if cached is not None:
+        return cached
+    # Only the chain from the nearest snapshot at or before the version is needed
+    base = select(func.max(MemoVersion.version_number)).where(
+        MemoVersion.memo_id == memo_id,
+        MemoVersion.is_snapshot,
+        MemoVersion.version_number <= version_number,
+    ).scalar_subquery()
+    chain = db.scalars(
+        select(MemoVersion)
+        .where(
+            MemoVersion.memo_id == memo_id,
+            MemoVersion.version_number >= base,
+            MemoVersion.version_number <= version_number,
+        )
+        .order_by(MemoVersion.version_number)
+    ).all()
+    if not chain or chain[-1].version_number != version_number:
+        return None
+    return _replay(memo_id, chain)[-1]
+
+
 def create_memo_version(db: Session, memo_id: int, memo: Memo, user_id: int, version_number: int | None = None) -> MemoVersion:
     # Determine version number
     if version_number is None:
@@ -73,26 +158,65 @@ def create_memo_version(db: Session, memo_id: int, memo: Memo, user_id: int, ver
         ).order_by(MemoVersion.version_number.desc()).first()
         version_number = (latest_version.version_number + 1) if latest_version else 1
     
-    db_version = MemoVersion(
-        memo_id=memo_id,
-        version_number=version_number,
-        summary=memo.summary,
-        market=memo.market,
-        product=memo.product,
-        traction=memo.traction,
-        risks=memo.risks,
-        open_questions=memo.open_questions,
-        created_by_id=user_id
-    )
+    content = _content(memo)
+    db_version = MemoVersion(memo_id=memo_id, version_number=version_number, created_by_id=user_id)
+    previous = None if is_snapshot_version(version_number) else get_version_content(db, memo_id, version_number - 1)
+    if previous is None:
+        for field, value in content.items():
+            setattr(db_version, field, value)
+    else:
+        db_version.is_snapshot = False
+        db_version.delta = encode_delta(previous, content)
     db.add(db_version)
-    db.commit()
-    db.refresh(db_version)
+    db.flush()
+    after_commit(db, lambda: version_cache.put((memo_id, version_number), content))
     return db_version
 
 
-def get_memo_versions(db: Session, memo_id: int) -> list[MemoVersion]:
-    return db.query(MemoVersion).filter(MemoVersion.memo_id == memo_id).order_by(MemoVersion.version_number.desc()).all()
+def get_memo_versions(db: Session, memo_id: int) -> list[dict]:
+    versions = db.scalars(
+        select(MemoVersion).where(MemoVersion.memo_id == memo_id).order_by(MemoVersion.version_number)
+    ).all()
+    views = [_version_view(version, content) for version, content in zip(versions, _replay(memo_id, versions))]
+    return views[::-1]
+
+
+def get_memo_version(db: Session, version_id: int) -> dict | None:
+    version = db.query(MemoVersion).filter(MemoVersion.id == version_id).first()
+    if version is None:
+        return None
+    content = _content(version) if version.is_snapshot else get_version_content(db, version.memo_id, version.version_number)
+    return _version_view(version, content)
+
+
+def get_memo_version_index(db: Session, memo_id: int) -> list[dict]:
+    """Version metadata for a version picker: no field text, just what changed."""
+    versions = db.scalars(
+        select(MemoVersion).where(MemoVersion.memo_id == memo_id).order_by(MemoVersion.version_number)
+    ).all()
+    index = []
+    previous = None
+    for version, content in zip(versions, _replay(memo_id, versions)):
+        index.append({
+            "id": version.id,
+            "memo_id": version.memo_id,
+            "version_number": version.version_number,
+            "created_by_id": version.created_by_id,
+            "created_at": version.created_at,
+            "changed_fields": changed_fields(previous, content),
+        })
+        previous = content
+    return index[::-1]
 
 
-def get_memo_version(db: Session, version_id: int) -> MemoVersion | None:
-    return db.query(MemoVersion).filter(MemoVersion.id == version_id).first()
+def get_memo_diff(db: Session, memo_id: int, from_version: int, to_version: int) -> dict | None:
+    key = (memo_id, from_version, to_version)
+    fields = diff_cache.get(key)
+    if fields is None:
+        before = get_version_content(db, memo_id, from_version)
+        after = get_version_content(db, memo_id, to_version)
+        if before is None or after is None:
+            return None
+        fields = field_diffs(before, after)
+        diff_cache.put(key, fields)
+    return {"memo_id": memo_id, "from_version": from_version, "to_version": to_version, "fields": fields}
@@ -0,0 +1,144 @@
+import difflib
+import json
+import re
+import threading
+import zlib
+from collections import OrderedDict
+from app.core.config import settings
+
+MEMO_FIELDS = ("summary", "market", "product", "traction", "risks", "open_questions")
+
+# A word with its trailing whitespace, or leading whitespace on its own
+_TOKEN = re.compile(r"\S+\s*|\s+")
+
+
+def _field_ops(old: str, new: str) -> list:
+    """Word-level edit script turning ``old`` into ``new``.
+
+    Each op is either ``[start, length]`` (copy that slice of ``old``) or a
+    string to insert.
+    """
+    old_tokens = _TOKEN.findall(old)
+    new_tokens = _TOKEN.findall(new)
+    offsets = [0]
+    for token in old_tokens:
+        offsets.append(offsets[-1] + len(token))
+    ops = []
+    matcher = difflib.SequenceMatcher(None, old_tokens, new_tokens, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            ops.append([offsets[i1], offsets[i2] - offsets[i1]])
+        elif j2 > j1:
+            ops.append("".join(new_tokens[j1:j2]))
+    return ops
+
+
+def _apply_ops(old: str, ops: list) -> str:
+    return "".join(old[op[0]:op[0] + op[1]] if isinstance(op, list) else op for op in ops)
+
+
+def encode_delta(old: dict, new: dict) -> bytes:
+    """Compress the per-field changes from ``old`` to ``new``; unchanged fields are omitted."""
+    delta = {}
+    for field in MEMO_FIELDS:
+        before, after = old[field], new[field]
+        if before == after:
+            continue
+        if after is None:
+            delta[field] = None
+        else:
+            delta[field] = _field_ops(before or "", after)
+    return zlib.compress(json.dumps(delta, separators=(",", ":")).encode(), 9)
+
+
+def apply_delta(old: dict, delta: bytes) -> dict:
+    content = dict(old)
+    for field, ops in json.loads(zlib.decompress(delta)).items():
+        content[field] = None if ops is None else _apply_ops(old[field] or "", ops)
+    return content
+
+
+def is_snapshot_version(version_number: int) -> bool:
+    """Whether a new version with this number is stored as a full snapshot."""
+    if settings.memo_version_storage == "full" or settings.memo_snapshot_interval <= 1:
+        return True
+    return (version_number - 1) % settings.memo_snapshot_interval == 0
+
+
+def changed_fields(before: dict | None, after: dict) -> list[str]:
+    """Fields that differ between two versions; for a first version, the ones that are set."""
+    if before is None:
+        return [field for field in MEMO_FIELDS if after[field]]
+    return [field for field in MEMO_FIELDS if before[field] != after[field]]
+
+
+def field_diffs(before: dict, after: dict, context: int = 3) -> list[dict]:
+    """Unified line diff of every changed field, without the ---/+++ file headers."""
+    diffs = []
+    for field in changed_fields(before, after):
+        lines = difflib.unified_diff(
+            (before[field] or "").splitlines(), (after[field] or "").splitlines(), lineterm="", n=context
+        )
+        diffs.append({"field": field, "lines": list(lines)[2:]})
+    return diffs
+
+
+class MemoCache:
+    """LRU of values derived from immutable memo versions.
+
+    Keys are tuples starting with the memo id; since versions never change
+    once written, entries only need dropping when the memo itself is
+    deleted. Cached values are shared and must be treated as read-only.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple, object] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: tuple, value) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate_memo(self, memo_id: int) -> None:
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == memo_id]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+# Reconstructed contents keyed by (memo_id, version_number)
+version_cache = MemoCache(max_size=settings.memo_version_cache_size)
+# Field diffs keyed by (memo_id, from_version, to_version)
+diff_cache = MemoCache(max_size=settings.memo_diff_cache_size)
@@ -0,0 +1,20 @@
+from fastapi import APIRouter, Depends, Query
+from app.core.database import ServiceRunner, UnitOfWorkRoute, get_runner
+from app.core.dependencies import current_active_user
+from app.users.models import User
+from app.search import service
+from app.search.schemas import SearchResponse
+
+router = APIRouter(prefix="/search", tags=["search"], route_class=UnitOfWorkRoute)
+
+
+@router.get("", response_model=SearchResponse)
+async def search_deals(
+    q: str = Query(..., min_length=1),
+    skip: int = 0,
+    limit: int = 20,
+    run: ServiceRunner = Depends(get_runner),
+    current_user: User = Depends(current_active_user)
+):
+    """Full-text search over deal names, URLs and memo text, best matches first."""
+    return await run(service.search, q, skip=skip, limit=limit)
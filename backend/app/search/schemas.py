@@ -0,0 +1,21 @@
+from pydantic import BaseModel
+from app.deals.models import DealStage, DealStatus
+
+
+class SearchHighlight(BaseModel):
+    field: str
+    snippet: str
+
+
+class SearchResult(BaseModel):
+    deal_id: int
+    name: str
+    stage: DealStage
+    status: DealStatus
+    rank: float
+    highlights: list[SearchHighlight]
+
+
+class SearchResponse(BaseModel):
+    total: int
+    results: list[SearchResult]
@@ -0,0 +1,192 @@
+import html
+import re
+from sqlalchemy import Integer, column, delete, func, insert, literal_column, select, table
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from app.deals.models import Deal
+from app.memos.models import Memo
+
+# Searchable text, in the order of the SQLite FTS5 columns
+SEARCH_FIELDS = (
+    ("name", Deal.name),
+    ("company_url", Deal.company_url),
+    ("summary", Memo.summary),
+    ("market", Memo.market),
+    ("product", Memo.product),
+    ("traction", Memo.traction),
+    ("risks", Memo.risks),
+    ("open_questions", Memo.open_questions),
+)
+# Postgres tsvector weights (A ranks highest) and matching FTS5 bm25 column weights
+PG_WEIGHTS = {"name": "A", "company_url": "A", "summary": "B"}
+FTS5_WEIGHTS = {"name": 10.0, "company_url": 10.0, "summary": 4.0}
+
+TEXT_SEARCH_CONFIG = "english"
+# Inlined rather than bound so asyncpg does not have to infer regconfig / "char" parameter types
+_PG_CONFIG = literal_column(f"'{TEXT_SEARCH_CONFIG}'::regconfig")
+MARK_START, MARK_END = "<mark>", "</mark>"
+# snippet() and ts_headline() wrap matches in these private-use characters
+# rather than the tags, so the text can be HTML-escaped before the tags go in
+_MATCH_START, _MATCH_END = "\ue000", "\ue001"
+
+# Postgres: one weighted tsvector per deal, GIN-indexed
+pg_documents = table("search_documents", column("deal_id", Integer), column("document", TSVECTOR))
+# SQLite: an FTS5 table whose rowid is the deal id
+fts_documents = table("search_documents", column("rowid", Integer), *(column(name) for name, _ in SEARCH_FIELDS))
+
+# Both tables are created by the initial Alembic revision
+
+
+def _is_postgres(db: Session) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+
+def _source(deal_ids: list[int]):
+    return select(Deal.id).outerjoin(Memo, Memo.deal_id == Deal.id).where(Deal.id.in_(deal_ids))
+
+
+def _pg_document():
+    document = None
+    for name, source in SEARCH_FIELDS:
+        weight = literal_column(f"'{PG_WEIGHTS.get(name, 'C')}'")
+        vector = func.setweight(func.to_tsvector(_PG_CONFIG, func.coalesce(source, "")), weight)
+        document = vector if document is None else document.op("||")(vector)
+    return document
+
+
+def remove_deals(db: Session, deal_ids: list[int]) -> None:
+    if not deal_ids:
+        return
+    if _is_postgres(db):
+        db.execute(delete(pg_documents).where(pg_documents.c.deal_id.in_(deal_ids)))
+    else:
+        db.execute(delete(fts_documents).where(fts_documents.c.rowid.in_(deal_ids)))
+
+
+def index_deals(db: Session, deal_ids: list[int]) -> None:
+    """(Re)build the search documents of these deals from their current deal and memo text.
+
+    Runs in the caller's transaction, so the index commits or rolls back
+    together with the change that made it stale.
+    """
+    if not deal_ids:
+        return
+    db.flush()
+    remove_deals(db, deal_ids)
+    if _is_postgres(db):
+        db.execute(insert(pg_documents).from_select(
+            ["deal_id", "document"], _source(deal_ids).add_columns(_pg_document())
+        ))
+    else:
+        db.execute(insert(fts_documents).from_select(
+            ["rowid", *(name for name, _ in SEARCH_FIELDS)],
+            _source(deal_ids).add_columns(*(source for _, source in SEARCH_FIELDS)),
+        ))
+
+
+def index_missing_deals(engine: Engine) -> None:
+    """Index every deal that has no search document yet (e.g. after a bulk load)."""
+    is_postgres = engine.dialect.name == "postgresql"
+    with Session(engine) as db:
+        indexed = select(pg_documents.c.deal_id) if is_postgres else select(fts_documents.c.rowid)
+        missing = db.scalars(select(Deal.id).where(Deal.id.not_in(indexed))).all()
+        index_deals(db, list(missing))
+        db.commit()
+
+
+def _fts5_query(query: str) -> str | None:
+    # Every word must match; quoting keeps FTS5 operators in user input literal
+    words = re.findall(r"\w+", query)
+    return " ".join(f'"{word}"' for word in words) or None
+
+
+def _snippet_html(snippet: str) -> str:
+    """The snippet HTML-escaped, with its matches wrapped in <mark>; memo text may hold markup."""
+    return html.escape(snippet).replace(_MATCH_START, MARK_START).replace(_MATCH_END, MARK_END)
+
+
+def _highlights(row) -> list[dict]:
+    return [
+        {"field": name, "snippet": _snippet_html(getattr(row, name))}
+        for name, _ in SEARCH_FIELDS
+        if getattr(row, name) and _MATCH_START in getattr(row, name)
+    ]
+
+
+def _search_postgres(db: Session, query: str, skip: int, limit: int) -> tuple[int, list]:
+    tsquery = func.plainto_tsquery(_PG_CONFIG, query)
+    match = pg_documents.c.document.op("@@")(tsquery)
+    rank = func.ts_rank_cd(pg_documents.c.document, tsquery)
+    total = db.scalar(select(func.count()).select_from(pg_documents).where(match))
+    page = (
+        select(pg_documents.c.deal_id, rank.label("rank"))
+        .where(match)
+        .order_by(rank.desc(), pg_documents.c.deal_id)
+        .offset(skip)
+        .limit(limit)
+        .subquery()
+    )
+    # ts_headline re-parses the text, so run it only for the rows on this page
+    options = f"StartSel={_MATCH_START}, StopSel={_MATCH_END}, MaxFragments=2, MaxWords=20, MinWords=8"
+    rows = db.execute(
+        select(
+            Deal.id, Deal.name, Deal.stage, Deal.status, page.c.rank,
+            *(
+                func.ts_headline(_PG_CONFIG, func.coalesce(source, ""), tsquery, options).label(name)
+                for name, source in SEARCH_FIELDS
+            ),
+        )
+        .select_from(page)
+        .join(Deal, Deal.id == page.c.deal_id)
+        .outerjoin(Memo, Memo.deal_id == Deal.id)
+        .order_by(page.c.rank.desc(), Deal.id)
+    ).all()
+    return total, rows
+
+
+def _search_fts5(db: Session, query: str, skip: int, limit: int) -> tuple[int, list]:
+    match_query = _fts5_query(query)
+    if match_query is None:
+        return 0, []
+    fts = literal_column("search_documents")
+    match = fts.match(match_query)
+    # bm25() is lower-is-better; negate it so rank is higher-is-better on both backends
+    bm25 = func.bm25(fts, *(FTS5_WEIGHTS.get(name, 1.0) for name, _ in SEARCH_FIELDS))
+    total = db.scalar(select(func.count()).select_from(fts_documents).where(match))
+    rows = db.execute(
+        select(
+            Deal.id, Deal.name, Deal.stage, Deal.status, (-bm25).label("rank"),
+            *(
+                func.snippet(fts, index, _MATCH_START, _MATCH_END, "…", 16).label(name)
+                for index, (name, _) in enumerate(SEARCH_FIELDS)
+            ),
+        )
+        .select_from(fts_documents)
+        .join(Deal, Deal.id == fts_documents.c.rowid)
+        .where(match)
+        .order_by(bm25, Deal.id)
+        .offset(skip)
+        .limit(limit)
+    ).all()
+    return total, rows
+
+
+def search(db: Session, query: str, skip: int = 0, limit: int = 20) -> dict:
+    """Rank deals by how well their name, URL and memo text match ``query``."""
+    search_backend = _search_postgres if _is_postgres(db) else _search_fts5
+    total, rows = search_backend(db, query, skip, limit)
+    return {
+        "total": total,
+        "results": [
+            {
+                "deal_id": row.id,
+                "name": row.name,
+                "stage": row.stage,
+                "status": row.status,
+                "rank": row.rank,
+                "highlights": _highlights(row),
+            }
+            for row in rows
+        ],
+    }
@@ -23,6 +23,9 @@ class User(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
+    # Fetch created_at/updated_at with INSERT/UPDATE ... RETURNING instead of a refresh
+    __mapper_args__ = {"eager_defaults": True}
+    
     # Relationships
     owned_deals = relationship("Deal", back_populates="owner", foreign_keys="Deal.owner_id")
     activities = relationship("Activity", back_populates="user")
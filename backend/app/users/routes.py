@@ -1,26 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from typing import List
-from app.core.database import get_db
-from app.core.dependencies import get_current_active_user, require_role
+from app.core.database import ServiceRunner, UnitOfWorkRoute, get_runner
+from app.core.dependencies import current_active_user, role_required
+from app.core.pagination import set_next_cursor
 from app.users.models import User, UserRole
 from app.users.schemas import UserCreate, UserResponse, UserUpdate
-from app.users.service import (
-    get_user, get_users, create_user, update_user,
-    get_user_by_email, authenticate_user
-)
+from app.users import service
 from app.core.security import create_access_token
+from app.core.hashing import password_hasher
 from app.users.schemas import UserLogin, Token
 from datetime import timedelta
 from app.core.config import settings
 
-router = APIRouter(prefix="/users", tags=["users"])
+router = APIRouter(prefix="/users", tags=["users"], route_class=UnitOfWorkRoute)
 
 
 @router.post("/login", response_model=Token)
-def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
-    print(user_credentials.email, user_credentials.password)
-    user = authenticate_user(db, user_credentials.email, user_credentials.password)
+async def login(user_credentials: UserLogin, run: ServiceRunner = Depends(get_runner)):
+    user = await service.authenticate_user(run, user_credentials.email, user_credentials.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -39,63 +36,71 @@ def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
 
 
 @router.get("/me", response_model=UserResponse)
-def read_users_me(current_user: User = Depends(get_current_active_user)):
+async def read_users_me(current_user: User = Depends(current_active_user)):
     return current_user
 
 
 @router.get("", response_model=List[UserResponse])
-def read_users(
+async def read_users(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_role([UserRole.ADMIN]))
+    cursor: str | None = None,
+    run: ServiceRunner = Depends(get_runner),
+    current_user: User = Depends(role_required([UserRole.ADMIN]))
 ):
-    users = get_users(db, skip=skip, limit=limit)
+    users = await run(service.get_users, skip=skip, limit=limit, cursor=cursor)
+    set_next_cursor(response, users, limit, "id")
     return users
 
 
 @router.get("/{user_id}", response_model=UserResponse)
-def read_user(
+async def read_user(
     user_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_role([UserRole.ADMIN]))
+    run: ServiceRunner = Depends(get_runner),
+    current_user: User = Depends(role_required([UserRole.ADMIN]))
 ):
-    user = get_user(db, user_id)
+    user = await run(service.get_user, user_id)
     if user is None:
         raise HTTPException(status_code=404, detail="User not found")
     return user
 
 
 @router.post("", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def create_new_user(
+async def create_new_user(
     user: UserCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_role([UserRole.ADMIN]))
+    run: ServiceRunner = Depends(get_runner),
+    current_user: User = Depends(role_required([UserRole.ADMIN]))
 ):
-    db_user = get_user_by_email(db, user.email)
+    db_user = await run(service.get_user_by_email, user.email)
     if db_user:
         raise HTTPException(status_code=400, detail="Email already registered")
-    return create_user(db, user)
+    hashed_password = await password_hasher.hash(user.password)
+    return await run(service.create_user, user, hashed_password)
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def register_new_user(
+async def register_new_user(
     user: UserCreate,
-    db: Session = Depends(get_db)
+    run: ServiceRunner = Depends(get_runner)
 ):
-    db_user = get_user_by_email(db, user.email)
+    db_user = await run(service.get_user_by_email, user.email)
     if db_user:
         raise HTTPException(status_code=400, detail="Email already registered")
-    return create_user(db, user)
+    hashed_password = await password_hasher.hash(user.password)
+    return await run(service.create_user, user, hashed_password)
 
 
 @router.put("/{user_id}", response_model=UserResponse)
-def update_existing_user(
+async def update_existing_user(
     user_id: int,
     user_update: UserUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_role([UserRole.ADMIN]))
+    run: ServiceRunner = Depends(get_runner),
+    current_user: User = Depends(role_required([UserRole.ADMIN]))
 ):
-    updated_user = update_user(db, user_id, user_update)
+    hashed_password = None
+    if user_update.password is not None:
+        hashed_password = await password_hasher.hash(user_update.password)
+    updated_user = await run(service.update_user, user_id, user_update, hashed_password)
     if updated_user is None:
         raise HTTPException(status_code=404, detail="User not found")
     return updated_user
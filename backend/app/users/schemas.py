@@ -18,6 +18,7 @@ class UserUpdate(BaseModel):
     full_name: str | None = None
     role: UserRole | None = None
     is_active: bool | None = None
+    password: str | None = None
 
 
 class UserResponse(UserBase):
@@ -1,7 +1,12 @@
 from sqlalchemy.orm import Session
 from app.users.models import User
 from app.users.schemas import UserCreate, UserUpdate
-from app.core.security import get_password_hash, verify_password
+from app.core.security import get_password_hash
+from app.core.hashing import password_hasher
+from app.core.pagination import decode_cursor
+from app.core.principal_cache import principal_cache
+from app.core.database import ServiceRunner, after_commit
+from app.core.events import events
 
 
 def get_user_by_email(db: Session, email: str) -> User | None:
@@ -12,12 +17,18 @@ def get_user(db: Session, user_id: int) -> User | None:
     return db.query(User).filter(User.id == user_id).first()
 
 
-def get_users(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(User).offset(skip).limit(limit).all()
+def get_users(db: Session, skip: int = 0, limit: int = 100, cursor: str | None = None):
+    query = db.query(User).order_by(User.id)
+    if cursor:
+        (last_id,) = decode_cursor(cursor, int)
+        return query.filter(User.id > last_id).limit(limit).all()
+    return query.offset(skip).limit(limit).all()
 
 
-def create_user(db: Session, user: UserCreate) -> User:
-    hashed_password = get_password_hash(user.password)
+def create_user(db: Session, user: UserCreate, hashed_password: str | None = None) -> User:
+    # Request handlers hash on the password executor and pass the result in
+    if hashed_password is None:
+        hashed_password = get_password_hash(user.password)
     db_user = User(
         email=user.email,
         hashed_password=hashed_password,
@@ -25,32 +36,48 @@ def create_user(db: Session, user: UserCreate) -> User:
         role=user.role
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    db.flush()
     return db_user
 
 
-def update_user(db: Session, user_id: int, user_update: UserUpdate) -> User | None:
+def update_user(
+    db: Session, user_id: int, user_update: UserUpdate, hashed_password: str | None = None
+) -> User | None:
     db_user = get_user(db, user_id)
     if not db_user:
         return None
     
     update_data = user_update.model_dump(exclude_unset=True)
-    if "password" in update_data:
-        update_data["hashed_password"] = get_password_hash(update_data.pop("password"))
+    password = update_data.pop("password", None)
+    if password is not None:
+        # Request handlers hash on the password executor and pass the result in
+        update_data["hashed_password"] = hashed_password or get_password_hash(password)
     
     for key, value in update_data.items():
         setattr(db_user, key, value)
     
-    db.commit()
-    db.refresh(db_user)
+    db.flush()
+    # Role and is_active changes must take effect on the very next request
+    # here; other workers see them once their cached principal expires
+    after_commit(db, lambda: principal_cache.invalidate(user_id))
+    if update_data.get("is_active") is False:
+        after_commit(db, lambda: events.revoke_user(user_id))
     return db_user
 
 
-def authenticate_user(db: Session, email: str, password: str) -> User | None:
-    user = get_user_by_email(db, email)
+def set_password_hash(db: Session, user: User, hashed_password: str) -> None:
+    user.hashed_password = hashed_password
+    db.flush()
+
+
+async def authenticate_user(run: ServiceRunner, email: str, password: str) -> User | None:
+    user = await run(get_user_by_email, email)
     if not user:
         return None
-    if not verify_password(password, user.hashed_password):
+    verified, new_hash = await password_hasher.verify_and_update(password, user.hashed_password)
+    if not verified:
         return None
+    # Transparently upgrade hashes made with a previous bcrypt cost
+    if new_hash:
+        await run(set_password_hash, user, new_hash)
     return user
@@ -0,0 +1,123 @@
+"""Compare requests/sec of the sync and async route sets.
+
+Starts one uvicorn server per mode against the same database, then drives
+``GET /deals`` and ``POST /activities/comment`` with a fixed number of
+concurrent clients for a fixed duration.
+
+    python -m benchmarks.async_vs_sync --concurrency 64 --duration 10
+
+Set DATABASE_URL to benchmark against Postgres; the default is a throwaway
+SQLite file.
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+import uuid
+
+import httpx
+
+from benchmarks.common import use_temporary_database
+
+SCENARIOS = ["GET /deals", "POST /activities/comment"]
+
+
+def start_server(port: int, database_url: str, async_mode: bool) -> subprocess.Popen:
+    env = dict(os.environ, DATABASE_URL=database_url, ASYNC_MODE=str(async_mode).lower())
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    )
+
+
+async def wait_until_ready(client: httpx.AsyncClient, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get("/health")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("server did not become ready")
+
+
+async def login(client: httpx.AsyncClient, role: str) -> dict:
+    email = f"bench-{role}-{uuid.uuid4().hex[:8]}@example.com"
+    await client.post("/users/register", json={"email": email, "password": "bench", "role": role})
+    response = await client.post("/users/login", json={"email": email, "password": "bench"})
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def drive(client: httpx.AsyncClient, send, concurrency: int, duration: float) -> tuple[int, int]:
+    done = errors = 0
+    deadline = time.monotonic() + duration
+
+    async def worker():
+        nonlocal done, errors
+        while time.monotonic() < deadline:
+            response = await send()
+            if response.status_code >= 400:
+                errors += 1
+            done += 1
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return done, errors
+
+
+async def run_mode(port: int, concurrency: int, duration: float) -> dict:
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=60) as client:
+        await wait_until_ready(client)
+        analyst = await login(client, "analyst")
+        partner = await login(client, "partner")
+        deal = (await client.post("/deals", json={"name": "Benchmark deal"}, headers=analyst)).json()
+
+        requests = {
+            "GET /deals": lambda: client.get("/deals", headers=partner),
+            "POST /activities/comment": lambda: client.post(
+                "/activities/comment", json={"deal_id": deal["id"], "comment": "benchmark"}, headers=partner
+            ),
+        }
+        results = {}
+        for name in SCENARIOS:
+            done, errors = await drive(client, requests[name], concurrency, duration)
+            results[name] = {"rps": done / duration, "errors": errors}
+        return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    database_url = use_temporary_database()
+
+    results = {}
+    for mode, async_mode in (("sync", False), ("async", True)):
+        server = start_server(args.port, database_url, async_mode)
+        try:
+            results[mode] = asyncio.run(run_mode(args.port, args.concurrency, args.duration))
+        finally:
+            server.terminate()
+            server.wait()
+
+    print(f"{'scenario':<28}{'sync req/s':>12}{'async req/s':>13}{'speedup':>10}")
+    for name in SCENARIOS:
+        sync_rps = results["sync"][name]["rps"]
+        async_rps = results["async"][name]["rps"]
+        print(f"{name:<28}{sync_rps:>12.1f}{async_rps:>13.1f}{async_rps / sync_rps:>9.2f}x")
+    for mode, scenarios in results.items():
+        for name, result in scenarios.items():
+            if result["errors"]:
+                print(f"warning: {result['errors']} failed requests for {name} in {mode} mode")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Count COMMITs and SQL statements issued by each write endpoint.
+
+Drives every write endpoint once through the in-process app and records
+the database commits and statements each request triggers.
+
+    python -m benchmarks.commits_per_request
+
+Set DATABASE_URL to run against Postgres; the default is a throwaway
+SQLite file.
+"""
+from benchmarks.common import use_temporary_database
+
+use_temporary_database()
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.core.database import engine
+from app.main import app
+
+
+class Counter:
+    def __init__(self):
+        self.commits = 0
+        self.statements = 0
+
+    def reset(self):
+        self.commits = self.statements = 0
+
+
+def main():
+    counter = Counter()
+    event.listen(engine, "commit", lambda conn: setattr(counter, "commits", counter.commits + 1))
+    event.listen(
+        engine, "before_cursor_execute",
+        lambda *args: setattr(counter, "statements", counter.statements + 1),
+    )
+    results = []
+
+    def measure(name, send, expected_status):
+        counter.reset()
+        response = send()
+        if response.status_code != expected_status:
+            raise RuntimeError(f"{name}: {response.status_code} {response.text}")
+        results.append((name, counter.commits, counter.statements))
+        return response.json() if response.content else None
+
+    with TestClient(app) as client:
+        def register(email, role):
+            measure(f"POST /users/register ({role})", lambda: client.post(
+                "/users/register", json={"email": email, "password": "bench", "role": role}), 201)
+            token = measure(f"POST /users/login ({role})", lambda: client.post(
+                "/users/login", json={"email": email, "password": "bench"}), 200)["access_token"]
+            return {"Authorization": f"Bearer {token}"}
+
+        admin = register("bench-admin@example.com", "admin")
+        analyst = register("bench-analyst@example.com", "analyst")
+        partner = register("bench-partner@example.com", "partner")
+        # Warm the principal cache so auth lookups do not count against endpoints
+        for headers in (admin, analyst, partner):
+            client.get("/users/me", headers=headers)
+
+        user = measure("POST /users", lambda: client.post(
+            "/users", json={"email": "bench-new@example.com", "password": "bench"}, headers=admin), 201)
+        measure("PUT /users/{id}", lambda: client.put(
+            f"/users/{user['id']}", json={"full_name": "New User"}, headers=admin), 200)
+
+        deal = measure("POST /deals", lambda: client.post(
+            "/deals", json={"name": "Bench deal"}, headers=analyst), 201)
+        measure("PUT /deals/{id} (stage change)", lambda: client.put(
+            f"/deals/{deal['id']}", json={"stage": "screen"}, headers=analyst), 200)
+        bulk = measure("POST /deals/bulk (10 rows)", lambda: client.post(
+            "/deals/bulk", json={"deals": [{"name": f"Bulk {i}"} for i in range(10)]}, headers=analyst), 200)
+        measure("PATCH /deals/bulk (10 rows)", lambda: client.patch(
+            "/deals/bulk", json={"deals": [{"id": d["id"], "stage": "screen"} for d in bulk["deals"]]},
+            headers=analyst), 200)
+
+        measure("POST /activities/comment", lambda: client.post(
+            "/activities/comment", json={"deal_id": deal["id"], "comment": "bench"}, headers=partner), 201)
+        measure("POST /activities/deal/{id}/vote", lambda: client.post(
+            f"/activities/deal/{deal['id']}/vote", headers=partner), 201)
+        measure("POST /activities/deal/{id}/approve", lambda: client.post(
+            f"/activities/deal/{deal['id']}/approve", headers=partner), 200)
+        measure("POST /activities/deal/{id}/decline", lambda: client.post(
+            f"/activities/deal/{deal['id']}/decline", headers=partner), 200)
+
+        memo = measure("POST /memos", lambda: client.post(
+            "/memos", json={"deal_id": deal["id"], "summary": "v1"}, headers=analyst), 201)
+        measure("PUT /memos/{id}", lambda: client.put(
+            f"/memos/{memo['id']}", json={"summary": "v2"}, headers=analyst), 200)
+
+        measure("DELETE /deals/{id}", lambda: client.delete(
+            f"/deals/{bulk['deals'][0]['id']}", headers=analyst), 204)
+
+    print(f"{'endpoint':<40}{'commits':>9}{'statements':>12}")
+    for name, commits, statements in results:
+        print(f"{name:<40}{commits:>9}{statements:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Shared setup for the in-process benchmarks."""
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+BATCH_SIZE = 50_000
+
+
+def use_temporary_database() -> str:
+    """Point the app at a throwaway SQLite file unless DATABASE_URL is set, and migrate it.
+
+    Must run before anything from ``app`` is imported.
+    """
+    if "DATABASE_URL" not in os.environ:
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    from app.core.schema import upgrade
+
+    upgrade()
+    return os.environ["DATABASE_URL"]
+
+
+def seed_deal_with_activities(rows: int) -> int:
+    """Create one deal with ``rows`` comment activities, one second apart. Returns the deal id."""
+    from sqlalchemy import insert
+    from app.core.database import SessionLocal
+    from app.users.models import User
+    from app.deals.models import Deal
+    from app.activities.models import Activity, ActivityType
+    import app.memos.models  # noqa: F401  (registers Memo for relationship configuration)
+
+    with SessionLocal() as db:
+        user = User(email=f"bench-{time.time_ns()}@example.com", hashed_password="x")
+        db.add(user)
+        db.flush()
+        deal = Deal(name="Long-running deal", owner_id=user.id)
+        db.add(deal)
+        db.commit()
+
+        start = datetime(2020, 1, 1, tzinfo=timezone.utc)
+        for offset in range(0, rows, BATCH_SIZE):
+            db.execute(insert(Activity), [
+                {
+                    "deal_id": deal.id,
+                    "user_id": user.id,
+                    "activity_type": ActivityType.COMMENT,
+                    "description": f"Comment {i}",
+                    "created_at": start + timedelta(seconds=i),
+                }
+                for i in range(offset, min(offset + BATCH_SIZE, rows))
+            ])
+            db.commit()
+            print(f"\rseeded {min(offset + BATCH_SIZE, rows):,}/{rows:,} activities", end="", file=sys.stderr)
+        print(file=sys.stderr)
+        return deal.id
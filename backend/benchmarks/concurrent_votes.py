@@ -0,0 +1,67 @@
+"""Concurrent vote casting: duplicate clicks must yield one vote and clean 400s.
+
+Starts a uvicorn server, registers --partners partners, then has each of
+them fire --clicks simultaneous vote requests at the same deal. Every
+partner should get exactly one 201 and --clicks - 1 400s, never a 500,
+and the deal's vote_count must equal the number of partners.
+
+    python -m benchmarks.concurrent_votes --partners 50 --clicks 5 --async-mode
+
+Set DATABASE_URL to run against Postgres; the default is a throwaway
+SQLite file. SQLite takes a database-wide lock per writer, so in sync mode
+this many simultaneous writes to any endpoint exhaust the threadpool and
+fail with "database is locked"; use --async-mode or Postgres there.
+"""
+import argparse
+import asyncio
+import time
+from collections import Counter
+
+import httpx
+
+from benchmarks.async_vs_sync import login, start_server, wait_until_ready
+from benchmarks.common import use_temporary_database
+
+
+async def run(port: int, partners: int, clicks: int) -> None:
+    limits = httpx.Limits(max_connections=partners * clicks)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=60) as client:
+        await wait_until_ready(client)
+        analyst = await login(client, "analyst")
+        voters = [await login(client, "partner") for _ in range(partners)]
+        deal = (await client.post("/deals", json={"name": "Vote race"}, headers=analyst)).json()
+
+        started = time.perf_counter()
+        responses = await asyncio.gather(*(
+            client.post(f"/activities/deal/{deal['id']}/vote", headers=headers)
+            for headers in voters for _ in range(clicks)
+        ))
+        elapsed = time.perf_counter() - started
+        statuses = Counter(response.status_code for response in responses)
+        vote_count = (await client.get(f"/deals/{deal['id']}", headers=analyst)).json()["vote_count"]
+
+    print(f"{len(responses):,} vote requests in {elapsed:.2f}s: {dict(sorted(statuses.items()))}")
+    print(f"vote_count {vote_count} for {partners} partners")
+    if statuses.get(201) != partners or vote_count != partners or set(statuses) - {201, 400}:
+        raise SystemExit("FAILED: expected one vote per partner and only 201/400 responses")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--partners", type=int, default=50)
+    parser.add_argument("--clicks", type=int, default=5)
+    parser.add_argument("--async-mode", action="store_true")
+    parser.add_argument("--port", type=int, default=8767)
+    args = parser.parse_args()
+
+    database_url = use_temporary_database()
+    server = start_server(args.port, database_url, args.async_mode)
+    try:
+        asyncio.run(run(args.port, args.partners, args.clicks))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
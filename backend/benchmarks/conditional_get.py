@@ -0,0 +1,87 @@
+"""Latency of full GETs vs If-None-Match revalidations that end in 304.
+
+Seeds --deals deals and a deal with --rows activities, then times each
+conditional endpoint through the app in-process: once without a
+validator (full fetch and serialization, 200) and once replaying the
+ETag it returned (version probe only, 304). Response sizes show the
+bandwidth a poller saves.
+
+    python -m benchmarks.conditional_get --deals 5000 --rows 10000
+
+Set DATABASE_URL to benchmark against Postgres; the default is a throwaway
+SQLite file.
+"""
+import argparse
+import statistics
+import time
+import uuid
+
+from benchmarks.common import seed_deal_with_activities, use_temporary_database
+
+use_temporary_database()
+
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+
+from app.main import app
+from app.core.database import SessionLocal
+from app.deals.models import Deal
+from app.memos.models import Memo
+
+
+def seed(deals: int, rows: int) -> int:
+    deal_id = seed_deal_with_activities(rows)
+    with SessionLocal() as db:
+        owner_id = db.get(Deal, deal_id).owner_id
+        db.execute(insert(Deal), [
+            {"name": f"Deal {i}", "owner_id": owner_id, "company_url": f"https://example.com/{i}", "round": "Seed"} for i in range(deals)
+        ])
+        db.add(Memo(deal_id=deal_id, created_by_id=owner_id, summary="s" * 2000, market="m" * 2000, risks="r" * 2000))
+        db.commit()
+    return deal_id
+
+
+def time_get(client: TestClient, path: str, headers: dict, repeats: int) -> float:
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        client.get(path, headers=headers)
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--deals", type=int, default=5_000)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--repeats", type=int, default=50)
+    args = parser.parse_args()
+
+    deal_id = seed(args.deals, args.rows)
+    with TestClient(app) as client:
+        email = f"bench-{uuid.uuid4().hex[:8]}@example.com"
+        client.post("/users/register", json={"email": email, "password": "bench", "role": "partner"})
+        token = client.post("/users/login", json={"email": email, "password": "bench"}).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        print(f"{'endpoint':<36}{'200 ms':>9}{'304 ms':>9}{'200 bytes':>12}{'304 bytes':>11}")
+        for path in (
+            f"/deals?limit={args.limit}",
+            f"/deals/{deal_id}",
+            f"/memos/deal/{deal_id}",
+            f"/activities/deal/{deal_id}?limit={args.limit}",
+        ):
+            full = client.get(path, headers=headers)
+            revalidated = client.get(path, headers={**headers, "If-None-Match": full.headers["etag"]})
+            assert full.status_code == 200 and revalidated.status_code == 304, (path, revalidated.status_code)
+            full_ms = time_get(client, path, headers, args.repeats)
+            not_modified_ms = time_get(client, path, {**headers, "If-None-Match": full.headers["etag"]}, args.repeats)
+            print(
+                f"{path.split('?')[0]:<36}{full_ms:>9.2f}{not_modified_ms:>9.2f}"
+                f"{len(full.content):>12,}{len(revalidated.content):>11,}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Connection pool sizing under concurrent reads.
+
+Starts a uvicorn server per pool configuration and fires --concurrency
+simultaneous GET /deals/{id} requests (response cache off, so every
+request checks out a connection) for --seconds. Compares SQLAlchemy's
+defaults (pool_size 5, max_overflow 10) with the configured settings and
+prints throughput, errors and the checkout wait histogram reported by
+GET /health/db-pool.
+
+    python -m benchmarks.connection_pool --concurrency 64 --seconds 10
+
+Set DATABASE_URL to run against Postgres; the default is a throwaway
+SQLite file. Pass --async-mode to measure the async engine's pool instead.
+"""
+import argparse
+import asyncio
+import os
+import time
+from collections import Counter
+
+import httpx
+
+from benchmarks.async_vs_sync import login, start_server, wait_until_ready
+from benchmarks.common import use_temporary_database
+
+CONFIGURATIONS = {
+    "sqlalchemy defaults": {"DB_POOL_SIZE": "5", "DB_MAX_OVERFLOW": "10"},
+    "configured": {},
+}
+
+
+async def run(port: int, concurrency: int, seconds: float, async_mode: bool) -> dict:
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=60) as client:
+        await wait_until_ready(client)
+        headers = await login(client, "analyst")
+        deal = (await client.post("/deals", json={"name": "Pool bench"}, headers=headers)).json()
+        statuses = Counter()
+        deadline = time.monotonic() + seconds
+
+        async def worker():
+            while time.monotonic() < deadline:
+                try:
+                    response = await client.get(f"/deals/{deal['id']}", headers=headers)
+                    statuses[response.status_code] += 1
+                except httpx.TransportError:
+                    statuses["transport error"] += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+        pool = (await client.get("/health/db-pool")).json()["async" if async_mode else "sync"]
+    return {"statuses": statuses, "elapsed": elapsed, "pool": pool}
+
+
+def report(label: str, result: dict) -> None:
+    statuses, pool = result["statuses"], result["pool"]
+    total = sum(statuses.values())
+    print(f"\n{label}: pool_size {pool.get('size')}, max_overflow {pool.get('max_overflow')}")
+    print(f"  {total / result['elapsed']:,.0f} req/s, responses {dict(statuses)}")
+    print(f"  {pool['checkouts']:,} checkouts, {pool['timeouts']} timeouts, "
+          f"mean wait {pool['wait_seconds_sum'] / max(1, pool['checkouts']) * 1000:.2f} ms")
+    previous = 0
+    for bucket, count in pool["wait_histogram"].items():
+        if count > previous:
+            print(f"  {bucket:>10}: {count:,}")
+        previous = count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--async-mode", action="store_true")
+    parser.add_argument("--port", type=int, default=8768)
+    args = parser.parse_args()
+
+    database_url = use_temporary_database()
+    os.environ["RESPONSE_CACHE_BACKEND"] = "none"
+    for label, overrides in CONFIGURATIONS.items():
+        saved = {name: os.environ.get(name) for name in overrides}
+        os.environ.update(overrides)
+        server = start_server(args.port, database_url, args.async_mode)
+        try:
+            result = asyncio.run(run(args.port, args.concurrency, args.seconds, args.async_mode))
+        finally:
+            server.terminate()
+            server.wait()
+            for name, value in saved.items():
+                if value is None:
+                    os.environ.pop(name, None)
+                else:
+                    os.environ[name] = value
+        report(label, result)
+
+
+if __name__ == "__main__":
+    main()
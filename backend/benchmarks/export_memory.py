@@ -0,0 +1,66 @@
+"""Resident memory while streaming a large activity export.
+
+Seeds one deal with many activities, then consumes the CSV (or NDJSON)
+export generator the same way StreamingResponse does, sampling RSS as it
+goes. With a server-side cursor, peak RSS should stay flat as --rows grows.
+
+    python -m benchmarks.export_memory --rows 1000000
+
+Set DATABASE_URL to benchmark against Postgres; the default is a throwaway
+SQLite file.
+"""
+import argparse
+import gc
+import os
+import time
+
+from benchmarks.common import seed_deal_with_activities, use_temporary_database
+
+use_temporary_database()
+
+from app.exports.schemas import ExportFormat
+from app.exports.service import activities_export_query, stream_export
+
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+
+
+def rss_mb() -> float:
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * PAGE_SIZE / 1024 / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--format", choices=[f.value for f in ExportFormat], default=ExportFormat.CSV.value)
+    parser.add_argument("--samples", type=int, default=10)
+    args = parser.parse_args()
+
+    deal_id = seed_deal_with_activities(args.rows)
+    gc.collect()
+
+    baseline = rss_mb()
+    sample_every = max(1, args.rows // args.samples)
+    exported = exported_bytes = 0
+    next_sample = sample_every
+    peak = baseline
+    started = time.perf_counter()
+
+    print(f"{'rows exported':>15}{'rss MB':>10}")
+    print(f"{0:>15,}{baseline:>10.1f}")
+    for chunk in stream_export(activities_export_query(deal_id=deal_id), ExportFormat(args.format)):
+        exported += chunk.count("\n")
+        exported_bytes += len(chunk)
+        if exported >= next_sample:
+            current = rss_mb()
+            peak = max(peak, current)
+            print(f"{exported:>15,}{current:>10.1f}")
+            next_sample += sample_every
+    elapsed = time.perf_counter() - started
+
+    print(f"exported {exported_bytes / 1024 / 1024:.1f} MB in {elapsed:.1f}s")
+    print(f"rss baseline {baseline:.1f} MB, peak {peak:.1f} MB, growth {peak - baseline:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Per-page latency of offset vs keyset (cursor) pagination of a deal's activity feed.
+
+Seeds one deal with a large activity history, then times fetching a page at
+increasing depths with ``skip`` and with ``cursor``. Offset pages get slower
+with depth; cursor pages should stay flat.
+
+    python -m benchmarks.keyset_pagination --rows 1000000
+
+Set DATABASE_URL to benchmark against Postgres; the default is a throwaway
+SQLite file.
+"""
+import argparse
+import statistics
+import time
+
+from benchmarks.common import seed_deal_with_activities, use_temporary_database
+
+use_temporary_database()
+
+from app.core.database import SessionLocal
+from app.core.pagination import encode_cursor
+from app.activities.service import get_activities_by_deal
+
+
+def time_page(fetch, repeats: int) -> float:
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fetch()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    deal_id = seed_deal_with_activities(args.rows)
+    depths = sorted({0, args.rows // 100, args.rows // 10, args.rows // 2, args.rows - args.page_size})
+
+    print(f"{'depth':>12}{'offset ms':>12}{'cursor ms':>12}")
+    with SessionLocal() as db:
+        for depth in depths:
+            cursor = None
+            if depth:
+                # The row just before the page, i.e. what the previous page's cursor would point at
+                anchor = get_activities_by_deal(db, deal_id, skip=depth - 1, limit=1)[0]
+                cursor = encode_cursor(anchor.created_at, anchor.id)
+            offset_ms = time_page(
+                lambda: get_activities_by_deal(db, deal_id, skip=depth, limit=args.page_size), args.repeats
+            )
+            cursor_ms = time_page(
+                lambda: get_activities_by_deal(db, deal_id, limit=args.page_size, cursor=cursor), args.repeats
+            )
+            db.expunge_all()
+            print(f"{depth:>12,}{offset_ms:>12.2f}{cursor_ms:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""Load test for the live-update WebSocket: fan-out latency to many subscribers.
+
+Starts a uvicorn server, connects --subscribers WebSocket clients to the
+board topic (every tenth also follows the deal being edited), then issues
+--updates deal updates from a few concurrent writers, optionally paced to
+--rate per second. Reports how long each
+update took to reach every subscriber, whether any were lost, and write
+throughput with and without the subscribers attached.
+
+It first measures the broker alone: --subscribers in-process queues, of
+which --stalled never read, so publish cost per event and the resync of
+stalled subscribers are visible without the WebSocket stack.
+
+    python -m benchmarks.live_updates --subscribers 1000 --updates 200
+
+Set DATABASE_URL to benchmark against Postgres; the default is a throwaway
+SQLite file.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+
+import httpx
+import websockets
+
+from benchmarks.async_vs_sync import login, start_server, wait_until_ready
+from benchmarks.common import use_temporary_database
+
+use_temporary_database()
+
+from app.core.events import BOARD_TOPIC, EventBroker
+
+
+class Subscriber:
+    def __init__(self):
+        self.latencies: list[float] = []
+        self.seen: set[str] = set()
+
+    async def run(self, url: str, sent_at: dict[str, float], ready: asyncio.Event, connected: list):
+        async with websockets.connect(url, max_size=None, open_timeout=60) as websocket:
+            await websocket.recv()  # the "subscribed" acknowledgement
+            connected.append(self)
+            ready.set()
+            async for frame in websocket:
+                received = time.perf_counter()
+                for line in frame.splitlines():
+                    event = json.loads(line)
+                    if event["type"] == "deal.updated":
+                        marker = event["deal"]["round"]
+                        if marker in sent_at and marker not in self.seen:
+                            self.seen.add(marker)
+                            self.latencies.append(received - sent_at[marker])
+
+
+async def broker_fan_out(subscribers: int, stalled: int, events: int, queue_size: int) -> dict:
+    """Publish from a worker thread, as sync-mode requests do, to in-process subscribers."""
+    broker = EventBroker(queue_size)
+    subscriptions = [broker.subscribe([BOARD_TOPIC]) for _ in range(subscribers)]
+    received = [0] * subscribers
+
+    async def consume(index: int):
+        queue = subscriptions[index].queue
+        while True:
+            await queue.get()
+            received[index] += 1
+
+    # The first `stalled` subscribers never read, like clients on a dead connection
+    consumers = [asyncio.create_task(consume(i)) for i in range(stalled, subscribers)]
+
+    def publish(first: int, count: int) -> float:
+        started = time.perf_counter()
+        for i in range(first, first + count):
+            broker.publish("deal.updated", 1, deal={"id": 1, "round": f"u{i}"}, changed=["round"])
+        return time.perf_counter() - started
+
+    # Bursts smaller than a queue, so readers that keep up are never told to resync
+    burst = max(1, queue_size // 2)
+    publish_s = 0.0
+    for first in range(0, events, burst):
+        publish_s += await asyncio.to_thread(publish, first, min(burst, events - first))
+        while any(not subscriptions[i].queue.empty() for i in range(stalled, subscribers)):
+            await asyncio.sleep(0.001)
+        await asyncio.sleep(0.001)
+    for task in consumers:
+        task.cancel()
+    return {
+        "publish_us": publish_s / events * 1e6,
+        "stalled_depth": max(subscriptions[i].queue.qsize() for i in range(stalled)) if stalled else 0,
+        **broker.stats(),
+    }
+
+
+async def write_updates(client, headers, deal_id: int, updates: int, writers: int, sent_at: dict, rate: float = 0) -> float:
+    counter = iter(range(updates))
+    started = time.perf_counter()
+
+    async def writer():
+        for i in counter:
+            if rate:
+                await asyncio.sleep(max(0.0, started + i / rate - time.perf_counter()))
+            marker = f"u{i}"
+            sent_at[marker] = time.perf_counter()
+            response = await client.put(f"/deals/{deal_id}", json={"round": marker}, headers=headers)
+            response.raise_for_status()
+
+    await asyncio.gather(*(writer() for _ in range(writers)))
+    return updates / (time.perf_counter() - started)
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def run(args) -> None:
+    base = f"http://127.0.0.1:{args.port}"
+    async with httpx.AsyncClient(base_url=base, timeout=60) as client:
+        await wait_until_ready(client)
+        analyst = await login(client, "analyst")
+        partner = await login(client, "partner")
+        deal = (await client.post("/deals", json={"name": "Live update benchmark"}, headers=analyst)).json()
+
+        baseline = {}
+        baseline_rps = await write_updates(client, analyst, deal["id"], args.updates, args.writers, baseline)
+
+        token = partner["Authorization"].split()[1]
+        board_url = f"ws://127.0.0.1:{args.port}/events/ws?token={token}"
+        deal_url = f"{board_url}&topic=board&topic=deal:{deal['id']}"
+        sent_at: dict[str, float] = {}
+        subscribers = [Subscriber() for _ in range(args.subscribers)]
+        connected, tasks = [], []
+        started = time.perf_counter()
+        for i, subscriber in enumerate(subscribers):
+            ready = asyncio.Event()
+            url = deal_url if i % 10 == 0 else board_url
+            tasks.append(asyncio.create_task(subscriber.run(url, sent_at, ready, connected)))
+            await ready.wait()
+        connect_s = time.perf_counter() - started
+
+        rps = await write_updates(client, analyst, deal["id"], args.updates, args.writers, sent_at, args.rate)
+        # Let the subscribers drain
+        deadline = time.monotonic() + args.drain
+        while time.monotonic() < deadline and any(len(s.seen) < args.updates for s in subscribers):
+            await asyncio.sleep(0.1)
+        stats = (await client.get("/health/events")).json()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    latencies = [latency * 1000 for subscriber in subscribers for latency in subscriber.latencies]
+    complete = sum(len(subscriber.seen) == args.updates for subscriber in subscribers)
+    print(f"subscribers connected: {len(connected):,} in {connect_s:.1f}s")
+    print(f"writes/s: {baseline_rps:.1f} without subscribers, {rps:.1f} with (--rate {args.rate:g})")
+    print(f"subscribers with every update: {complete:,}/{len(subscribers):,}")
+    if latencies:
+        print(
+            f"delivery latency ms: p50 {statistics.median(latencies):.1f}  "
+            f"p99 {percentile(latencies, 0.99):.1f}  max {max(latencies):.1f}"
+        )
+    print(f"server broker stats: {stats}")
+    polled = args.subscribers / args.poll_interval
+    print(f"polling /deals every {args.poll_interval:g}s from the same clients would be {polled:,.0f} req/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--subscribers", type=int, default=1000)
+    parser.add_argument("--stalled", type=int, default=20, help="in-process subscribers that never read")
+    parser.add_argument("--updates", type=int, default=200)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--rate", type=float, default=0, help="updates/s with subscribers attached (0 = as fast as possible)")
+    parser.add_argument("--queue-size", type=int, default=32, help="EVENT_QUEUE_SIZE for the server")
+    parser.add_argument("--drain", type=float, default=30.0, help="seconds to wait for delivery")
+    parser.add_argument("--poll-interval", type=float, default=5.0)
+    parser.add_argument("--async-mode", action="store_true")
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+
+    fan_out = asyncio.run(broker_fan_out(args.subscribers, args.stalled, args.updates, args.queue_size))
+    print(
+        f"in-process broker, {args.subscribers:,} subscribers ({args.stalled} stalled): "
+        f"{fan_out['publish_us']:.0f} us per publish, {fan_out['delivered']:,} delivered, "
+        f"{fan_out['dropped']:,} dropped as {fan_out['resyncs']:,} resyncs to stalled subscribers, "
+        f"whose queues stay at or under {args.queue_size} events (now {fan_out['stalled_depth']})"
+    )
+
+    os.environ["EVENT_QUEUE_SIZE"] = str(args.queue_size)
+    server = start_server(args.port, os.environ["DATABASE_URL"], args.async_mode)
+    try:
+        asyncio.run(run(args))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
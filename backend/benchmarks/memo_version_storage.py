@@ -0,0 +1,131 @@
+"""Storage size and read latency of full-copy vs delta memo versions.
+
+Writes the same sequence of small edits to a long memo twice, once per
+storage mode, then compares the bytes stored in memo_versions and the time
+to read a single version (cold and warm reconstruction cache) and the
+whole version history.
+
+    python -m benchmarks.memo_version_storage --versions 50 --words 800
+
+Set DATABASE_URL to benchmark against Postgres; the default is a throwaway
+SQLite file.
+"""
+import argparse
+import random
+import statistics
+import time
+
+from benchmarks.common import use_temporary_database
+
+use_temporary_database()
+
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.users.models import User
+from app.deals.models import Deal
+import app.activities.models  # noqa: F401  (registers Activity for relationship configuration)
+from app.memos.models import MemoVersion
+from app.memos.schemas import MemoCreate, MemoUpdate
+from app.memos.service import create_memo, get_memo_version, get_memo_versions, update_memo
+from app.memos.versioning import MEMO_FIELDS, version_cache
+
+VOCABULARY = (
+    "revenue growth market customers retention churn pipeline enterprise pricing margin "
+    "competition regulatory founders hiring runway burn expansion product roadmap platform "
+    "integration partners distribution sales cycle contract renewal adoption usage cohort"
+).split()
+
+
+def paragraph(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(VOCABULARY) for _ in range(words))
+
+
+def edit(rng: random.Random, text: str) -> str:
+    """Replace a few words and sometimes append a sentence, like a typical memo revision."""
+    words = text.split(" ")
+    for _ in range(rng.randint(1, 5)):
+        words[rng.randrange(len(words))] = rng.choice(VOCABULARY)
+    if rng.random() < 0.3:
+        words.extend(paragraph(rng, 12).split(" "))
+    return " ".join(words)
+
+
+def write_history(owner_id: int, versions: int, words: int, seed: int) -> int:
+    rng = random.Random(seed)
+    content = {field: paragraph(rng, words) for field in MEMO_FIELDS}
+    with SessionLocal() as db:
+        deal = Deal(name=f"{settings.memo_version_storage} memo", owner_id=owner_id)
+        db.add(deal)
+        db.flush()
+        memo = create_memo(db, MemoCreate(deal_id=deal.id, **content), user_id=owner_id)
+        db.commit()
+        for _ in range(versions - 1):
+            for field in rng.sample(MEMO_FIELDS, 2):
+                content[field] = edit(rng, content[field])
+            update_memo(db, memo.id, MemoUpdate(**content), user_id=owner_id)
+            db.commit()
+        return memo.id
+
+
+def stored_bytes(memo_id: int) -> int:
+    total = 0
+    with SessionLocal() as db:
+        for version in db.scalars(select(MemoVersion).where(MemoVersion.memo_id == memo_id)):
+            total += len(version.delta or b"")
+            total += sum(len(getattr(version, field).encode()) for field in MEMO_FIELDS if getattr(version, field))
+    return total
+
+
+def time_ms(fn, repeats: int, before=None) -> float:
+    samples = []
+    for _ in range(repeats):
+        if before:
+            before()
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--versions", type=int, default=50)
+    parser.add_argument("--words", type=int, default=800, help="words per memo field")
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        user = User(email=f"bench-{time.time_ns()}@example.com", hashed_password="x")
+        db.add(user)
+        db.commit()
+        owner_id = user.id
+
+    memos = {}
+    for mode in ("full", "delta"):
+        settings.memo_version_storage = mode
+        started = time.perf_counter()
+        memos[mode] = write_history(owner_id, args.versions, args.words, seed=42)
+        print(f"wrote {args.versions} {mode} versions in {time.perf_counter() - started:.2f}s")
+
+    with SessionLocal() as db:
+        full = get_memo_versions(db, memos["full"])
+        delta = get_memo_versions(db, memos["delta"])
+        assert [[v[f] for f in MEMO_FIELDS] for v in full] == [[v[f] for f in MEMO_FIELDS] for v in delta]
+
+    print(f"\n{'mode':<8}{'bytes':>12}{'read 1 cold ms':>16}{'read 1 warm ms':>16}{'read all cold ms':>18}")
+    for mode, memo_id in memos.items():
+        with SessionLocal() as db:
+            # The newest version is the longest delta chain from its snapshot
+            version_ids = [v["id"] for v in get_memo_versions(db, memo_id)]
+            target = version_ids[0]
+            cold = time_ms(lambda: get_memo_version(db, target), args.repeats, before=version_cache.clear)
+            get_memo_version(db, target)
+            warm = time_ms(lambda: get_memo_version(db, target), args.repeats)
+            history = time_ms(lambda: get_memo_versions(db, memo_id), args.repeats, before=version_cache.clear)
+        print(f"{mode:<8}{stored_bytes(memo_id):>12,}{cold:>16.2f}{warm:>16.2f}{history:>18.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Per-request cost of the /metrics middleware and SQL timing hooks.
+
+Drives the app in-process over ASGI (no sockets, so the middleware's cost
+is not drowned out by network time) with metrics switched on and off on
+alternate requests, --requests of each per endpoint and round, so drift
+in the machine affects both sides equally. The response cache is disabled
+so every request reaches the database and exercises the statement hooks.
+
+    python -m benchmarks.metrics_overhead --requests 500 --rounds 5
+
+Set DATABASE_URL to benchmark against Postgres; the default is a throwaway
+SQLite file.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+from collections import defaultdict
+
+from benchmarks.common import use_temporary_database
+
+use_temporary_database()
+
+import httpx
+
+from app.main import app
+from app.core.metrics import metrics
+from app.core.response_cache import response_cache
+
+
+async def login(client: httpx.AsyncClient, role: str) -> dict:
+    email = f"bench-{role}-{uuid.uuid4().hex[:8]}@example.com"
+    await client.post("/users/register", json={"email": email, "password": "bench", "role": role})
+    token = (await client.post("/users/login", json={"email": email, "password": "bench"})).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+async def run(requests: int, rounds: int) -> dict[tuple[str, bool], list[float]]:
+    timings = defaultdict(list)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        headers = await login(client, "analyst")
+        deal_ids = [(await client.post("/deals", json={"name": f"Deal {i}"}, headers=headers)).json()["id"] for i in range(50)]
+        endpoints = {
+            "GET /health": ("/health", None),
+            "GET /deals/{deal_id}": (f"/deals/{deal_ids[0]}", headers),
+            "GET /deals?limit=50": ("/deals?limit=50", headers),
+        }
+        for _ in range(rounds):
+            for label, (path, request_headers) in endpoints.items():
+                for i in range(requests * 2):
+                    metrics.enabled = enabled = bool(i % 2)
+                    started = time.perf_counter()
+                    response = await client.get(path, headers=request_headers)
+                    timings[label, enabled].append(time.perf_counter() - started)
+                    assert response.status_code == 200, (path, response.status_code)
+        metrics.enabled = True
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    response_cache.backend = None
+    timings = asyncio.run(run(args.requests, args.rounds))
+
+    print(f"{'endpoint':<22}{'off us':>10}{'on us':>10}{'overhead us':>13}{'overhead':>10}")
+    for label in ("GET /health", "GET /deals/{deal_id}", "GET /deals?limit=50"):
+        off = statistics.median(timings[label, False]) * 1e6
+        on = statistics.median(timings[label, True]) * 1e6
+        print(f"{label:<22}{off:>10.0f}{on:>10.0f}{on - off:>13.0f}{(on - off) / off:>10.1%}")
+    started = time.perf_counter()
+    size = len("\n".join(metrics.render()))
+    print(f"\nrendering {size:,} bytes of metrics took {(time.perf_counter() - started) * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
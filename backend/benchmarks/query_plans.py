@@ -0,0 +1,250 @@
+"""Query plan regression check: fail when a service query falls back to a table scan.
+
+Seeds a database with seed.synthetic (--deals deals, --activities activity
+rows), then calls each endpoint below through the app, records every SQL
+statement it runs, and EXPLAINs them:
+
+    python -m benchmarks.query_plans
+    python -m benchmarks.query_plans --show-plans
+
+A statement fails when its plan reads a table sequentially (SQLite:
+``SCAN <table>`` without an index; Postgres: a ``Seq Scan`` node, planned
+with enable_seqscan off so one only appears when no index can serve the
+query). Scenarios that read a whole table by design, such as unfiltered
+exports, list the tables they may scan. Exits non-zero on any failure.
+
+Set DATABASE_URL to a scratch Postgres database to check Postgres plans;
+the default is a throwaway SQLite file. --no-seed reuses the data already
+there. tests/test_query_plans.py runs this check on a small dataset.
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+
+from benchmarks.common import use_temporary_database
+
+os.environ["RESPONSE_CACHE_BACKEND"] = "none"
+use_temporary_database()
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event, func, select
+
+from app.main import app
+from app.core.database import Base, SessionLocal, engine
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.profiler import EXPLAINABLE
+from app.core.security import create_access_token
+from app.users.models import User, UserRole
+from app.deals.models import Deal, DealStage
+from app.activities.archive import CLOSED_DEAL, archive_deals
+from app.activities.models import Activity
+from app.memos.models import Memo, MemoVersion
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TABLES = set(Base.metadata.tables)
+SQLITE_SCAN = re.compile(r"^SCAN (\w+)")
+
+
+@dataclass
+class Scenario:
+    name: str
+    role: UserRole
+    method: str
+    path: str
+    json: dict | None = None
+    headers: dict = field(default_factory=dict)
+    # Tables this scenario reads in full by design
+    allow_scans: frozenset = frozenset()
+
+
+class Recorder:
+    """Statements executed while recording, with their driver-level parameters."""
+
+    def __init__(self):
+        self.statements: dict[str, tuple] = {}
+        self.recording = False
+        self.lock = threading.Lock()
+        event.listen(engine, "before_cursor_execute", self.record)
+
+    def record(self, conn, cursor, statement, parameters, context, executemany):
+        if self.recording and not executemany and statement.lstrip().upper().startswith(EXPLAINABLE):
+            with self.lock:
+                self.statements.setdefault(statement, parameters)
+
+    def take(self) -> dict[str, tuple]:
+        with self.lock:
+            statements, self.statements = self.statements, {}
+        return statements
+
+
+def sqlite_plan(conn, statement: str, parameters) -> tuple[list[str], list[str]]:
+    details = [row[-1] for row in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters)]
+    scans = []
+    for detail in details:
+        match = SQLITE_SCAN.match(detail)
+        if match and "INDEX" not in detail and "VIRTUAL TABLE" not in detail:
+            # SQLAlchemy aliases repeated tables as <table>_1, <table>_2, ...
+            table = re.sub(r"_\d+$", "", match.group(1))
+            if table in TABLES:
+                scans.append(table)
+    return details, scans
+
+
+def postgres_plan(conn, statement: str, parameters) -> tuple[list[str], list[str]]:
+    conn.exec_driver_sql("SET enable_seqscan = off")
+    plan = conn.exec_driver_sql("EXPLAIN (FORMAT JSON) " + statement, parameters).scalar()[0]["Plan"]
+    details, scans = [], []
+
+    def walk(node, depth):
+        relation = f" on {node['Relation Name']}" if "Relation Name" in node else ""
+        index = f" using {node['Index Name']}" if "Index Name" in node else ""
+        details.append(f"{'  ' * depth}{node['Node Type']}{relation}{index}")
+        if node["Node Type"] == "Seq Scan":
+            scans.append(node["Relation Name"])
+        for child in node.get("Plans", []):
+            walk(child, depth + 1)
+
+    walk(plan, 0)
+    return details, scans
+
+
+def seed(args) -> None:
+    subprocess.run(
+        [sys.executable, "-m", "seed.synthetic", "--users", str(args.users), "--deals", str(args.deals),
+         "--activities", str(args.activities), "--drop-indexes"],
+        cwd=BACKEND_DIR,
+        check=True,
+    )
+
+
+def scenarios(client: TestClient, tokens: dict) -> list[Scenario]:
+    """The endpoints to check, against the busiest deal and the longest memo history."""
+    with SessionLocal() as db:
+        deal_id = db.scalar(
+            select(Activity.deal_id).group_by(Activity.deal_id).order_by(func.count().desc()).limit(1)
+        )
+        memo_id, versions = db.execute(
+            select(MemoVersion.memo_id, func.max(MemoVersion.version_number))
+            .group_by(MemoVersion.memo_id).order_by(func.count().desc()).limit(1)
+        ).one()
+        memo_deal_id = db.scalar(select(Memo.deal_id).where(Memo.id == memo_id))
+        version_id = db.scalar(
+            select(MemoVersion.id).where(MemoVersion.memo_id == memo_id, MemoVersion.version_number == versions)
+        )
+        owner_id = db.scalar(select(Deal.owner_id).where(Deal.id == deal_id))
+        unvoted = db.scalar(select(Deal.id).where(~Deal.votes.any()).order_by(Deal.id.desc()).limit(1))
+        # The busiest closed deal, archived outright, so its feed is read from activity_archives
+        archived_deal_id = db.scalar(
+            select(Activity.deal_id).join(Deal).where(CLOSED_DEAL)
+            .group_by(Activity.deal_id).order_by(func.count().desc()).limit(1)
+        )
+        archive_deals(db, [archived_deal_id], datetime.now(timezone.utc) + timedelta(minutes=1))
+        db.commit()
+
+    def cursor(path: str, role: UserRole = UserRole.ANALYST) -> str:
+        response = client.get(path, headers=tokens[role])
+        response.raise_for_status()
+        return response.headers[NEXT_CURSOR_HEADER]
+
+    analyst, partner, admin = UserRole.ANALYST, UserRole.PARTNER, UserRole.ADMIN
+    revalidate = {"If-None-Match": '"stale"'}
+    activities_cursor = cursor(f"/activities/deal/{deal_id}?limit=20")
+    archived_cursor = cursor(f"/activities/deal/{archived_deal_id}?limit=5")
+    return [
+        Scenario("login", analyst, "POST", "/users/login", {"email": f"user{owner_id}@synthetic.example.com", "password": "password"}),
+        Scenario("current user", analyst, "GET", "/users/me"),
+        Scenario("users page", admin, "GET", f"/users?limit=20&cursor={cursor('/users?limit=20', admin)}"),
+        Scenario("board", analyst, "GET", "/deals/board"),
+        Scenario("board by status", analyst, "GET", "/deals/board?status=active"),
+        Scenario("board column page", analyst, "GET",
+                 f"/deals/board/screen?cursor={client.get('/deals/board', headers=tokens[analyst]).json()['columns'][1]['next_cursor']}"),
+        Scenario("deals by stage", analyst, "GET", f"/deals?stage=diligence&limit=20&cursor={cursor('/deals?stage=diligence&limit=20')}"),
+        Scenario("deals revalidation", analyst, "GET", "/deals?stage=ic&limit=20", headers=revalidate),
+        Scenario("deal", analyst, "GET", f"/deals/{deal_id}"),
+        Scenario("deal detail", partner, "GET", f"/deals/{deal_id}/detail"),
+        Scenario("activity feed page", analyst, "GET", f"/activities/deal/{deal_id}?limit=20&cursor={activities_cursor}"),
+        Scenario("activity feed revalidation", analyst, "GET", f"/activities/deal/{deal_id}?limit=20", headers=revalidate),
+        Scenario("archived feed page", analyst, "GET", f"/activities/deal/{archived_deal_id}?limit=5&cursor={archived_cursor}"),
+        Scenario("archived feed offset", analyst, "GET", f"/activities/deal/{archived_deal_id}?limit=5&skip=5"),
+        Scenario("my vote", partner, "GET", f"/activities/deal/{deal_id}/vote"),
+        Scenario("memo by deal", analyst, "GET", f"/memos/deal/{memo_deal_id}"),
+        Scenario("memo versions", analyst, "GET", f"/memos/{memo_id}/versions"),
+        Scenario("memo version index", analyst, "GET", f"/memos/{memo_id}/versions/index"),
+        Scenario("memo version", analyst, "GET", f"/memos/versions/{version_id}"),
+        Scenario("memo diff", analyst, "GET", f"/memos/{memo_id}/diff?from=1&to={versions}"),
+        Scenario("search", analyst, "GET", "/search?q=revenue"),
+        Scenario("funnel", analyst, "GET", "/analytics/funnel?from=2025-01-01T00:00:00Z&to=2025-04-01T00:00:00Z"),
+        Scenario("time in stage", analyst, "GET", "/analytics/time-in-stage?from=2025-01-01T00:00:00Z&to=2025-04-01T00:00:00Z"),
+        Scenario("deal activity export", analyst, "GET", f"/exports/activities?deal_id={deal_id}"),
+        Scenario("deals export", analyst, "GET", "/exports/deals", allow_scans=frozenset({"deals"})),
+        Scenario("comment", analyst, "POST", "/activities/comment", {"deal_id": deal_id, "comment": "Plan check"}),
+        Scenario("vote", partner, "POST", f"/activities/deal/{unvoted}/vote"),
+        Scenario("memo save", analyst, "PUT", f"/memos/{memo_id}", {"summary": "Plan check"}),
+        Scenario("move deal", analyst, "PUT", f"/deals/{deal_id}", {"stage": DealStage.IC.value}),
+        Scenario("delete deal", admin, "DELETE", f"/deals/{memo_deal_id}"),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--deals", type=int, default=5_000)
+    parser.add_argument("--activities", type=int, default=200_000)
+    parser.add_argument("--no-seed", action="store_true", help="use the data already in DATABASE_URL")
+    parser.add_argument("--show-plans", action="store_true", help="print every plan, not only failures")
+    args = parser.parse_args()
+
+    if not args.no_seed:
+        seed(args)
+    with SessionLocal() as db:
+        tokens = {
+            role: {"Authorization": f"Bearer {create_access_token({'sub': str(user_id)})}"}
+            for role in UserRole
+            if (user_id := db.scalar(select(User.id).where(User.role == role).limit(1))) is not None
+        }
+    client = TestClient(app)
+    explain = postgres_plan if engine.dialect.name == "postgresql" else sqlite_plan
+    recorder = Recorder()
+
+    failures = 0
+    for scenario in scenarios(client, tokens):
+        recorder.recording = True
+        try:
+            response = client.request(scenario.method, scenario.path, json=scenario.json,
+                                      headers={**tokens[scenario.role], **scenario.headers})
+        finally:
+            recorder.recording = False
+        if response.status_code >= 400:
+            print(f"FAIL {scenario.name}: {scenario.method} {scenario.path} returned {response.status_code}")
+            failures += 1
+            continue
+        statements = recorder.take()
+        problems = []
+        with engine.connect() as conn:
+            for statement, parameters in statements.items():
+                details, scans = explain(conn, statement, parameters)
+                scans = sorted(set(scans) - scenario.allow_scans)
+                if scans or args.show_plans:
+                    problems.append((statement, details, scans))
+            conn.rollback()
+        failed = any(scans for _, _, scans in problems)
+        failures += failed
+        print(f"{'FAIL' if failed else 'ok  '} {scenario.name:<28}{len(statements):>3} statements")
+        for statement, details, scans in problems:
+            if scans:
+                print(f"     sequential scan of {', '.join(scans)} in:")
+            print("       " + " ".join(statement.split()))
+            for detail in details:
+                print(f"         {detail}")
+
+    if failures:
+        sys.exit(f"{failures} scenario(s) failed")
+
+
+if __name__ == "__main__":
+    main()
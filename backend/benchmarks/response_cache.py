@@ -0,0 +1,128 @@
+"""Read latency and hit ratio of the response cache under a read-heavy mix.
+
+Seeds --deals deals (--rows activities on each of the --hot deals that
+traffic concentrates on), then replays the same random sequence of
+requests through the app in-process twice: with the cache disabled and
+with the in-process backend. Reads are spread over the deal list, deal
+detail, memo and activity feed endpoints; --write-ratio of requests are
+deal updates or comments, which invalidate what they touch.
+
+    python -m benchmarks.response_cache --requests 5000 --write-ratio 0.05
+
+Set DATABASE_URL to benchmark against Postgres; the default is a throwaway
+SQLite file.
+"""
+import argparse
+import random
+import statistics
+import time
+import uuid
+from collections import defaultdict
+
+from benchmarks.common import use_temporary_database
+
+use_temporary_database()
+
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+
+from app.main import app
+from app.core.database import SessionLocal
+from app.core.response_cache import MemoryBackend, response_cache
+from app.deals.models import Deal
+from app.memos.models import Memo
+from app.activities.models import Activity, ActivityType
+from app.users.models import User
+
+
+def seed(deals: int, hot: int, rows: int) -> list[int]:
+    with SessionLocal() as db:
+        owner_id = db.query(User.id).first()[0]
+        deal_ids = db.scalars(insert(Deal).returning(Deal.id), [
+            {"name": f"Deal {i}", "owner_id": owner_id, "company_url": f"https://example.com/{i}"} for i in range(deals)
+        ]).all()
+        hot_ids = deal_ids[:hot]
+        db.execute(insert(Activity), [
+            {"deal_id": deal_id, "user_id": owner_id, "activity_type": ActivityType.COMMENT, "description": f"Comment {i}"}
+            for deal_id in hot_ids for i in range(rows)
+        ])
+        db.execute(insert(Memo), [
+            {"deal_id": deal_id, "created_by_id": owner_id, "summary": "s" * 1000, "risks": "r" * 1000} for deal_id in hot_ids
+        ])
+        db.commit()
+    return hot_ids
+
+
+def workload(hot_ids: list[int], requests: int, write_ratio: float, seed_value: int) -> list[tuple[str, str, str, dict | None]]:
+    """(label, method, path, body) per request; reads are labelled with their route."""
+    rng = random.Random(seed_value)
+    plan = []
+    for i in range(requests):
+        deal_id = rng.choice(hot_ids)
+        if rng.random() < write_ratio:
+            if rng.random() < 0.5:
+                plan.append(("writes", "PUT", f"/deals/{deal_id}", {"round": f"r{i}"}))
+            else:
+                plan.append(("writes", "POST", "/activities/comment", {"deal_id": deal_id, "comment": f"c{i}"}))
+            continue
+        route, path = rng.choice([
+            ("/deals", "/deals?limit=50"),
+            ("/deals/{deal_id}", f"/deals/{deal_id}"),
+            ("/memos/deal/{deal_id}", f"/memos/deal/{deal_id}"),
+            ("/activities/deal/{deal_id}", f"/activities/deal/{deal_id}?limit=50"),
+        ])
+        plan.append((route, "GET", path, None))
+    return plan
+
+
+def replay(client: TestClient, plan, reader: dict, writer: dict) -> dict[str, list[float]]:
+    timings = defaultdict(list)
+    for label, method, path, body in plan:
+        started = time.perf_counter()
+        response = client.request(method, path, json=body, headers=reader if method == "GET" else writer)
+        timings[label].append(time.perf_counter() - started)
+        assert response.status_code < 400, (method, path, response.status_code)
+    return timings
+
+
+def login(client: TestClient, role: str) -> dict:
+    email = f"bench-{role}-{uuid.uuid4().hex[:8]}@example.com"
+    client.post("/users/register", json={"email": email, "password": "bench", "role": role})
+    token = client.post("/users/login", json={"email": email, "password": "bench"}).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--deals", type=int, default=5_000)
+    parser.add_argument("--hot", type=int, default=50, help="deals that reads and writes target")
+    parser.add_argument("--rows", type=int, default=200, help="activities per hot deal")
+    parser.add_argument("--requests", type=int, default=5_000)
+    parser.add_argument("--write-ratio", type=float, default=0.05)
+    args = parser.parse_args()
+
+    with TestClient(app) as client:
+        reader, writer = login(client, "partner"), login(client, "analyst")
+        hot_ids = seed(args.deals, args.hot, args.rows)
+        plan = workload(hot_ids, args.requests, args.write_ratio, seed_value=42)
+
+        results = {}
+        for label, backend in (("uncached", None), ("cached", MemoryBackend(max_size=4096))):
+            response_cache.backend = backend
+            started = time.perf_counter()
+            results[label] = replay(client, plan, reader, writer)
+            elapsed = time.perf_counter() - started
+            print(f"{label}: {len(plan) / elapsed:,.0f} req/s")
+        stats = response_cache.stats()
+
+    print(f"\n{'endpoint':<28}{'uncached ms':>13}{'cached ms':>11}{'hit rate':>10}")
+    for route in ("/deals", "/deals/{deal_id}", "/memos/deal/{deal_id}", "/activities/deal/{deal_id}"):
+        uncached = statistics.median(results["uncached"][route]) * 1000
+        cached = statistics.median(results["cached"][route]) * 1000
+        print(f"{route:<28}{uncached:>13.2f}{cached:>11.2f}{stats['routes'][route]['hit_rate']:>10.1%}")
+    print(f"{'writes':<28}{statistics.median(results['uncached']['writes']) * 1000:>13.2f}{statistics.median(results['cached']['writes']) * 1000:>11.2f}")
+    print(f"\noverall hit rate {stats['hit_rate']:.1%}, {stats['stale']:,} entries found stale, {stats['invalidations']:,} tag invalidations")
+
+
+if __name__ == "__main__":
+    main()
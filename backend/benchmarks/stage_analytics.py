@@ -0,0 +1,171 @@
+"""Funnel and time-in-stage reports: stage history table vs parsing activities.
+
+Seeds deals that walk the pipeline over a year, writing both the
+STAGE_CHANGE activities and the matching deal_stage_history rows, then
+times each report computed from the history table against the same report
+computed by scanning and regex-parsing the activity descriptions.
+
+    python -m benchmarks.stage_analytics --deals 100000
+
+Set DATABASE_URL to benchmark against Postgres; the default is a throwaway
+SQLite file.
+"""
+import argparse
+import random
+import re
+import statistics
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta, timezone
+
+from benchmarks.common import BATCH_SIZE, use_temporary_database
+
+use_temporary_database()
+
+from sqlalchemy import insert, select
+
+from app.core.database import SessionLocal
+from app.users.models import User
+from app.deals.models import Deal, DealStage, DealStageHistory
+from app.activities.models import Activity, ActivityType
+import app.memos.models  # noqa: F401  (registers Memo for relationship configuration)
+from app.analytics.service import PIPELINE, get_funnel, get_time_in_stage
+
+MOVED = re.compile(r"^Moved from (\w+) to (\w+)$")
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def deal_path(rng: random.Random) -> list[tuple[DealStage | None, DealStage, datetime]]:
+    """A deal's transitions: forward through the pipeline until it stops, passes or is invested."""
+    at = START + timedelta(seconds=rng.randrange(180 * 86400))
+    stage = DealStage.SOURCED
+    path = [(None, stage, at)]
+    for next_stage in PIPELINE[1:]:
+        roll = rng.random()
+        if roll < 0.25:
+            break
+        at += timedelta(seconds=rng.randrange(3600, 30 * 86400))
+        to_stage = DealStage.PASSED if roll < 0.45 else next_stage
+        path.append((stage, to_stage, at))
+        if to_stage == DealStage.PASSED:
+            break
+        stage = to_stage
+    return path
+
+
+def seed(deals: int, seed_value: int) -> None:
+    rng = random.Random(seed_value)
+    with SessionLocal() as db:
+        user = User(email=f"bench-{time.time_ns()}@example.com", hashed_password="x")
+        db.add(user)
+        db.flush()
+        for offset in range(0, deals, BATCH_SIZE):
+            count = min(BATCH_SIZE, deals - offset)
+            paths = [deal_path(rng) for _ in range(count)]
+            deal_ids = db.scalars(
+                insert(Deal).returning(Deal.id),
+                [{"name": f"Deal {offset + i}", "owner_id": user.id, "stage": path[-1][1]} for i, path in enumerate(paths)],
+            ).all()
+            activities, history = [], []
+            for deal_id, path in zip(deal_ids, paths):
+                entered = None
+                for from_stage, to_stage, at in path:
+                    description = (
+                        f"Deal created in {to_stage.value} stage" if from_stage is None
+                        else f"Moved from {from_stage.value} to {to_stage.value}"
+                    )
+                    activities.append({
+                        "deal_id": deal_id, "user_id": user.id, "activity_type": ActivityType.STAGE_CHANGE,
+                        "description": description, "created_at": at,
+                    })
+                    history.append({
+                        "deal_id": deal_id, "from_stage": from_stage, "to_stage": to_stage, "user_id": user.id,
+                        "at": at, "seconds_in_from_stage": (at - entered).total_seconds() if entered else None,
+                    })
+                    entered = at
+            db.execute(insert(Activity), activities)
+            db.execute(insert(DealStageHistory), history)
+            db.commit()
+        print(f"seeded {deals:,} deals, {db.query(DealStageHistory).count():,} transitions")
+
+
+def transitions_from_activities(db, start, end):
+    """The pre-history way: read every STAGE_CHANGE activity and parse its description."""
+    last_at, rows = {}, []
+    for deal_id, description, created_at in db.execute(
+        select(Activity.deal_id, Activity.description, Activity.created_at)
+        .where(Activity.activity_type == ActivityType.STAGE_CHANGE)
+        .order_by(Activity.deal_id, Activity.created_at, Activity.id)
+    ):
+        match = MOVED.match(description)
+        if match and deal_id in last_at and start <= created_at < end:
+            rows.append((DealStage(match.group(1)), DealStage(match.group(2)), created_at - last_at[deal_id]))
+        last_at[deal_id] = created_at
+    return rows
+
+
+def funnel_from_activities(db, start, end):
+    entered, advanced = Counter(), Counter()
+    for from_stage, to_stage, _ in transitions_from_activities(db, start, end):
+        entered[to_stage] += 1
+        if to_stage != DealStage.PASSED:
+            advanced[from_stage] += 1
+    return {stage: advanced[stage] / entered[stage] if entered[stage] else None for stage in DealStage}
+
+
+def percentile(ordered: list[float], fraction: float) -> float:
+    position = fraction * (len(ordered) - 1)
+    lower = ordered[int(position)]
+    upper = ordered[min(int(position) + 1, len(ordered) - 1)]
+    return lower + (upper - lower) * (position - int(position))
+
+
+def time_in_stage_from_activities(db, start, end):
+    durations = defaultdict(list)
+    for from_stage, _, elapsed in transitions_from_activities(db, start, end):
+        durations[from_stage].append(elapsed.total_seconds())
+    return {
+        stage: (percentile(sorted(values), 0.5), percentile(sorted(values), 0.9))
+        for stage, values in durations.items()
+    }
+
+
+def time_ms(fn, repeats: int) -> float:
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--deals", type=int, default=100_000)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    seed(args.deals, seed_value=42)
+    print(f"seeded in {time.perf_counter() - started:.1f}s")
+
+    # Naive bounds: SQLite stores and compares the timestamps as naive UTC text
+    ranges = {"all time": (START, START + timedelta(days=730)), "one quarter": (START + timedelta(days=90), START + timedelta(days=181))}
+    print(f"\n{'report':<16}{'range':<14}{'history ms':>12}{'activities ms':>15}")
+    with SessionLocal() as db:
+        for label, (start, end) in ranges.items():
+            naive = (start.replace(tzinfo=None), end.replace(tzinfo=None))
+            expected = time_in_stage_from_activities(db, *naive)
+            for row in get_time_in_stage(db, start, end):
+                assert (row["median_seconds"], row["p90_seconds"]) == expected.get(row["stage"], (None, None))
+            for report, fast, slow in (
+                ("funnel", get_funnel, funnel_from_activities),
+                ("time in stage", get_time_in_stage, time_in_stage_from_activities),
+            ):
+                history_ms = time_ms(lambda: fast(db, start, end), args.repeats)
+                activities_ms = time_ms(lambda: slow(db, *naive), max(1, args.repeats // 2))
+                print(f"{report:<16}{label:<14}{history_ms:>12.1f}{activities_ms:>15.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Cold start time of the API.
+
+Measures, against an already migrated database:
+
+* import: a fresh interpreter running ``import app.main`` (the work each
+  worker repeats before it can serve anything);
+* workers: launching ``WEB_CONCURRENCY=N uvicorn app.main:app`` until every
+  worker has finished its lifespan startup, and until the first
+  GET /health answers 200.
+
+    python -m benchmarks.startup --workers 1 4 --repeats 5
+
+Set DATABASE_URL to run against Postgres; the default is a throwaway
+SQLite file. --max-seconds fails the run when the slowest start for any
+worker count exceeds it, so the check can gate CI.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+import httpx
+
+from benchmarks.common import use_temporary_database
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+READY_LINE = "Application startup complete"
+
+
+def time_import() -> float:
+    started = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "import app.main"], cwd=BACKEND_DIR, check=True)
+    return time.perf_counter() - started
+
+
+def time_workers(port: int, workers: int, timeout: float = 60.0) -> tuple[float, float]:
+    """Seconds until the first 200 from /health, and until all workers are up."""
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port),
+         "--log-level", "info", "--no-access-log"],
+        cwd=BACKEND_DIR,
+        # The worker count is passed the way deployments pass it; the
+        # per-process response cache refuses several workers and does not
+        # affect start time
+        env={**os.environ, "WEB_CONCURRENCY": str(workers), "RESPONSE_CACHE_BACKEND": "none"},
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    all_ready = threading.Event()
+    ready_at = []
+
+    def watch_log():
+        ready = 0
+        for line in server.stderr:
+            if READY_LINE in line:
+                ready += 1
+                if ready == workers:
+                    ready_at.append(time.perf_counter() - started)
+                    all_ready.set()
+
+    threading.Thread(target=watch_log, daemon=True).start()
+    try:
+        first_response = None
+        deadline = time.monotonic() + timeout
+        while first_response is None and time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise RuntimeError(f"server exited with {server.returncode}")
+            try:
+                if httpx.get(f"http://127.0.0.1:{port}/health", timeout=1).status_code == 200:
+                    first_response = time.perf_counter() - started
+            except httpx.TransportError:
+                time.sleep(0.01)
+        if first_response is None or not all_ready.wait(max(0.0, deadline - time.monotonic())):
+            raise RuntimeError("server did not become ready")
+        return first_response, ready_at[0]
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def summarize(samples: list[float]) -> str:
+    return f"median {statistics.median(samples) * 1000:8.0f} ms   max {max(samples) * 1000:8.0f} ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8769)
+    parser.add_argument("--max-seconds", type=float, help="fail if any start takes longer")
+    args = parser.parse_args()
+
+    use_temporary_database()
+    imports = [time_import() for _ in range(args.repeats)]
+    print(f"import app.main            {summarize(imports)}")
+    slowest = max(imports)
+    for workers in args.workers:
+        first, all_up = zip(*(time_workers(args.port, workers) for _ in range(args.repeats)))
+        print(f"{workers:>2} worker(s), first 200   {summarize(first)}")
+        print(f"{workers:>2} worker(s), all started {summarize(all_up)}")
+        slowest = max(slowest, *all_up)
+
+    if args.max_seconds is not None and slowest > args.max_seconds:
+        sys.exit(f"slowest start took {slowest:.2f}s, above --max-seconds {args.max_seconds}")
+
+
+if __name__ == "__main__":
+    main()
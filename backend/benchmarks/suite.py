@@ -0,0 +1,269 @@
+"""Reproducible load test of the main user flows, with a stored baseline.
+
+Seeds a fresh database with --users users, --deals deals (--activities
+activities each) and memos with --versions versions on --memo-ratio of the
+deals, then drives each scenario in-process over ASGI with --concurrency
+concurrent clients:
+
+    board       GET /deals/board
+    memo_view   GET /memos/deal/{deal_id}
+    comment     POST /activities/comment
+    vote        POST /activities/deal/{deal_id}/vote (a fresh partner/deal pair each time)
+    memo_save   PUT /memos/{memo_id}
+    login       POST /users/login
+    mixed       all of the above, weighted like a working day
+
+Throughput and p50/p95/p99 latency per scenario are printed and saved as
+JSON. With --baseline the run is compared to an earlier result, and the
+command exits non-zero when any scenario's p95 latency or throughput is
+more than --max-regression worse.
+
+    python -m benchmarks.suite --save-baseline          # on the base branch
+    python -m benchmarks.suite --baseline benchmarks/results/baseline.json
+
+Workloads are deterministic for a given --seed. Set DATABASE_URL to a
+scratch Postgres database to benchmark against Postgres, and ASYNC_MODE=true
+for the async routes; the default is a throwaway SQLite file.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+from benchmarks.common import use_temporary_database
+
+use_temporary_database()
+
+import httpx
+from sqlalchemy import insert
+
+from app.main import app
+from app.core.config import settings
+from app.core.database import SessionLocal, engine
+from app.core.security import create_access_token, get_password_hash
+from app.users.models import User, UserRole
+from app.deals.models import Deal, DealStage
+from app.activities.models import Activity, ActivityType
+from app.memos.schemas import MemoCreate, MemoUpdate
+from app.memos.service import create_memo, update_memo
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+PASSWORD = "bench-password"
+MIX = {"board": 30, "memo_view": 25, "comment": 20, "vote": 10, "memo_save": 10, "login": 5}
+SCENARIOS = [*MIX, "mixed"]
+
+
+class Fixture:
+    """Ids and tokens of the seeded data that the scenarios pick from."""
+
+    def __init__(self, users: list[tuple[int, str, UserRole]], deal_ids: list[int], memos: dict[int, int], rng: random.Random):
+        self.rng = rng
+        self.emails = [email for _, email, _ in users]
+        self.tokens = {
+            role: [{"Authorization": f"Bearer {create_access_token({'sub': str(user_id)})}"} for user_id, _, r in users if r == role]
+            for role in UserRole
+        }
+        self.deal_ids = deal_ids
+        self.memos = list(memos.items())  # (deal_id, memo_id)
+        pairs = [(partner, deal_id) for partner in range(len(self.tokens[UserRole.PARTNER])) for deal_id in deal_ids]
+        rng.shuffle(pairs)
+        self.vote_pairs = iter(pairs)
+
+    def headers(self, role: UserRole) -> dict:
+        return self.rng.choice(self.tokens[role])
+
+
+def seed(args, rng: random.Random) -> Fixture:
+    hashed = get_password_hash(PASSWORD)
+    roles = [UserRole.ANALYST, UserRole.PARTNER, UserRole.ADMIN]
+    started = time.perf_counter()
+    with SessionLocal() as db:
+        users = db.execute(insert(User).returning(User.id, User.email, User.role), [
+            {"email": f"user{i}@bench.example.com", "hashed_password": hashed, "role": roles[i % 3], "full_name": f"User {i}"}
+            for i in range(args.users)
+        ]).all()
+        owner_ids = [user_id for user_id, _, role in users if role != UserRole.PARTNER]
+        stages = list(DealStage)
+        deal_ids = db.scalars(insert(Deal).returning(Deal.id), [
+            {"name": f"Company {i}", "owner_id": rng.choice(owner_ids), "stage": rng.choice(stages), "round": rng.choice(["Seed", "A", "B"])}
+            for i in range(args.deals)
+        ]).all()
+        user_ids = [user_id for user_id, _, _ in users]
+        for offset in range(0, len(deal_ids), 100):
+            rows = [
+                {"deal_id": deal_id, "user_id": rng.choice(user_ids), "activity_type": ActivityType.COMMENT, "description": f"Note {i}"}
+                for deal_id in deal_ids[offset:offset + 100] for i in range(args.activities)
+            ]
+            if rows:
+                db.execute(insert(Activity), rows)
+        db.commit()
+
+        memos = {}
+        for deal_id in rng.sample(deal_ids, int(len(deal_ids) * args.memo_ratio)):
+            author = rng.choice(owner_ids)
+            memo = create_memo(db, MemoCreate(deal_id=deal_id, summary="Initial summary", risks="Initial risks"), user_id=author)
+            for version in range(1, args.versions):
+                update_memo(db, memo.id, MemoUpdate(summary=f"Summary revision {version}"), user_id=author)
+            memos[deal_id] = memo.id
+        db.commit()
+    print(f"seeded {args.users:,} users, {args.deals:,} deals, {args.deals * args.activities:,} activities, "
+          f"{len(memos):,} memos in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+    return Fixture(users, deal_ids, memos, rng)
+
+
+def request_for(scenario: str, fixture: Fixture, sequence: int) -> tuple[str, str, dict | None, dict | None]:
+    """(method, path, JSON body, headers) of one request of the scenario."""
+    rng = fixture.rng
+    if scenario == "mixed":
+        scenario = rng.choices(list(MIX), weights=list(MIX.values()))[0]
+    if scenario == "board":
+        return "GET", "/deals/board", None, fixture.headers(rng.choice(list(UserRole)))
+    if scenario == "memo_view":
+        deal_id, _ = rng.choice(fixture.memos)
+        return "GET", f"/memos/deal/{deal_id}", None, fixture.headers(rng.choice(list(UserRole)))
+    if scenario == "comment":
+        body = {"deal_id": rng.choice(fixture.deal_ids), "comment": f"Comment {sequence}"}
+        return "POST", "/activities/comment", body, fixture.headers(rng.choice(list(UserRole)))
+    if scenario == "vote":
+        partner, deal_id = next(fixture.vote_pairs, (None, None))
+        if partner is None:
+            raise SystemExit("ran out of partner/deal pairs for votes; raise --users or --deals")
+        return "POST", f"/activities/deal/{deal_id}/vote", None, fixture.tokens[UserRole.PARTNER][partner]
+    if scenario == "memo_save":
+        _, memo_id = rng.choice(fixture.memos)
+        body = {"summary": f"Summary edit {sequence}", "risks": f"Risks edit {sequence}"}
+        return "PUT", f"/memos/{memo_id}", body, fixture.headers(UserRole.ANALYST)
+    if scenario == "login":
+        return "POST", "/users/login", {"email": rng.choice(fixture.emails), "password": PASSWORD}, None
+    raise ValueError(f"Unknown scenario {scenario!r}")
+
+
+async def drive(client: httpx.AsyncClient, plan: list, concurrency: int) -> tuple[list[float], int, float]:
+    """Send the planned requests from ``concurrency`` workers; returns latencies, errors and elapsed seconds."""
+    latencies, errors = [], 0
+    pending = iter(plan)
+
+    async def worker():
+        nonlocal errors
+        for method, path, body, headers in pending:
+            started = time.perf_counter()
+            response = await client.request(method, path, json=body, headers=headers)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - started
+
+
+def percentile(ordered: list[float], fraction: float) -> float:
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def run(args, fixture: Fixture) -> dict:
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        for scenario in args.scenarios:
+            warmup = [request_for(scenario, fixture, -i) for i in range(args.warmup)]
+            await drive(client, warmup, args.concurrency)
+            plan = [request_for(scenario, fixture, i) for i in range(args.requests)]
+            latencies, errors, elapsed = await drive(client, plan, args.concurrency)
+            ordered = sorted(latencies)
+            results[scenario] = {
+                "requests": len(latencies),
+                "errors": errors,
+                "seconds": round(elapsed, 3),
+                "throughput": round(len(latencies) / elapsed, 1),
+                "p50_ms": round(percentile(ordered, 0.50) * 1000, 2),
+                "p95_ms": round(percentile(ordered, 0.95) * 1000, 2),
+                "p99_ms": round(percentile(ordered, 0.99) * 1000, 2),
+            }
+            print(f"{scenario:<11}{results[scenario]['throughput']:>10,.0f} req/s{results[scenario]['p50_ms']:>10.1f}"
+                  f"{results[scenario]['p95_ms']:>10.1f}{results[scenario]['p99_ms']:>10.1f}{errors:>8}")
+    return results
+
+
+def environment(args) -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "database": engine.dialect.name,
+        "async_mode": settings.async_mode,
+        "python": platform.python_version(),
+        "machine": platform.platform(),
+        "cpus": os.cpu_count(),
+        "args": {name: value for name, value in vars(args).items() if name not in ("output", "baseline", "save_baseline")},
+    }
+
+
+def compare(results: dict, baseline: dict, max_regression: float) -> bool:
+    """Print the change against ``baseline``; returns False when a scenario regressed beyond the limit."""
+    for key in ("args", "database", "async_mode", "machine"):
+        if baseline["environment"][key] != results["environment"][key]:
+            print(f"\nwarning: the baseline was recorded with a different {key}", file=sys.stderr)
+    print(f"\n{'vs baseline':<11}{'req/s':>12}{'p95':>10}  baseline {baseline['environment']['commit']}")
+    ok = True
+    for scenario, current in results["scenarios"].items():
+        previous = baseline["scenarios"].get(scenario)
+        if previous is None:
+            continue
+        throughput = current["throughput"] / previous["throughput"] - 1
+        p95 = current["p95_ms"] / previous["p95_ms"] - 1
+        regressed = throughput < -max_regression or p95 > max_regression
+        ok = ok and not regressed
+        print(f"{scenario:<11}{throughput:>+12.1%}{p95:>+10.1%}{'  REGRESSED' if regressed else ''}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=300)
+    parser.add_argument("--deals", type=int, default=2_000)
+    parser.add_argument("--activities", type=int, default=20, help="activities per deal")
+    parser.add_argument("--memo-ratio", type=float, default=0.25, help="share of deals with a memo")
+    parser.add_argument("--versions", type=int, default=5, help="versions per memo")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--requests", type=int, default=500, help="measured requests per scenario")
+    parser.add_argument("--warmup", type=int, default=25, help="unmeasured requests before each scenario")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="results file (default benchmarks/results/suite-<time>.json)")
+    parser.add_argument("--baseline", help="earlier results file to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="also store the results as benchmarks/results/baseline.json")
+    parser.add_argument("--max-regression", type=float, default=0.15)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    fixture = seed(args, rng)
+    print(f"\n{'scenario':<11}{'throughput':>16}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    results = {"environment": environment(args), "scenarios": asyncio.run(run(args, fixture))}
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    output = args.output or os.path.join(RESULTS_DIR, f"suite-{datetime.now():%Y%m%d-%H%M%S}.json")
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nresults written to {output}")
+    if args.save_baseline:
+        shutil.copyfile(output, os.path.join(RESULTS_DIR, "baseline.json"))
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if not compare(results, baseline, args.max_regression):
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Partition upkeep and archival of the activity log; run it daily.
+
+    python -m jobs.archive_activities [--min-idle-days 90] [--months-ahead 3] [--dry-run]
+
+First creates the monthly ``activities`` partitions for the current month
+and --months-ahead months after it (Postgres only; a month without one
+falls into ``activities_default``). Then moves the activities of closed
+deals (INVESTED or PASSED, or DECLINED) with no activity for
+--min-idle-days into ``activity_archives`` (see app.activities.archive),
+--batch-size deals per transaction. The feed reads both, so nothing
+changes for clients. Re-running it only picks up what has aged since.
+"""
+import argparse
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import func, select
+
+from app.core.database import SessionLocal
+from app.core.schema import import_models
+from app.activities.archive import archive_deals, closed_deal_ids
+from app.activities.models import ActivityArchive
+from app.activities.partitions import ensure_partitions, next_month, month_start
+
+
+def finish(db, dry_run: bool) -> None:
+    if dry_run:
+        db.rollback()
+    else:
+        db.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--min-idle-days", type=int, default=90, help="archive closed deals idle this long")
+    parser.add_argument("--batch-size", type=int, default=200, help="deals per transaction")
+    parser.add_argument("--months-ahead", type=int, default=3, help="future monthly partitions to keep ready")
+    parser.add_argument("--dry-run", action="store_true", help="report the effect without writing anything")
+    args = parser.parse_args()
+
+    import_models()
+    now = datetime.now(timezone.utc)
+    with SessionLocal() as db:
+        last = month_start(now)
+        for _ in range(args.months_ahead):
+            last = next_month(last)
+        created = ensure_partitions(db.connection(), now, last)
+        finish(db, args.dry_run)
+        print(f"partitions created: {', '.join(created) or 'none'}")
+
+        idle_before = now - timedelta(days=args.min_idle_days)
+        deals = moved = 0
+        archived_bytes = 0
+        after_id = 0
+        while deal_ids := closed_deal_ids(db, after_id, args.batch_size):
+            archived = archive_deals(db, deal_ids, idle_before)
+            if archived:
+                archived_bytes += db.scalar(
+                    select(func.sum(func.length(ActivityArchive.entries)))
+                    .where(ActivityArchive.deal_id.in_(list(archived)))
+                )
+            deals += len(archived)
+            moved += sum(archived.values())
+            finish(db, args.dry_run)
+            after_id = deal_ids[-1]
+    print(f"deals archived: {deals:,}  activities moved: {moved:,}")
+    if moved:
+        print(f"archives of those deals: {archived_bytes:,} bytes ({archived_bytes / moved:.0f} per activity)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,396 @@
+"""Generate a large, referentially consistent synthetic dataset for scale testing.
+
+    python -m seed.synthetic --deals 10000 --activities 10000000
+
+Creates users; deals that have moved through the pipeline, with their
+stage history; partner votes; memos with version histories; and the
+activity log all of that implies (creation, stage moves, votes, memo
+saves, approvals and declines), topped up with comments until the log
+holds --activities rows. Comments are skewed towards a minority of hot
+deals, as in production.
+
+Rows are built in Python with explicit ids and bulk loaded: COPY on
+Postgres with psycopg2, batched executemany elsewhere (SQLite). The
+output is deterministic for a given --seed and --end. New ids continue
+after the existing ones, but emails are derived from ids and a second run
+adds a second dataset, so point DATABASE_URL at an empty scratch database.
+Every user's password is --password.
+
+--drop-indexes drops the secondary indexes of the loaded tables first
+and rebuilds them at the end, which is several times faster for large
+loads into an empty database.
+"""
+import argparse
+import csv
+import enum
+import io
+import random
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import Index, func, select, text
+from sqlalchemy.engine import Connection
+
+from app.core.database import engine
+from app.core.schema import upgrade
+from app.core.security import get_password_hash
+from app.users.models import User, UserRole
+from app.deals.models import Deal, DealStage, DealStageHistory, DealStatus, Vote
+from app.activities.models import Activity, ActivityType
+from app.activities.partitions import ensure_partitions
+from app.memos.models import Memo, MemoVersion
+from app.memos.versioning import MEMO_FIELDS, encode_delta, is_snapshot_version
+from app.search.service import index_missing_deals
+
+PIPELINE = [DealStage.SOURCED, DealStage.SCREEN, DealStage.DILIGENCE, DealStage.IC, DealStage.INVESTED]
+# Where deals end up: most never leave the top of the funnel
+FINAL_STAGE_WEIGHTS = {
+    DealStage.SOURCED: 35, DealStage.SCREEN: 20, DealStage.DILIGENCE: 12,
+    DealStage.IC: 5, DealStage.INVESTED: 5, DealStage.PASSED: 23,
+}
+VOTES_PER_STAGE = {
+    DealStage.SOURCED: (0, 1), DealStage.SCREEN: (0, 2), DealStage.DILIGENCE: (1, 4),
+    DealStage.IC: (2, 6), DealStage.INVESTED: (3, 8), DealStage.PASSED: (0, 3),
+}
+ROLE_WEIGHTS = {UserRole.ADMIN: 5, UserRole.ANALYST: 35, UserRole.PARTNER: 60}
+ROUNDS = ["Pre-seed", "Seed", "Series A", "Series B", "Series C"]
+
+WORDS = (
+    "revenue growth market customers retention churn pipeline enterprise pricing margin "
+    "competition regulatory founders hiring runway burn expansion product roadmap platform "
+    "integration partners distribution sales cycle contract renewal adoption usage cohort"
+).split()
+NAME_PARTS = (
+    "Acme Nova Blue Apex Quantum Lumen Vertex Atlas Cobalt Orbit Pixel Harbor Summit "
+    "Signal Cedar Flux Ember Aurora Helix Beacon Forge Relay Vector Prism Tidal Zenith"
+).split()
+NAME_SUFFIXES = ["Labs", "Robotics", "Health", "AI", "Systems", "Bio", "Pay", "Cloud", "Energy", "Analytics"]
+COMMENTS = [
+    "Strong founding team", "Need more data on retention", "Reference calls went well",
+    "Concerned about burn rate", "Market looks crowded", "Great unit economics",
+    "Follow up on the pricing model", "Customer interviews scheduled", "Waiting on the data room",
+    "Competitive round, move fast", "Revisit after next quarter", "Intro from a portfolio founder",
+]
+
+# Loaded in this order so foreign keys always point at rows already written
+TABLES = [User, Deal, DealStageHistory, Vote, Memo, MemoVersion, Activity]
+
+
+class Loader:
+    """Bulk-inserts rows given as tuples: COPY with psycopg2, Core executemany otherwise."""
+
+    def __init__(self, conn: Connection):
+        self.conn = conn
+        self.copy = conn.dialect.name == "postgresql" and conn.dialect.driver == "psycopg2"
+        self.rows = Counter()
+
+    def load(self, model, columns: tuple, rows: list[tuple]) -> None:
+        if not rows:
+            return
+        table = model.__table__
+        if self.copy:
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows([_csv_value(value) for value in row] for row in rows)
+            buffer.seek(0)
+            with self.conn.connection.dbapi_connection.cursor() as cursor:
+                cursor.copy_expert(f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+        else:
+            # Driver-level executemany of positional rows: Core inserts would
+            # compile and bind-process a dict per row, several times slower
+            processors = [
+                (index, processor) for index, name in enumerate(columns)
+                if (processor := table.c[name].type.dialect_impl(self.conn.dialect).bind_processor(self.conn.dialect))
+            ]
+            if processors:
+                rows = [list(row) for row in rows]
+                for row in rows:
+                    for index, processor in processors:
+                        row[index] = processor(row[index])
+            self.conn.exec_driver_sql(self._insert_sql(table, columns), [tuple(row) for row in rows])
+        self.rows[table.name] += len(rows)
+
+    def _insert_sql(self, table, columns: tuple) -> str:
+        placeholder = {"qmark": "?", "numeric": ":{}", "named": ":{}"}.get(self.conn.dialect.paramstyle, "%s")
+        values = [placeholder.format(index + 1 if self.conn.dialect.paramstyle == "numeric" else name) for index, name in enumerate(columns)]
+        return f"INSERT INTO {table.name} ({', '.join(columns)}) VALUES ({', '.join(values)})"
+
+
+def _csv_value(value):
+    # An empty unquoted field is NULL in COPY's csv format
+    if isinstance(value, enum.Enum):
+        return value.name
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, bytes):
+        return "\\x" + value.hex()
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+class Batch:
+    """Rows waiting to be loaded, per table; flushed in TABLES order."""
+
+    COLUMNS = {
+        User: ("id", "email", "hashed_password", "full_name", "role", "is_active", "created_at"),
+        Deal: ("id", "name", "company_url", "owner_id", "stage", "round", "check_size", "status",
+               "vote_count", "created_at", "updated_at", "row_version"),
+        DealStageHistory: ("id", "deal_id", "from_stage", "to_stage", "user_id", "at", "seconds_in_from_stage"),
+        Vote: ("id", "deal_id", "user_id", "created_at"),
+        Memo: ("id", "deal_id", "created_by_id", *MEMO_FIELDS, "created_at", "updated_at", "row_version"),
+        MemoVersion: ("id", "memo_id", "version_number", *MEMO_FIELDS, "is_snapshot", "delta", "created_by_id", "created_at"),
+        Activity: ("id", "deal_id", "user_id", "activity_type", "description", "created_at"),
+    }
+
+    def __init__(self, loader: Loader, next_ids: dict, size: int):
+        self.loader = loader
+        self.next_ids = next_ids
+        self.size = size
+        self.rows = {model: [] for model in TABLES}
+        self.pending = 0
+
+    def add(self, model, *values) -> int:
+        """Queue a row (without its id) and return the id assigned to it."""
+        row_id = self.next_ids[model]
+        self.next_ids[model] += 1
+        self.rows[model].append((row_id, *values))
+        self.pending += 1
+        return row_id
+
+    def full(self) -> bool:
+        return self.pending >= self.size
+
+    def flush(self) -> None:
+        for model in TABLES:
+            self.loader.load(model, self.COLUMNS[model], self.rows[model])
+            self.rows[model] = []
+        self.loader.conn.commit()
+        self.pending = 0
+
+
+def paragraph(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choices(WORDS, k=words))
+
+
+def revise(rng: random.Random, content: dict) -> dict:
+    """A typical memo save: a few words changed in one or two fields, sometimes a sentence added."""
+    content = dict(content)
+    for field in rng.sample(MEMO_FIELDS, rng.randint(1, 2)):
+        words = content[field].split(" ")
+        for _ in range(rng.randint(1, 5)):
+            words[rng.randrange(len(words))] = rng.choice(WORDS)
+        if rng.random() < 0.3:
+            words.extend(rng.choices(WORDS, k=12))
+        content[field] = " ".join(words)
+    return content
+
+
+def spread(rng: random.Random, start: datetime, end: datetime, count: int) -> list[datetime]:
+    """``count`` sorted random moments between ``start`` and ``end``."""
+    span = max(0.0, (end - start).total_seconds())
+    return [start + timedelta(seconds=offset) for offset in sorted(rng.random() * span for _ in range(count))]
+
+
+class Generator:
+    def __init__(self, args, batch: Batch):
+        self.args = args
+        self.batch = batch
+        self.end = args.end
+        self.start = args.end - timedelta(days=args.days)
+        self.hashed_password = get_password_hash(args.password)
+
+    def rng(self, name: str) -> random.Random:
+        # One stream per concern, so changing one volume leaves the others' data unchanged
+        return random.Random(f"{self.args.seed}:{name}")
+
+    def users(self) -> dict[UserRole, list[int]]:
+        rng = self.rng("users")
+        by_role = {role: [] for role in UserRole}
+        roles = rng.choices(list(ROLE_WEIGHTS), weights=list(ROLE_WEIGHTS.values()), k=self.args.users)
+        # Guarantee someone to own deals and someone to vote
+        roles[:2] = [UserRole.ANALYST, UserRole.PARTNER]
+        for number, role in enumerate(roles):
+            row_id = self.batch.next_ids[User]
+            self.batch.add(
+                User, f"user{row_id}@synthetic.example.com", self.hashed_password, f"User {number}",
+                role, True, self.start + timedelta(seconds=rng.random() * 86400),
+            )
+            by_role[role].append(row_id)
+        return by_role
+
+    def deals(self, users: dict[UserRole, list[int]]) -> list[tuple[int, datetime, datetime]]:
+        """Deals with their history, votes, memos and non-comment activities; returns (id, created, last_activity)."""
+        rng = self.rng("deals")
+        owners = users[UserRole.ANALYST] + users[UserRole.ADMIN]
+        partners = users[UserRole.PARTNER]
+        finals = rng.choices(list(FINAL_STAGE_WEIGHTS), weights=list(FINAL_STAGE_WEIGHTS.values()), k=self.args.deals)
+        lifetimes = []
+        for final in finals:
+            owner = rng.choice(owners)
+            if final == DealStage.PASSED:
+                path = PIPELINE[:rng.choices([1, 2, 3, 4], weights=[50, 30, 15, 5])[0]] + [DealStage.PASSED]
+            else:
+                path = PIPELINE[:PIPELINE.index(final) + 1]
+            created = self.start + timedelta(seconds=rng.random() * (self.end - self.start).total_seconds())
+            # Weeks between moves, squeezed to fit when the deal is recent
+            gaps = [rng.expovariate(1 / (14 * 86400)) for _ in path[1:]]
+            room = (self.end - created).total_seconds() * 0.9
+            if sum(gaps) > room:
+                gaps = [gap * room / sum(gaps) for gap in gaps]
+            moved_at = [created]
+            for gap in gaps:
+                moved_at.append(moved_at[-1] + timedelta(seconds=gap))
+
+            status = DealStatus.ACTIVE
+            if final == DealStage.INVESTED or (final == DealStage.IC and rng.random() < 0.3):
+                status = DealStatus.APPROVED
+            elif final == DealStage.PASSED and rng.random() < 0.7:
+                status = DealStatus.DECLINED
+            low, high = VOTES_PER_STAGE[final]
+            voters = rng.sample(partners, min(len(partners), rng.randint(low, high)))
+
+            deal_id = self.batch.next_ids[Deal]
+            name = f"{rng.choice(NAME_PARTS)} {rng.choice(NAME_PARTS)} {rng.choice(NAME_SUFFIXES)}"
+            check_size = rng.choice([250_000, 500_000, 1_000_000, 2_000_000, 5_000_000]) if len(path) > 2 else None
+            self.batch.add(
+                Deal, name, f"https://{name.lower().replace(' ', '-')}-{deal_id}.example.com", owner, final,
+                rng.choice(ROUNDS), check_size, status, len(voters), created, moved_at[-1], len(path),
+            )
+            self.batch.add(DealStageHistory, deal_id, None, path[0], owner, created, None)
+            self.batch.add(Activity, deal_id, owner, ActivityType.STAGE_CHANGE, f"Deal created in {path[0].value} stage", created)
+            for before, after, at, gap in zip(path, path[1:], moved_at[1:], gaps):
+                self.batch.add(DealStageHistory, deal_id, before, after, owner, at, gap)
+                self.batch.add(Activity, deal_id, owner, ActivityType.STAGE_CHANGE, f"Moved from {before.value} to {after.value}", at)
+            last = moved_at[-1]
+            for voter, at in zip(voters, spread(rng, created, self.end, len(voters))):
+                self.batch.add(Vote, deal_id, voter, at)
+                self.batch.add(Activity, deal_id, voter, ActivityType.VOTE, "Voted on this deal", at)
+                last = max(last, at)
+            if status != DealStatus.ACTIVE and partners:
+                at = moved_at[-1] + timedelta(seconds=rng.random() * 3600)
+                if status == DealStatus.APPROVED:
+                    self.batch.add(Activity, deal_id, rng.choice(partners), ActivityType.APPROVAL, "Approved this deal", at)
+                else:
+                    self.batch.add(Activity, deal_id, rng.choice(partners), ActivityType.DECLINE, "Declined this deal", at)
+                last = max(last, at)
+            if len(path) > 1 and rng.random() < self.args.memo_ratio:
+                last = max(last, self.memo(rng, deal_id, owner, moved_at[1]))
+            lifetimes.append((deal_id, created, last))
+            if self.batch.full():
+                self.batch.flush()
+        return lifetimes
+
+    def memo(self, rng: random.Random, deal_id: int, author: int, started: datetime) -> datetime:
+        """A memo written from the screen stage on, saved a random number of times. Returns its last save."""
+        saves = min(self.args.max_versions, 1 + int(rng.expovariate(1 / max(1, self.args.versions - 1))))
+        content = {field: paragraph(rng, rng.randint(40, 120)) for field in MEMO_FIELDS}
+        # Versions hold the memo as it was before each save, like the memo service writes them
+        history = [content]
+        for _ in range(saves - 1):
+            history.append(revise(rng, history[-1]))
+        saved_at = spread(rng, started, self.end, saves)
+        memo_id = self.batch.add(
+            Memo, deal_id, author, *(history[-1][field] for field in MEMO_FIELDS), saved_at[0], saved_at[-1], saves,
+        )
+        versions = [history[0], *history[:-1]]
+        for number, (version, at) in enumerate(zip(versions, saved_at), start=1):
+            if is_snapshot_version(number):
+                self.batch.add(MemoVersion, memo_id, number, *(version[field] for field in MEMO_FIELDS), True, None, author, at)
+            else:
+                delta = encode_delta(versions[number - 2], version)
+                self.batch.add(MemoVersion, memo_id, number, *(None for _ in MEMO_FIELDS), False, delta, author, at)
+            if number > 1:
+                self.batch.add(Activity, deal_id, author, ActivityType.MEMO_UPDATED, f"Memo updated (version {number})", at)
+        return saved_at[-1]
+
+    def comments(self, users: dict[UserRole, list[int]], lifetimes: list[tuple[int, datetime, datetime]], count: int) -> None:
+        """``count`` comments, Pareto-distributed over the deals and spread over each deal's life."""
+        rng = self.rng("comments")
+        if count <= 0 or not lifetimes:
+            return
+        authors = [user_id for ids in users.values() for user_id in ids]
+        weights = [rng.paretovariate(1.2) for _ in lifetimes]
+        total = sum(weights)
+        shares = [int(count * weight / total) for weight in weights]
+        for index in rng.choices(range(len(lifetimes)), weights=weights, k=count - sum(shares)):
+            shares[index] += 1
+        for (deal_id, created, _), share in zip(lifetimes, shares):
+            span = (self.end - created).total_seconds()
+            for _ in range(share):
+                at = created + timedelta(seconds=rng.random() * span)
+                self.batch.add(Activity, deal_id, rng.choice(authors), ActivityType.COMMENT, rng.choice(COMMENTS), at)
+                if self.batch.full():
+                    self.batch.flush()
+                    print(f"\r{self.batch.loader.rows['activities']:,} activities", end="", file=sys.stderr)
+        print(file=sys.stderr)
+
+
+def secondary_indexes() -> list[Index]:
+    return [index for model in TABLES for index in model.__table__.indexes]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--deals", type=int, default=10_000)
+    parser.add_argument("--activities", type=int, default=1_000_000, help="total activity rows, comments included")
+    parser.add_argument("--memo-ratio", type=float, default=0.6, help="share of deals past sourcing with a memo")
+    parser.add_argument("--versions", type=int, default=15, help="mean versions per memo")
+    parser.add_argument("--max-versions", type=int, default=500)
+    parser.add_argument("--days", type=int, default=730, help="history length")
+    parser.add_argument("--end", type=lambda value: datetime.fromisoformat(value).replace(tzinfo=timezone.utc),
+                        default=datetime(2026, 1, 1, tzinfo=timezone.utc), help="date the history ends (ISO)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--password", default="password")
+    parser.add_argument("--batch-size", type=int, default=50_000, help="rows per COPY / executemany round")
+    parser.add_argument("--drop-indexes", action="store_true", help="rebuild secondary indexes after loading")
+    args = parser.parse_args()
+
+    upgrade()
+    started = time.perf_counter()
+    with engine.connect() as conn:
+        if conn.dialect.name == "sqlite":
+            # The load is all or nothing for a scratch database; skip fsyncs
+            conn.exec_driver_sql("PRAGMA synchronous = OFF")
+        if args.drop_indexes:
+            for index in secondary_indexes():
+                index.drop(conn, checkfirst=True)
+            conn.commit()
+        # Monthly activity partitions for the whole history (Postgres), so nothing lands in the default one
+        ensure_partitions(conn, args.end - timedelta(days=args.days), args.end)
+        conn.commit()
+        next_ids = {model: (conn.scalar(select(func.max(model.id))) or 0) + 1 for model in TABLES}
+        loader = Loader(conn)
+        batch = Batch(loader, next_ids, args.batch_size)
+        generator = Generator(args, batch)
+
+        users = generator.users()
+        lifetimes = generator.deals(users)
+        batch.flush()
+        generator.comments(users, lifetimes, args.activities - loader.rows["activities"])
+        batch.flush()
+        loaded = time.perf_counter() - started
+
+        if args.drop_indexes:
+            for index in secondary_indexes():
+                index.create(conn, checkfirst=True)
+        if conn.dialect.name == "postgresql":
+            for model in TABLES:
+                table = model.__table__.name
+                conn.execute(text(f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT MAX(id) FROM {table}))"))
+        conn.commit()
+        conn.exec_driver_sql("ANALYZE")
+        conn.commit()
+    index_missing_deals(engine)
+
+    total = sum(loader.rows.values())
+    for table, rows in loader.rows.items():
+        print(f"{table:<20}{rows:>14,}")
+    print(f"{total:,} rows loaded in {loaded:.1f}s ({total / loaded:,.0f} rows/s), "
+          f"{time.perf_counter() - started:.1f}s including indexes and statistics")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Shared fixtures: a migrated throwaway database, the app, a client and query budgets.
+
+The settings are read when ``app`` is first imported, so the environment is
+set here before any test module imports it. Tests run against a temporary
+SQLite file unless DATABASE_URL is set, in the sync or async mode that
+ASYNC_MODE selects. Rows are committed, so each test creates the users and
+deals it needs rather than relying on an empty database.
+"""
+import itertools
+import os
+import tempfile
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test.db')}")
+# Budgets count statements that reach the database, not cache hits
+os.environ.setdefault("RESPONSE_CACHE_BACKEND", "none")
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.schema import upgrade
+
+upgrade()
+
+from app.main import app as fastapi_app
+from app.core.database import SessionLocal
+from app.core.profiler import assert_max_queries
+from app.core.security import create_access_token, get_password_hash
+from app.users.models import User, UserRole
+
+_ids = itertools.count(1)
+
+
+@pytest.fixture(scope="session")
+def app():
+    return fastapi_app
+
+
+@pytest.fixture(scope="session")
+def client(app):
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def db():
+    with SessionLocal() as session:
+        yield session
+
+
+@pytest.fixture
+def make_user(db):
+    """Create a user with ``role`` and return (user, Authorization headers). Its password is "password"."""
+    def make(role: UserRole = UserRole.ANALYST) -> tuple[User, dict]:
+        user = User(
+            email=f"{role.value}{next(_ids)}@test.example.com",
+            hashed_password=get_password_hash("password"),
+            full_name=f"Test {role.value}",
+            role=role,
+        )
+        db.add(user)
+        db.commit()
+        return user, {"Authorization": f"Bearer {create_access_token({'sub': str(user.id)})}"}
+
+    return make
+
+
+@pytest.fixture
+def analyst(make_user):
+    return make_user(UserRole.ANALYST)[1]
+
+
+@pytest.fixture
+def partner(make_user):
+    return make_user(UserRole.PARTNER)[1]
+
+
+@pytest.fixture
+def admin(make_user):
+    return make_user(UserRole.ADMIN)[1]
+
+
+@pytest.fixture
+def make_deal(client, analyst):
+    """Create a deal through the API and return its JSON."""
+    def make(**fields) -> dict:
+        response = client.post("/deals", json={"name": f"Deal {next(_ids)}", **fields}, headers=analyst)
+        assert response.status_code == 201, response.text
+        return response.json()
+
+    return make
+
+
+@pytest.fixture
+def max_queries():
+    """``with max_queries(3): ...`` fails the test when the block runs more than 3 SQL statements."""
+    return assert_max_queries
@@ -0,0 +1,33 @@
+"""The board returns every stage's first cards, and column pages continue from next_cursor."""
+
+
+def test_column_pages_cover_the_whole_stage(client, analyst, make_deal):
+    for _ in range(5):
+        make_deal(stage="diligence")
+    make_deal(stage="diligence", status="declined")
+    expected = [deal["id"] for deal in client.get("/deals?stage=diligence&limit=1000", headers=analyst).json()]
+
+    board = client.get("/deals/board?limit=2", headers=analyst).json()
+    assert [column["stage"] for column in board["columns"]] == [
+        "sourced", "screen", "diligence", "ic", "invested", "passed",
+    ]
+    column = board["columns"][2]
+    assert column["total"] == len(expected)
+    ids = [card["id"] for card in column["cards"]]
+    assert len(ids) == 2
+    while column["next_cursor"]:
+        column = client.get(
+            f"/deals/board/diligence?limit=2&cursor={column['next_cursor']}", headers=analyst
+        ).json()
+        assert column["total"] == len(expected)
+        ids += [card["id"] for card in column["cards"]]
+    assert ids == expected
+
+
+def test_status_filter_applies_to_cards_and_totals(client, analyst, make_deal):
+    declined = make_deal(stage="invested", status="declined")
+    column = client.get("/deals/board?status=declined&limit=1000", headers=analyst).json()["columns"][4]
+    assert declined["id"] in [card["id"] for card in column["cards"]]
+    assert {card["status"] for card in column["cards"]} == {"declined"}
+    assert column["total"] == len(column["cards"])
+    assert column["next_cursor"] is None
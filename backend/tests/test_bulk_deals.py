@@ -0,0 +1,39 @@
+"""Bulk create and update report bad rows in `errors` and still apply the good ones."""
+
+
+def test_bulk_update_applies_valid_rows_around_invalid_ones(client, analyst, make_deal):
+    deal = make_deal(round="Seed")
+    rows = [
+        {"id": deal["id"], "name": None},
+        {"id": deal["id"], "round": "A"},
+        "not a row",
+        {"id": deal["id"]},
+        {"id": deal["id"], "stage": None, "status": None},
+        {"id": 0, "round": "B"},
+        {"id": deal["id"], "stage": "screen"},
+    ]
+    response = client.patch("/deals/bulk", json={"deals": rows}, headers=analyst)
+    assert response.status_code == 200, response.text
+    body = response.json()
+
+    errors = {error["index"]: error for error in body["errors"]}
+    assert sorted(errors) == [0, 2, 3, 4, 5]
+    assert errors[0]["detail"] == "name cannot be null"
+    assert errors[2]["id"] is None
+    assert errors[3]["detail"] == "No fields to update"
+    assert errors[4]["detail"] == "stage, status cannot be null"
+    assert errors[5]["detail"] == "Deal not found"
+    assert [(updated["id"], updated["round"], updated["stage"]) for updated in body["deals"]] == [
+        (deal["id"], "A", "screen"),
+    ]
+
+    stored = client.get(f"/deals/{deal['id']}", headers=analyst).json()
+    assert (stored["name"], stored["round"], stored["stage"]) == (deal["name"], "A", "screen")
+
+
+def test_bulk_create_reports_non_object_rows(client, analyst):
+    response = client.post("/deals/bulk", json={"deals": [{"name": "Bulk created"}, 7, {"name": None}]}, headers=analyst)
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert [deal["name"] for deal in body["deals"]] == ["Bulk created"]
+    assert [error["index"] for error in body["errors"]] == [1, 2]
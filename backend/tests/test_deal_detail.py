@@ -0,0 +1,35 @@
+"""GET /deals/{id}/detail: the memo viewer's composite response, in three statements."""
+from app.core.profiler import assert_max_queries
+
+
+def test_detail_in_three_statements(client, analyst, partner, make_deal):
+    deal = make_deal()
+    client.post("/memos", json={"deal_id": deal["id"], "summary": "Strong team"}, headers=analyst)
+    for i in range(25):
+        client.post("/activities/comment", json={"deal_id": deal["id"], "comment": f"Comment {i}"}, headers=partner)
+    client.post(f"/activities/deal/{deal['id']}/vote", headers=partner)
+
+    with assert_max_queries(3):
+        response = client.get(f"/deals/{deal['id']}/detail", headers=partner)
+
+    assert response.status_code == 200
+    detail = response.json()
+    assert detail["deal"]["id"] == deal["id"]
+    assert detail["memo"]["summary"] == "Strong team"
+    assert detail["vote_count"] == 1 and detail["my_vote"]["deal_id"] == deal["id"]
+    assert len(detail["activities"]) == 20
+    assert detail["activities"][0]["description"] == "Voted on this deal"
+    older = client.get(f"/activities/deal/{deal['id']}?limit=20&cursor={detail['activities_next_cursor']}", headers=partner)
+    assert len(older.json()) == 7
+
+
+def test_detail_without_memo_or_vote(client, analyst, make_deal):
+    deal = make_deal()
+    with assert_max_queries(3):
+        detail = client.get(f"/deals/{deal['id']}/detail", headers=analyst).json()
+    assert detail["memo"] is None and detail["my_vote"] is None
+    assert detail["activities_next_cursor"] is None
+
+
+def test_detail_of_missing_deal(client, analyst):
+    assert client.get("/deals/999999/detail", headers=analyst).status_code == 404
@@ -0,0 +1,68 @@
+"""The live-updates WebSocket: subscription commands, pushed events and losing access."""
+import pytest
+from fastapi import status
+from starlette.websockets import WebSocketDisconnect
+
+from app.core.config import settings
+from app.core.principal_cache import principal_cache
+from app.events import routes as events_routes
+
+
+def token(headers: dict) -> str:
+    return headers["Authorization"].removeprefix("Bearer ")
+
+
+@pytest.mark.parametrize("command", [
+    '{"subscribe": 5}',
+    '{"unsubscribe": null}',
+    '{"subscribe": "board"}',
+    '{"subscribe": {"deal:1": true}}',
+])
+def test_malformed_subscription_gets_an_error_frame(client, analyst, command):
+    with client.websocket_connect(f"/events/ws?token={token(analyst)}") as ws:
+        assert ws.receive_json()["type"] == "subscribed"
+        ws.send_text(command)
+        assert ws.receive_json() == {"type": "error", "detail": "subscribe and unsubscribe must be lists of topics"}
+        # The connection is still serving commands
+        ws.send_text('{"subscribe": ["deal:1"]}')
+        assert ws.receive_json() == {"type": "subscribed", "topics": ["board", "deal:1"]}
+
+
+def test_unknown_topics_are_rejected(client, analyst):
+    with client.websocket_connect(f"/events/ws?token={token(analyst)}") as ws:
+        ws.receive_json()
+        ws.send_text('{"subscribe": ["deal:x", 3]}')
+        assert ws.receive_json()["type"] == "error"
+
+
+def test_board_events_are_pushed(client, analyst, make_deal):
+    with client.websocket_connect(f"/events/ws?token={token(analyst)}") as ws:
+        ws.receive_json()
+        deal = make_deal(name="Live")
+        event = ws.receive_json()
+        assert event["type"] == "deal.created" and event["deal"]["id"] == deal["id"]
+
+
+def test_deactivation_closes_the_users_sockets(client, admin, make_user):
+    user, headers = make_user()
+    with client.websocket_connect(f"/events/ws?token={token(headers)}") as ws:
+        ws.receive_json()
+        assert client.put(f"/users/{user.id}", json={"is_active": False}, headers=admin).status_code == 200
+        with pytest.raises(WebSocketDisconnect) as closed:
+            ws.receive_json()
+    assert closed.value.code == status.WS_1008_POLICY_VIOLATION
+
+
+def test_deactivation_through_another_worker_closes_sockets_on_recheck(client, db, make_user, monkeypatch):
+    user, headers = make_user()
+    monkeypatch.setattr(events_routes, "MIN_ACCESS_CHECK_SECONDS", 0.05)
+    monkeypatch.setattr(settings, "principal_cache_ttl_seconds", 0.05)
+    with client.websocket_connect(f"/events/ws?token={token(headers)}") as ws:
+        ws.receive_json()
+        # Written behind this worker's back, as another worker would; the cached principal then expires
+        user.is_active = False
+        db.commit()
+        principal_cache.invalidate(user.id)
+        with pytest.raises(WebSocketDisconnect) as closed:
+            ws.receive_json()
+    assert closed.value.code == status.WS_1008_POLICY_VIOLATION
@@ -0,0 +1,98 @@
+"""``alembic upgrade head`` adopts a database built by the old create_all and backfills its data.
+
+The legacy database is a scratch SQLite file migrated in a subprocess, since
+the app's engine is bound to the shared test database.
+"""
+import os
+import subprocess
+import sys
+
+from sqlalchemy import create_engine, text
+
+from app.core.database import Base
+from app.core.schema import head_revisions, import_models
+from app.memos.versioning import MEMO_FIELDS, apply_delta
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# What create_all built before deal_stage_history, vote counts, row versions and delta storage
+LEGACY_TABLES = ("users", "deals", "activities", "memos", "votes", "memo_versions")
+LATER_COLUMNS = (
+    ("deals", "vote_count"), ("deals", "row_version"), ("memos", "row_version"),
+    ("memo_versions", "is_snapshot"), ("memo_versions", "delta"),
+)
+LATER_INDEXES = ("ix_memo_versions_memo_id_version_number", "ix_deals_stage_id", "ix_deals_owner_id_id")
+
+
+def legacy_database(url: str) -> None:
+    import_models()
+    engine = create_engine(url)
+    Base.metadata.create_all(engine, tables=[Base.metadata.tables[name] for name in LEGACY_TABLES])
+    with engine.begin() as conn:
+        for name in LATER_INDEXES:
+            conn.exec_driver_sql(f"DROP INDEX IF EXISTS {name}")
+        for table, column in LATER_COLUMNS:
+            conn.exec_driver_sql(f"ALTER TABLE {table} DROP COLUMN {column}")
+        conn.exec_driver_sql(
+            "INSERT INTO users (id, email, hashed_password, role, is_active) VALUES "
+            "(1, 'analyst@example.com', 'x', 'ANALYST', 1), (2, 'partner@example.com', 'x', 'PARTNER', 1)"
+        )
+        conn.exec_driver_sql(
+            "INSERT INTO deals (id, name, owner_id, stage, status, created_at) VALUES "
+            "(1, 'Moved', 1, 'SCREEN', 'ACTIVE', '2024-01-01 00:00:00'), "
+            "(2, 'Untouched', 1, 'SOURCED', 'ACTIVE', '2024-01-02 00:00:00')"
+        )
+        conn.exec_driver_sql("INSERT INTO votes (deal_id, user_id) VALUES (1, 1), (1, 2)")
+        conn.exec_driver_sql(
+            "INSERT INTO activities (deal_id, user_id, activity_type, description, created_at) VALUES "
+            "(1, 1, 'STAGE_CHANGE', 'Deal created in sourced stage', '2024-01-01 00:00:00'), "
+            "(1, 2, 'STAGE_CHANGE', 'Moved from sourced to screen', '2024-01-03 00:00:00'), "
+            "(1, 1, 'COMMENT', 'Looks good', '2024-01-04 00:00:00')"
+        )
+        conn.exec_driver_sql("INSERT INTO memos (id, deal_id, created_by_id) VALUES (1, 1, 1)")
+        for number in (1, 2, 3):
+            conn.exec_driver_sql(
+                "INSERT INTO memo_versions (memo_id, version_number, summary, risks, created_by_id) "
+                f"VALUES (1, {number}, 'Summary, take {number}', 'Burn', 1)"
+            )
+    engine.dispose()
+
+
+def test_upgrade_adopts_a_create_all_database(tmp_path):
+    url = f"sqlite:///{tmp_path / 'legacy.db'}"
+    legacy_database(url)
+
+    result = subprocess.run(
+        [sys.executable, "-m", "alembic", "upgrade", "head"],
+        cwd=BACKEND_DIR,
+        env={**os.environ, "DATABASE_URL": url, "MEMO_VERSION_STORAGE": "delta", "MEMO_SNAPSHOT_INTERVAL": "10"},
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    assert result.returncode == 0, result.stderr
+
+    engine = create_engine(url)
+    with engine.connect() as conn:
+        assert set(conn.scalars(text("SELECT version_num FROM alembic_version"))) == set(head_revisions())
+        assert conn.execute(text("SELECT id, vote_count, row_version FROM deals ORDER BY id")).all() == [
+            (1, 2, 1), (2, 0, 1),
+        ]
+        history = conn.execute(text(
+            "SELECT deal_id, from_stage, to_stage, user_id, seconds_in_from_stage "
+            "FROM deal_stage_history ORDER BY deal_id, at"
+        )).all()
+        assert history == [
+            (1, None, "SOURCED", 1, None),
+            (1, "SOURCED", "SCREEN", 2, 2 * 24 * 3600.0),
+            (2, None, "SOURCED", 1, None),
+        ]
+        versions = conn.execute(text(
+            f"SELECT is_snapshot, delta, {', '.join(MEMO_FIELDS)} FROM memo_versions ORDER BY version_number"
+        )).all()
+    engine.dispose()
+
+    assert [bool(version.is_snapshot) for version in versions] == [True, False, False]
+    content = {field: getattr(versions[0], field) for field in MEMO_FIELDS}
+    for number, version in enumerate(versions[1:], start=2):
+        content = apply_delta(content, version.delta)
+        assert content["summary"] == f"Summary, take {number}" and content["risks"] == "Burn"
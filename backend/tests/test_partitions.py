@@ -0,0 +1,99 @@
+"""Monthly activity partitions on Postgres: rows move out of the default partition under a lock.
+
+Needs an empty scratch database at TEST_POSTGRES_URL; it is migrated with
+``alembic upgrade head`` in a subprocess, since the app's engine is bound to
+the shared SQLite test database.
+"""
+import os
+import subprocess
+import sys
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from app.activities.partitions import DEFAULT_PARTITION, ensure_partitions, existing_partitions
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+POSTGRES_URL = os.environ.get("TEST_POSTGRES_URL")
+# Far enough ahead that no migration or job has created it
+MONTH = date(2099, 1, 1)
+MONTH_START = "2099-01-01 00:00:00+00"
+PARTITION = "activities_2099_01"
+
+pytestmark = [
+    pytest.mark.postgres,
+    pytest.mark.skipif(not POSTGRES_URL, reason="TEST_POSTGRES_URL is not set"),
+]
+
+
+@pytest.fixture(scope="module")
+def pg_engine():
+    subprocess.run(
+        [sys.executable, "-m", "alembic", "upgrade", "head"],
+        cwd=BACKEND_DIR, env={**os.environ, "DATABASE_URL": POSTGRES_URL}, check=True, timeout=120,
+    )
+    engine = create_engine(POSTGRES_URL)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def deal_id(pg_engine):
+    with pg_engine.begin() as conn:
+        conn.execute(text(f"DROP TABLE IF EXISTS {PARTITION}"))
+        conn.execute(text(f"DELETE FROM {DEFAULT_PARTITION} WHERE created_at >= CAST(:start AS timestamptz)"), {"start": MONTH_START})
+        user_id = conn.scalar(text(
+            "INSERT INTO users (email, hashed_password, role, is_active) "
+            "VALUES ('partitions-' || gen_random_uuid() || '@example.com', 'x', 'ANALYST', true) RETURNING id"
+        ))
+        return conn.scalar(text(
+            "INSERT INTO deals (name, owner_id, stage, status) VALUES ('Partitioned', :user_id, 'SOURCED', 'ACTIVE') "
+            "RETURNING id"
+        ), {"user_id": user_id})
+
+
+def insert_activity(conn, deal_id: int, description: str) -> None:
+    conn.execute(text(
+        "INSERT INTO activities (deal_id, user_id, activity_type, description, created_at) "
+        "SELECT :deal_id, owner_id, 'COMMENT', :description, CAST(:at AS timestamptz) FROM deals WHERE id = :deal_id"
+    ), {"deal_id": deal_id, "description": description, "at": MONTH_START})
+
+
+def test_new_partition_takes_rows_from_the_default_partition(pg_engine, deal_id):
+    with pg_engine.begin() as conn:
+        insert_activity(conn, deal_id, "Before the partition")
+
+    with pg_engine.begin() as conn:
+        assert ensure_partitions(conn, MONTH, MONTH) == [PARTITION]
+        assert ensure_partitions(conn, MONTH, MONTH) == []
+        assert PARTITION in existing_partitions(conn)
+
+    with pg_engine.connect() as conn:
+        rows = conn.execute(text(
+            "SELECT tableoid::regclass::text, description FROM activities WHERE deal_id = :deal_id"
+        ), {"deal_id": deal_id}).all()
+    assert rows == [(PARTITION, "Before the partition")]
+
+
+def test_writes_wait_until_the_partition_is_attached(pg_engine, deal_id):
+    with pg_engine.connect() as job, pg_engine.connect() as writer:
+        job.begin()
+        ensure_partitions(job, MONTH, MONTH)
+        # Taken before the move, so no insert can reach the default partition until the ATTACH commits
+        assert "ShareRowExclusiveLock" in job.scalars(text(
+            "SELECT mode FROM pg_locks WHERE relation = 'activities'::regclass AND pid = pg_backend_pid()"
+        )).all()
+        writer.begin()
+        writer.execute(text("SET LOCAL lock_timeout = '200ms'"))
+        with pytest.raises(OperationalError, match="lock timeout"):
+            insert_activity(writer, deal_id, "During the move")
+        writer.rollback()
+        job.commit()
+
+    with pg_engine.begin() as conn:
+        insert_activity(conn, deal_id, "After the attach")
+        assert conn.scalar(text(
+            "SELECT tableoid::regclass::text FROM activities WHERE deal_id = :deal_id"
+        ), {"deal_id": deal_id}) == PARTITION
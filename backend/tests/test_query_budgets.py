@@ -0,0 +1,89 @@
+"""Statement budgets for the hot endpoints, and the counting helpers behind them.
+
+Budgets are for a caller whose principal is already cached (see
+app.core.principal_cache), as in steady state; a user's first request also
+loads the user row.
+"""
+import pytest
+from sqlalchemy import select, text
+
+from app.core.metrics import metrics
+from app.core.profiler import capture_queries
+from app.users.models import User
+
+
+def test_capture_counts_every_statement(db):
+    with capture_queries() as profile:
+        for _ in range(3):
+            db.execute(text("SELECT 1"))
+        db.scalars(select(User).limit(1)).all()
+    assert profile.statements == 4
+    assert [statement for statement, _ in profile.queries[:3]] == ["SELECT 1"] * 3
+    assert profile.repeated(3) == [("SELECT 1", 3)]
+
+
+def test_capture_sees_statements_from_the_client_thread(client, analyst):
+    with capture_queries() as profile:
+        client.get("/deals?limit=5", headers=analyst)
+    assert profile.statements >= 1
+
+
+def test_metrics_count_the_same_statements(client, analyst, make_deal):
+    make_deal()
+    metrics.reset()
+    with capture_queries() as profile:
+        client.get("/deals/board", headers=analyst)
+    lines = metrics.render()
+    assert f'deal_pipeline_http_request_db_statements_sum{{method="GET",route="/deals/board"}} {profile.statements:.6f}' in lines
+
+
+def test_max_queries_fails_over_budget(db, max_queries):
+    with pytest.raises(AssertionError, match="2 queries executed, expected at most 1"):
+        with max_queries(1):
+            db.execute(text("SELECT 1"))
+            db.execute(text("SELECT 2"))
+
+
+def test_deal_list(client, analyst, make_deal, max_queries):
+    for _ in range(3):
+        make_deal()
+    with max_queries(1):
+        response = client.get("/deals?limit=50", headers=analyst)
+    assert response.status_code == 200
+    assert len(response.json()) >= 3
+
+
+def test_board(client, analyst, make_deal, max_queries):
+    make_deal()
+    with max_queries(1):
+        response = client.get("/deals/board", headers=analyst)
+    assert response.status_code == 200
+
+
+def test_deal_detail(client, partner, make_deal, max_queries):
+    deal = make_deal()
+    client.post("/activities/comment", json={"deal_id": deal["id"], "comment": "Looks good"}, headers=partner)
+    client.post(f"/activities/deal/{deal['id']}/vote", headers=partner)
+    with max_queries(3):
+        response = client.get(f"/deals/{deal['id']}/detail", headers=partner)
+    assert response.status_code == 200
+
+
+def test_activity_feed(client, analyst, partner, make_deal, max_queries):
+    deal = make_deal()
+    for i in range(25):
+        client.post("/activities/comment", json={"deal_id": deal["id"], "comment": f"Comment {i}"}, headers=partner)
+    # A full page is one statement; the last, short page also looks for an archive
+    with max_queries(1):
+        page = client.get(f"/activities/deal/{deal['id']}?limit=20", headers=analyst)
+    with max_queries(2):
+        last = client.get(f"/activities/deal/{deal['id']}?limit=20&cursor={page.headers['X-Next-Cursor']}", headers=analyst)
+    assert len(page.json()) == 20 and len(last.json()) == 6
+
+
+def test_vote(client, partner, make_deal, max_queries):
+    deal = make_deal()
+    client.get("/users/me", headers=partner)
+    with max_queries(3):
+        response = client.post(f"/activities/deal/{deal['id']}/vote", headers=partner)
+    assert response.status_code == 201
@@ -0,0 +1,27 @@
+"""No hot query falls back to a table scan, checked with benchmarks.query_plans.
+
+The check seeds its own synthetic dataset and deletes, archives and moves
+deals as it goes, so it runs in a subprocess against a scratch SQLite file
+rather than the database the other tests share.
+"""
+import os
+import subprocess
+import sys
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.mark.slow
+def test_hot_queries_use_indexes(tmp_path):
+    result = subprocess.run(
+        [sys.executable, "-m", "benchmarks.query_plans", "--users", "40", "--deals", "400", "--activities", "10000"],
+        cwd=BACKEND_DIR,
+        env={**os.environ, "DATABASE_URL": f"sqlite:///{tmp_path / 'plans.db'}"},
+        capture_output=True,
+        text=True,
+        timeout=300,
+    )
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert "ok   deal detail" in result.stdout
@@ -0,0 +1,95 @@
+"""The response cache: backend choice for the worker count, and reads staying fresh across writes.
+
+The suite runs with RESPONSE_CACHE_BACKEND=none so statement budgets are not
+hidden by hits; the tests here swap an in-process MemoryBackend in.
+"""
+import pytest
+
+from app.core import response_cache as cache_module
+from app.core.config import settings
+from app.core.response_cache import MemoryBackend, deal_tag, response_cache
+from app.deals import service as deal_service
+
+
+@pytest.fixture
+def memory_cache(monkeypatch):
+    monkeypatch.setattr(response_cache, "backend", MemoryBackend(max_size=1000))
+    return response_cache
+
+
+def counts() -> tuple[int, int, int]:
+    stats = response_cache.stats()
+    return stats["hits"], stats["misses"], stats["stale"]
+
+
+def test_memory_backend_refuses_several_workers(monkeypatch):
+    monkeypatch.setattr(settings, "response_cache_backend", "memory")
+    monkeypatch.setattr(settings, "web_concurrency", 4)
+    with pytest.raises(ValueError, match="WEB_CONCURRENCY=4"):
+        cache_module._make_backend()
+
+
+def test_memory_backend_serves_one_worker(monkeypatch):
+    monkeypatch.setattr(settings, "response_cache_backend", "memory")
+    monkeypatch.setattr(settings, "web_concurrency", 1)
+    assert isinstance(cache_module._make_backend(), MemoryBackend)
+
+
+def test_no_cache_allows_several_workers(monkeypatch):
+    monkeypatch.setattr(settings, "response_cache_backend", "none")
+    monkeypatch.setattr(settings, "web_concurrency", 4)
+    assert cache_module._make_backend() is None
+
+
+def test_deal_update_is_seen_by_the_next_read(client, analyst, make_deal, memory_cache):
+    deal = make_deal(round="Seed")
+    assert client.get(f"/deals/{deal['id']}", headers=analyst).json()["round"] == "Seed"
+    hits = counts()[0]
+    assert client.get(f"/deals/{deal['id']}", headers=analyst).json()["round"] == "Seed"
+    assert counts()[0] == hits + 1
+
+    assert client.put(f"/deals/{deal['id']}", json={"round": "A"}, headers=analyst).status_code == 200
+    assert client.get(f"/deals/{deal['id']}", headers=analyst).json()["round"] == "A"
+
+
+def test_created_deal_appears_on_cached_list_pages(client, analyst, make_deal, memory_cache):
+    path = "/deals?stage=invested&limit=1000"
+    before = [row["id"] for row in client.get(path, headers=analyst).json()]
+    client.get(path, headers=analyst)
+    deal = make_deal(stage="invested")
+    after = [row["id"] for row in client.get(path, headers=analyst).json()]
+    assert after == before + [deal["id"]]
+
+
+def test_entry_filled_across_a_commit_is_stale(client, analyst, make_deal, memory_cache, monkeypatch):
+    deal = make_deal(round="Seed")
+    get_deal = deal_service.get_deal
+
+    def get_deal_then_commit_elsewhere(db, deal_id):
+        # A write that commits after this request read its tag generations
+        found = get_deal(db, deal_id)
+        response_cache.invalidate([deal_tag(deal_id)])
+        return found
+
+    monkeypatch.setattr(deal_service, "get_deal", get_deal_then_commit_elsewhere)
+    client.get(f"/deals/{deal['id']}", headers=analyst)
+    monkeypatch.setattr(deal_service, "get_deal", get_deal)
+    hits, misses, stale = counts()
+    client.get(f"/deals/{deal['id']}", headers=analyst)
+    assert counts() == (hits, misses + 1, stale + 1)
+
+
+def test_cached_entry_answers_if_none_match(client, analyst, make_deal, memory_cache):
+    deal = make_deal()
+    etag = client.get(f"/deals/{deal['id']}", headers=analyst).headers["etag"]
+    hits = counts()[0]
+    response = client.get(f"/deals/{deal['id']}", headers={**analyst, "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    assert counts()[0] == hits + 1
+
+    client.put(f"/deals/{deal['id']}", json={"round": "B"}, headers=analyst)
+    response = client.get(f"/deals/{deal['id']}", headers={**analyst, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["round"] == "B"
+    assert response.headers["etag"] != etag
@@ -0,0 +1,30 @@
+"""Every route that touches the database does so through the session of the configured mode."""
+import inspect
+
+from fastapi.routing import APIRoute
+
+from app.core.config import settings
+from app.core.database import get_async_db, get_db
+
+
+def dependency_calls(dependant) -> set:
+    calls = set()
+    for dependency in dependant.dependencies:
+        calls.add(dependency.call)
+        calls |= dependency_calls(dependency)
+    return calls
+
+
+def test_database_routes_use_the_configured_session(app):
+    session, other = (get_async_db, get_db) if settings.async_mode else (get_db, get_async_db)
+    checked = []
+    for route in app.routes:
+        if not isinstance(route, APIRoute):
+            continue
+        calls = dependency_calls(route.dependant)
+        assert other not in calls, route.path
+        if session in calls:
+            # Sync handlers would hold a threadpool slot for the whole request
+            assert inspect.iscoroutinefunction(route.endpoint), route.path
+            checked.append(route.path)
+    assert {"/analytics/funnel", "/search", "/exports/deals"} <= set(checked)
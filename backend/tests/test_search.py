@@ -0,0 +1,42 @@
+"""GET /search: matching, ranking and the HTML of highlighted snippets."""
+
+
+def search(client, headers, q: str) -> dict:
+    response = client.get("/search", params={"q": q}, headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def snippets(result: dict) -> dict[str, str]:
+    return {highlight["field"]: highlight["snippet"] for highlight in result["highlights"]}
+
+
+def test_memo_markup_is_escaped_in_snippets(client, analyst, make_deal):
+    deal = make_deal(name="Escaping Ltd")
+    client.post("/memos", json={
+        "deal_id": deal["id"],
+        "summary": "Quokkarevenue grew <script>alert('x')</script> fast",
+        "risks": 'Quokkarevenue <img src=x onerror="alert(1)"> & churn',
+    }, headers=analyst)
+
+    [result] = [r for r in search(client, analyst, "quokkarevenue")["results"] if r["deal_id"] == deal["id"]]
+    found = snippets(result)
+    assert found["summary"] == "<mark>Quokkarevenue</mark> grew &lt;script&gt;alert(&#x27;x&#x27;)&lt;/script&gt; fast"
+    assert found["risks"] == "<mark>Quokkarevenue</mark> &lt;img src=x onerror=&quot;alert(1)&quot;&gt; &amp; churn"
+    for snippet in found.values():
+        assert "<script" not in snippet and "<img" not in snippet
+
+
+def test_match_inside_markup_is_marked_after_escaping(client, analyst, make_deal):
+    deal = make_deal(name="Tags Inc")
+    client.post("/memos", json={"deal_id": deal["id"], "market": "<blink>Wallabymarket</blink>"}, headers=analyst)
+    [result] = [r for r in search(client, analyst, "wallabymarket")["results"] if r["deal_id"] == deal["id"]]
+    assert snippets(result)["market"] == "&lt;blink&gt;<mark>Wallabymarket</mark>&lt;/blink&gt;"
+
+
+def test_name_matches_rank_first(client, analyst, make_deal):
+    in_name = make_deal(name="Numbat Analytics")
+    in_memo = make_deal(name="Other Co")
+    client.post("/memos", json={"deal_id": in_memo["id"], "summary": "Competes with numbat"}, headers=analyst)
+    results = search(client, analyst, "numbat")["results"]
+    assert [r["deal_id"] for r in results][:2] == [in_name["id"], in_memo["id"]]
@@ -0,0 +1,33 @@
+"""Password changes are hashed on the password executor, not on the request path."""
+import threading
+
+from app.core import security
+from app.users.models import UserRole
+
+
+def test_password_change_is_hashed_on_the_executor(client, admin, make_user, monkeypatch):
+    user, _ = make_user(UserRole.ANALYST)
+    hashed_on = []
+    hash_password = security.get_password_hash
+
+    def recording_hash(password: str) -> str:
+        hashed_on.append(threading.current_thread().name)
+        return hash_password(password)
+
+    # The thread executor looks the function up on the module at call time
+    monkeypatch.setattr(security, "get_password_hash", recording_hash)
+
+    response = client.put(f"/users/{user.id}", json={"password": "changed"}, headers=admin)
+    assert response.status_code == 200, response.text
+    assert len(hashed_on) == 1 and hashed_on[0].startswith("password-hash")
+
+    login = client.post("/users/login", json={"email": user.email, "password": "changed"})
+    assert login.status_code == 200
+    assert client.post("/users/login", json={"email": user.email, "password": "password"}).status_code == 401
+
+
+def test_update_without_password_keeps_it(client, admin, make_user):
+    user, _ = make_user(UserRole.ANALYST)
+    response = client.put(f"/users/{user.id}", json={"full_name": "Renamed", "password": None}, headers=admin)
+    assert response.status_code == 200, response.text
+    assert client.post("/users/login", json={"email": user.email, "password": "password"}).status_code == 200
@@ -1,7 +1,7 @@
 import React, { useState, useEffect, useCallback } from 'react';
 import { useParams, useNavigate } from 'react-router-dom';
 import { api } from '../services/api';
-import type { Deal, Memo, MemoVersion, Activity, MemoSection } from '../types';
+import type { Deal, Memo, MemoVersion, MemoVersionSummary, Activity, MemoSection } from '../types';
 import { Role } from '../types';
 import { MEMO_SECTIONS } from '../constants';
 import { useAuth } from '../context/AuthContext';
@@ -14,8 +14,9 @@ const MemoViewer: React.FC = () => {
   const [deal, setDeal] = useState<Deal | null>(null);
   const [activities, setActivities] = useState<Activity[]>([]);
   const [memo, setMemo] = useState<Memo | null>(null);
-  const [versions, setVersions] = useState<MemoVersion[]>([]);
+  const [versions, setVersions] = useState<MemoVersionSummary[]>([]);
   const [selectedVersionId, setSelectedVersionId] = useState<number | null>(null);
+  const [selectedVersion, setSelectedVersion] = useState<MemoVersion | null>(null);
   
   const [editMode, setEditMode] = useState(false);
   const [formData, setFormData] = useState<MemoSection>({
@@ -62,7 +63,7 @@ const MemoViewer: React.FC = () => {
           open_questions: memoData.open_questions || ''
         });
         
-        const versionsData = await api.getMemoVersions(memoData.id);
+        const versionsData = await api.getMemoVersionIndex(memoData.id);
         setVersions(versionsData);
       } catch (e) {
         // No memo exists yet
@@ -96,9 +97,17 @@ const MemoViewer: React.FC = () => {
     }
   };
 
-  const handleVersionChange = (e: React.ChangeEvent<HTMLSelectElement>) => {
+  const handleVersionChange = async (e: React.ChangeEvent<HTMLSelectElement>) => {
     const vId = Number(e.target.value);
     setSelectedVersionId(vId === -1 ? null : vId);
+    setSelectedVersion(null);
+    if (vId === -1) return;
+    // The index carries no field text; load only the version being viewed
+    try {
+      setSelectedVersion(await api.getMemoVersion(vId));
+    } catch (err) {
+      console.error(err);
+    }
   };
 
   // Helper to convert memo/version to MemoSection
@@ -116,7 +125,7 @@ const MemoViewer: React.FC = () => {
 
   // Determine what content to show
   const displayContent = selectedVersionId 
-    ? toMemoSection(versions.find(v => v.id === selectedVersionId))
+    ? toMemoSection(selectedVersion?.id === selectedVersionId ? selectedVersion : undefined)
     : editMode ? formData : toMemoSection(memo || undefined);
 
   const canEdit = (user?.role === Role.ADMIN || user?.role === Role.ANALYST) && !selectedVersionId;
@@ -210,7 +219,7 @@ const MemoViewer: React.FC = () => {
                  >
                    <option value={-1}>Current (Latest)</option>
                   {versions.map(v => (
-                    <option key={v.id} value={v.id}>v{v.version_number} - {new Date(v.created_at).toLocaleString()}</option>
+                    <option key={v.id} value={v.id}>v{v.version_number} - {new Date(v.created_at).toLocaleString()}{v.changed_fields.length > 0 && ` (${v.changed_fields.join(', ')})`}</option>
                   ))}
                  </select>
               </div>
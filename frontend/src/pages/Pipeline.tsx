@@ -1,16 +1,49 @@
 import React, { useState, useEffect, useCallback } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { api } from '../services/api';
-import type { Deal, DealStage } from '../types';
+import type { BoardCard, BoardColumn, Deal, DealStage } from '../types';
 import { Role } from '../types';
 import { PIPELINE_STAGES } from '../constants';
 import { useAuth } from '../context/AuthContext';
 import DealModal from '../components/DealModal';
 
+type Columns = Record<DealStage, BoardColumn>;
+
+const byStage = (columns: BoardColumn[]): Columns =>
+  Object.fromEntries(columns.map(column => [column.stage, column])) as Columns;
+
+const findCard = (columns: Columns, dealId: number): BoardCard | undefined => {
+  for (const column of Object.values(columns)) {
+    const card = column.cards.find(c => c.id === dealId);
+    if (card) return card;
+  }
+  return undefined;
+};
+
+const removeCard = (columns: Columns, dealId: number): Columns => {
+  const card = findCard(columns, dealId);
+  if (!card) return columns;
+  const column = columns[card.stage];
+  return {
+    ...columns,
+    [card.stage]: { ...column, total: column.total - 1, cards: column.cards.filter(c => c.id !== dealId) },
+  };
+};
+
+// Columns are in id order and loaded page by page; a card past the last loaded one
+// only adds to the total and shows up with its page.
+const placeCard = (columns: Columns, card: BoardCard): Columns => {
+  const column = columns[card.stage];
+  const last = column.cards[column.cards.length - 1];
+  const loaded = column.next_cursor === null || (last !== undefined && card.id < last.id);
+  const cards = loaded ? [...column.cards, card].sort((a, b) => a.id - b.id) : column.cards;
+  return { ...columns, [card.stage]: { ...column, total: column.total + 1, cards } };
+};
+
 const Pipeline: React.FC = () => {
   const { user } = useAuth();
   const navigate = useNavigate();
-  const [deals, setDeals] = useState<Deal[]>([]);
+  const [columns, setColumns] = useState<Columns | null>(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
   const [isModalOpen, setIsModalOpen] = useState(false);
@@ -19,11 +52,11 @@ const Pipeline: React.FC = () => {
   // Drag and Drop state
   const [draggedDealId, setDraggedDealId] = useState<number | null>(null);
 
-  const fetchDeals = useCallback(async () => {
+  const fetchBoard = useCallback(async () => {
     try {
       setLoading(true);
-      const data = await api.getDeals();
-      setDeals(data);
+      const data = await api.getBoard();
+      setColumns(byStage(data.columns));
       setError(null);
     } catch (err: any) {
       console.error(err);
@@ -34,8 +67,61 @@ const Pipeline: React.FC = () => {
   }, []);
 
   useEffect(() => {
-    fetchDeals();
-  }, [fetchDeals]);
+    fetchBoard();
+  }, [fetchBoard]);
+
+  const loadMore = async (stage: DealStage) => {
+    const cursor = columns?.[stage].next_cursor;
+    if (!cursor) return;
+    try {
+      const page: BoardColumn = await api.getBoardColumn(stage, cursor);
+      setColumns(prev => {
+        if (!prev) return prev;
+        // Cards placed by live updates or a drop may already be on the page
+        const seen = new Set(prev[stage].cards.map(c => c.id));
+        const cards = [...prev[stage].cards, ...page.cards.filter(c => !seen.has(c.id))];
+        return { ...prev, [stage]: { ...page, cards } };
+      });
+    } catch (err) {
+      console.error(err);
+      alert("Failed to load more deals.");
+    }
+  };
+
+  // Apply other users' changes as they happen instead of re-fetching the board
+  useEffect(() => {
+    return api.subscribe(['board'], (event) => {
+      if (event.type === 'resync') {
+        fetchBoard();
+      } else if ((event.type === 'deal.created' || event.type === 'deal.updated') && event.deal) {
+        const changed = event.deal;
+        setColumns(prev => {
+          if (!prev) return prev;
+          const current = findCard(prev, changed.id);
+          // An update to a card that is not loaded yet arrives with its page
+          if (event.type === 'deal.updated' && !current) return prev;
+          return placeCard(removeCard(prev, changed.id), { ...changed, owner_name: current?.owner_name ?? null });
+        });
+      } else if (event.type === 'deal.deleted' && event.deal_id !== undefined) {
+        const dealId = event.deal_id;
+        setColumns(prev => prev && removeCard(prev, dealId));
+      } else if (event.type === 'vote.cast') {
+        const voteCount = event.vote_count as number;
+        setColumns(prev => {
+          const card = prev && findCard(prev, event.deal_id as number);
+          if (!prev || !card) return prev;
+          const column = prev[card.stage];
+          return {
+            ...prev,
+            [card.stage]: {
+              ...column,
+              cards: column.cards.map(c => c.id === card.id ? { ...c, vote_count: voteCount } : c),
+            },
+          };
+        });
+      }
+    });
+  }, [fetchBoard]);
 
   const handleDragStart = (e: React.DragEvent, dealId: number) => {
     setDraggedDealId(dealId);
@@ -50,27 +136,27 @@ const Pipeline: React.FC = () => {
 
   const handleDrop = async (e: React.DragEvent, stage: DealStage) => {
     e.preventDefault();
-    if (draggedDealId === null) return;
+    if (draggedDealId === null || !columns) return;
 
-    const deal = deals.find(d => d.id === draggedDealId);
+    const deal = findCard(columns, draggedDealId);
     if (!deal) return;
 
     if (deal.stage === stage) return;
 
     // Optimistic update
-    const previousDeals = [...deals];
-    setDeals(prev => prev.map(d => d.id === draggedDealId ? { ...d, stage } : d));
+    const previousColumns = columns;
+    setColumns(prev => prev && placeCard(removeCard(prev, deal.id), { ...deal, stage }));
 
     try {
       if (user?.role === Role.ADMIN || user?.role === Role.ANALYST) {
-        await api.updateDeal(draggedDealId, { ...deal, stage });
+        await api.updateDeal(draggedDealId, { stage });
       } else {
         alert("Only Analysts and Admins can move deals.");
-        setDeals(previousDeals); // Revert
+        setColumns(previousColumns); // Revert
       }
     } catch (err) {
       console.error(err);
-      setDeals(previousDeals); // Revert
+      setColumns(previousColumns); // Revert
       alert("Failed to update deal stage.");
     } finally {
       setDraggedDealId(null);
@@ -84,7 +170,7 @@ const Pipeline: React.FC = () => {
       } else {
         await api.createDeal(data);
       }
-      fetchDeals();
+      fetchBoard();
     } catch (err) {
       alert("Operation failed");
     }
@@ -98,7 +184,7 @@ const Pipeline: React.FC = () => {
   
   const canEdit = user?.role === Role.ADMIN || user?.role === Role.ANALYST;
 
-  if (loading) return <div className="flex justify-center items-center h-64 text-slate-400">Loading Pipeline...</div>;
+  if (loading && !columns) return <div className="flex justify-center items-center h-64 text-slate-400">Loading Pipeline...</div>;
 
   return (
     <div className="h-full flex flex-col">
@@ -121,8 +207,8 @@ const Pipeline: React.FC = () => {
       <div className="flex-1 overflow-x-auto overflow-y-hidden pb-4">
         <div className="flex gap-4 h-full min-w-max">
           {PIPELINE_STAGES.map((stage) => {
-            const stageDeals = deals.filter(d => d.stage === stage.id);
-            // const totalValue = stageDeals.reduce((sum, d) => sum + (d.check_size || 0), 0);
+            const column = columns?.[stage.id];
+            const stageDeals = column?.cards ?? [];
             
             return (
               <div 
@@ -135,7 +221,7 @@ const Pipeline: React.FC = () => {
                   <div className="flex justify-between items-center mb-1">
                     <h3 className="font-semibold text-slate-700 text-sm">{stage.label}</h3>
                     <span className="bg-white px-2 py-0.5 rounded-full text-xs font-bold text-slate-500 border border-slate-200">
-                      {stageDeals.length}
+                      {column?.total ?? 0}
                     </span>
                   </div>
                 </div>
@@ -167,6 +253,11 @@ const Pipeline: React.FC = () => {
                           <span className="inline-flex items-center px-2 py-0.5 rounded text-[10px] font-medium bg-slate-100 text-slate-800">
                             {deal.round}
                           </span>
+                        )}
+                        {deal.vote_count > 0 && (
+                          <span className="inline-flex items-center px-2 py-0.5 rounded text-[10px] font-medium bg-brand-50 text-brand-900">
+                            {deal.vote_count} {deal.vote_count === 1 ? 'vote' : 'votes'}
+                          </span>
                         )}
                          <span className="text-[10px] text-slate-400 ml-auto">
                            {new Date(deal.updated_at || deal.created_at).toLocaleDateString()}
@@ -174,6 +265,14 @@ const Pipeline: React.FC = () => {
                       </div>
                     </div>
                   ))}
+                  {column?.next_cursor && (
+                    <button
+                      onClick={() => loadMore(stage.id)}
+                      className="w-full py-2 text-xs font-medium text-slate-500 hover:text-brand-600"
+                    >
+                      Load more ({column.total - stageDeals.length} remaining)
+                    </button>
+                  )}
                 </div>
               </div>
             );
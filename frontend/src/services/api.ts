@@ -1,4 +1,5 @@
 import { API_BASE_URL } from '../constants';
+import type { LiveEvent } from '../types';
 
 const getHeaders = () => {
   const token = localStorage.getItem('token');
@@ -58,6 +59,17 @@ export const api = {
     return handleResponse(res);
   },
 
+  // Board: every stage's total and first cards, then more of one column from its next_cursor
+  getBoard: async () => {
+    const res = await fetch(`${API_BASE_URL}/deals/board`, { headers: getHeaders() });
+    return handleResponse(res);
+  },
+
+  getBoardColumn: async (stage: string, cursor: string) => {
+    const res = await fetch(`${API_BASE_URL}/deals/board/${stage}?cursor=${encodeURIComponent(cursor)}`, { headers: getHeaders() });
+    return handleResponse(res);
+  },
+
   createDeal: async (data: any) => {
     const res = await fetch(`${API_BASE_URL}/deals`, {
       method: 'POST',
@@ -130,6 +142,16 @@ export const api = {
     return handleResponse(res);
   },
 
+  getMemoVersionIndex: async (memoId: number) => {
+    const res = await fetch(`${API_BASE_URL}/memos/${memoId}/versions/index`, { headers: getHeaders() });
+    return handleResponse(res);
+  },
+
+  getMemoVersion: async (versionId: number) => {
+    const res = await fetch(`${API_BASE_URL}/memos/versions/${versionId}`, { headers: getHeaders() });
+    return handleResponse(res);
+  },
+
   // Partner actions
   addComment: async (dealId: number, comment: string) => {
     const res = await fetch(`${API_BASE_URL}/activities/comment`, {
@@ -173,5 +195,42 @@ export const api = {
       headers: getHeaders(),
     });
     return handleResponse(res);
+  },
+
+  // Live updates: topics are 'board' and 'deal:<id>'. Reconnects after a drop and
+  // reports it as a 'resync', since events sent meanwhile were missed.
+  subscribe: (topics: string[], onEvent: (event: LiveEvent) => void) => {
+    const token = localStorage.getItem('token');
+    const query = [`token=${encodeURIComponent(token ?? '')}`, ...topics.map(t => `topic=${encodeURIComponent(t)}`)];
+    const url = `${API_BASE_URL.replace(/^http/, 'ws')}/events/ws?${query.join('&')}`;
+    let socket: WebSocket | null = null;
+    let closed = false;
+    let retry: ReturnType<typeof setTimeout> | undefined;
+    let connectedBefore = false;
+
+    const connect = () => {
+      socket = new WebSocket(url);
+      socket.onmessage = (message) => {
+        // A frame carries one or more events, one JSON object per line
+        for (const line of String(message.data).split('\n')) {
+          const event: LiveEvent = JSON.parse(line);
+          if (event.type === 'subscribed' && connectedBefore) {
+            onEvent({ type: 'resync' });
+          }
+          if (event.type === 'subscribed') connectedBefore = true;
+          onEvent(event);
+        }
+      };
+      socket.onclose = () => {
+        if (!closed) retry = setTimeout(connect, 2000);
+      };
+    };
+
+    connect();
+    return () => {
+      closed = true;
+      clearTimeout(retry);
+      socket?.close();
+    };
   }
 };
@@ -43,10 +43,23 @@ export interface Deal {
   round?: string;
   check_size?: number;
   status: 'active' | 'archived' | 'approved' | 'declined';
+  vote_count: number;
   created_at: string;
   updated_at: string | null;
 }
   
+// A deal as GET /deals/board returns it, with its owner's name
+export interface BoardCard extends Deal {
+  owner_name: string | null;
+}
+
+export interface BoardColumn {
+  stage: DealStage;
+  total: number;
+  cards: BoardCard[];
+  next_cursor: string | null;
+}
+
 export interface Activity {
   id: number;
   deal_id: number;
@@ -93,10 +106,28 @@ export interface MemoVersion {
   created_at: string;
 }
 
+export interface MemoVersionSummary {
+  id: number;
+  memo_id: number;
+  version_number: number;
+  created_by_id: number;
+  created_at: string;
+  changed_fields: string[];
+}
+
 export interface Vote {
   id: number;
   deal_id: number;
   user_id: number;
   created_at: string;
 }
-  
\ No newline at end of file
+  
+export interface LiveEvent {
+  seq?: number;
+  type: 'subscribed' | 'resync' | 'error' | 'deal.created' | 'deal.updated' | 'deal.deleted'
+    | 'vote.cast' | 'comment.added' | 'memo.created' | 'memo.updated';
+  deal_id?: number;
+  deal?: Deal;
+  changed?: string[];
+  [key: string]: unknown;
+}